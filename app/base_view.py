@@ -1,6 +1,9 @@
+import queue
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
+from config.database import db
 from core.logger import logger
 from core.utils import utils
 from app.app_context import app_context
@@ -9,15 +12,30 @@ try:
 except Exception:
     PALETTE = {'bg': '#f5f7f9', 'panel': '#ffffff', 'muted': '#9aa3ab'}
 
+# Pool compartido por todas las vistas para las consultas en segundo plano
+# (db entrega a cada consulta su propia conexión, así que es seguro entre hilos)
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='vista')
+
 class BaseView(ttk.Frame):
     """Vista base para todas las pantallas de la aplicación"""
     
+    # Intervalo de revisión de resultados en segundo plano (ms)
+    ASYNC_POLL_MS = 50
+    
     def __init__(self, parent: tk.Widget, controller: Optional['BaseController'] = None):
         super().__init__(parent)
         self.parent = parent
         self.controller = controller
         self.widgets: Dict[str, tk.Widget] = {}
         
+        # Cargas en segundo plano (ver run_async)
+        self._async_tokens: Dict[str, int] = {}
+        self._async_futures: Dict[str, Any] = {}
+        self._async_results = queue.Queue()
+        self._async_polling = False
+        self._loading: Dict[str, tk.Widget] = {}
+        self._data_versions: Dict[tuple, tuple] = {}
+        
         # Configuración base
         self.configure(style="Main.TFrame")
         self.grid_rowconfigure(0, weight=1)
@@ -213,4 +231,106 @@ class BaseView(ttk.Frame):
     
     def on_hide(self):
         """Método llamado cuando la vista se oculta"""
-        logger.debug(f"Vista {self.__class__.__name__} ocultada")
\ No newline at end of file
+        self.cancel_async()
+        logger.debug(f"Vista {self.__class__.__name__} ocultada")
+    
+    def data_changed(self, *tables: str, key: Any = None) -> bool:
+        """Indica si alguna de las tablas cambió desde la última consulta (True la primera vez).
+        
+        Usa los contadores de versión de db, así que un on_show de una vista en
+        caché puede saltarse la recarga si nada se escribió mientras estaba oculta.
+        `key` separa consultas distintas que dependen de las mismas tablas.
+        """
+        versions = tuple(db.get_data_version(table) for table in tables)
+        if self._data_versions.get((key, tables)) == versions:
+            return False
+        self._data_versions[(key, tables)] = versions
+        return True
+    
+    def forget_data_versions(self, key: Any = None):
+        """Olvidar las versiones vistas con `key`: el próximo data_changed devuelve True"""
+        for entry in [entry for entry in self._data_versions if entry[0] == key]:
+            del self._data_versions[entry]
+    
+    def run_async(self, key: str, func: Callable, on_done: Callable, *args,
+                  on_error: Optional[Callable] = None, loading: Optional[tk.Widget] = None) -> int:
+        """Ejecutar func(*args) en el pool y entregar el resultado a on_done en el hilo de Tk.
+        
+        Una nueva llamada con la misma `key` descarta el resultado de la anterior,
+        igual que ocultar la vista. `func` no debe tocar widgets. Con `loading` se
+        muestra un aviso de carga sobre ese widget mientras la tarea esté vigente.
+        """
+        token = self._async_tokens.get(key, 0) + 1
+        self._async_tokens[key] = token
+        anterior = self._async_futures.pop(key, None)
+        if anterior is not None:
+            anterior.cancel()
+        
+        if loading is not None:
+            self.show_loading(loading, key)
+        
+        future = _executor.submit(func, *args)
+        self._async_futures[key] = future
+        future.add_done_callback(
+            lambda f: self._async_results.put((key, token, f, on_done, on_error))
+        )
+        
+        if not self._async_polling:
+            self._async_polling = True
+            self.after(self.ASYNC_POLL_MS, self._poll_async)
+        return token
+    
+    def cancel_async(self, key: Optional[str] = None):
+        """Descartar las cargas pendientes (todas o la de `key`)"""
+        keys = [key] if key is not None else list(self._async_tokens)
+        for k in keys:
+            self._async_tokens[k] = self._async_tokens.get(k, 0) + 1
+            future = self._async_futures.pop(k, None)
+            if future is not None:
+                future.cancel()
+            self.hide_loading(k)
+    
+    def _poll_async(self):
+        """Entregar en el hilo de Tk los resultados terminados"""
+        while True:
+            try:
+                key, token, future, on_done, on_error = self._async_results.get_nowait()
+            except queue.Empty:
+                break
+            if self._async_tokens.get(key) != token:
+                continue  # reemplazada por otra carga o vista oculta
+            
+            self._async_futures.pop(key, None)
+            self.hide_loading(key)
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Error en carga '{key}' de {self.__class__.__name__}: {e}")
+                if on_error:
+                    on_error(e)
+                continue
+            try:
+                on_done(result)
+            except Exception as e:
+                logger.error(f"Error mostrando carga '{key}' de {self.__class__.__name__}: {e}")
+        
+        if self._async_futures:
+            self.after(self.ASYNC_POLL_MS, self._poll_async)
+        else:
+            self._async_polling = False
+    
+    def show_loading(self, widget: tk.Widget, key: str = 'default', text: str = "Cargando..."):
+        """Mostrar un aviso de carga centrado sobre `widget`"""
+        self.hide_loading(key)
+        label = ttk.Label(widget, text=text, style="Normal.TLabel")
+        label.place(relx=0.5, rely=0.5, anchor="center")
+        self._loading[key] = label
+    
+    def hide_loading(self, key: str = 'default'):
+        """Quitar el aviso de carga de `key`"""
+        label = self._loading.pop(key, None)
+        if label is not None:
+            try:
+                label.destroy()
+            except tk.TclError:
+                pass
\ No newline at end of file
@@ -1,25 +1,92 @@
-from typing import Dict, Optional, Type, Any
+import importlib
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Type, Any, Union
 import tkinter as tk
+from config.settings import settings
 from core.logger import logger
 from core.auth import AuthService
 from app.app_context import app_context
 
 class Router:
-    """Router para manejar navegación entre vistas"""
+    """Router para manejar navegación entre vistas.
     
-    def __init__(self):
+    Las vistas construidas se conservan en una caché LRU de `cache_size`
+    vistas: al volver a una ruta se re-muestra la misma instancia (con su
+    estado) y su on_show decide qué refrescar. Las vistas que salen de la
+    caché, o de rutas registradas con cache=False, se destruyen al ocultarse.
+    """
+    
+    def __init__(self, cache_size: int = settings.VIEW_CACHE_MAX):
         self.routes: Dict[str, Any] = {}
         self.current_route: Optional[str] = None
         self.route_params: Dict[str, Any] = {}
+        self.cache_size = cache_size
+        self._views: 'OrderedDict[str, tk.Widget]' = OrderedDict()
     
-    def register_route(self, name: str, view_class: Type, controller_class: Type = None):
-        """Registrar una ruta"""
+    def register_route(self, name: str, view_class: Union[Type, str],
+                       controller_class: Union[Type, str, None] = None, cache: bool = True):
+        """Registrar una ruta (cache=False: la vista se reconstruye en cada navegación).
+        
+        Las clases pueden darse como 'paquete.modulo:Clase'; el módulo se importa
+        en la primera navegación a la ruta y no al iniciar la aplicación.
+        """
         self.routes[name] = {
             'view_class': view_class,
-            'controller_class': controller_class
+            'controller_class': controller_class,
+            'cache': cache
         }
         logger.debug(f"Ruta registrada: {name}")
     
+    def _build_view(self, route_name: str, main_window):
+        """Crear la vista (y su controlador) de una ruta"""
+        route_info = self.routes[route_name]
+        view_class = route_info['view_class'] = self._resolve(route_info['view_class'])
+        controller_class = route_info['controller_class'] = self._resolve(route_info.get('controller_class'))
+        
+        # Crear controlador si existe
+        controller = None
+        if controller_class:
+            controller = controller_class()
+            controller.initialize()
+        
+        view = view_class(main_window, controller)
+        if controller:
+            controller.set_view(view)
+        return view
+    
+    @staticmethod
+    def _resolve(target: Union[Type, str, None]) -> Optional[Type]:
+        """Importar una clase dada como 'paquete.modulo:Clase'"""
+        if not isinstance(target, str):
+            return target
+        module_name, _, class_name = target.partition(':')
+        return getattr(importlib.import_module(module_name), class_name)
+    
+    def _cache_view(self, route_name: str, view):
+        """Guardar la vista en la caché y destruir las menos usadas que sobren"""
+        self._views[route_name] = view
+        self._views.move_to_end(route_name)
+        while len(self._views) > self.cache_size:
+            evicted_route, evicted = self._views.popitem(last=False)
+            self._destroy_view(evicted)
+            logger.debug(f"Vista descartada de la caché: {evicted_route}")
+    
+    def _destroy_view(self, view):
+        """Destruir una vista que ya no se va a mostrar"""
+        try:
+            view.destroy()
+        except tk.TclError:
+            pass
+    
+    def clear_cache(self):
+        """Destruir todas las vistas en caché salvo la actual (p. ej. al cerrar sesión)"""
+        current_view = app_context.get_current_view()
+        for view in self._views.values():
+            if view is not current_view:
+                self._destroy_view(view)
+        self._views.clear()
+    
     def navigate_to(self, route_name: str, **kwargs):
         """Navegar a una ruta específica"""
         try:
@@ -33,30 +100,26 @@ class Router:
                 self.navigate_to('login')
                 return
             
-            # Ocultar vista actual
+            # Ocultar vista actual (se destruye si no quedó en la caché)
             current_view = app_context.get_current_view()
             if current_view:
                 if hasattr(current_view, 'on_hide'):
                     current_view.on_hide()
                 current_view.grid_forget()
+                if current_view not in self._views.values():
+                    self._destroy_view(current_view)
+                app_context.set_current_view(None)
+            
+            # Al volver al login se descartan las vistas de la sesión anterior
+            if route_name == 'login':
+                self.clear_cache()
             
             # Guardar parámetros de la ruta
             self.route_params = kwargs
             self.current_route = route_name
             
-            # Crear nueva vista
-            route_info = self.routes[route_name]
-            view_class = route_info['view_class']
-            controller_class = route_info.get('controller_class')
-            
             main_window = app_context.get_main_window()
             
-            # Crear controlador si existe
-            controller = None
-            if controller_class:
-                controller = controller_class()
-                controller.initialize()
-            
             # Crear/ocultar menú según ruta
             try:
                 # Si no es la pantalla de login, asegurarnos de mostrar la barra de menú
@@ -83,11 +146,15 @@ class Router:
             except Exception:
                 pass
 
-            # Crear vista
-            view = view_class(main_window, controller)
-            
-            if controller:
-                controller.set_view(view)
+            # Reutilizar la vista en caché o crearla
+            view = self._views.get(route_name)
+            build_ms = None
+            if view is None:
+                start = time.perf_counter()
+                view = self._build_view(route_name, main_window)
+                build_ms = (time.perf_counter() - start) * 1000
+            if self.routes[route_name].get('cache', True):
+                self._cache_view(route_name, view)
             
             # Configurar vista en la ventana principal.
             # Por defecto colocamos la vista en la columna 1 (columna 0 reserva para menú)
@@ -128,13 +195,16 @@ class Router:
                 pass
             
             # Llamar método on_show si existe
+            start = time.perf_counter()
             if hasattr(view, 'on_show'):
                 view.on_show()
+            show_ms = (time.perf_counter() - start) * 1000
             
             # Actualizar título de ventana
             self._update_window_title(route_name)
             
-            logger.info(f"Navegación a: {route_name}")
+            origen = f"construida en {build_ms:.0f} ms" if build_ms is not None else "desde caché"
+            logger.info(f"Navegación a: {route_name} ({origen}, on_show {show_ms:.0f} ms)")
             
         except Exception as e:
             logger.error(f"Error en navegación a {route_name}: {e}")
@@ -1,7 +1,14 @@
+import queue
 import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
 from pathlib import Path
 from .environment import env
+from .migrations import MIGRATIONS
+from .settings import settings
 from core.logger import logger
+from core.timestamps import register_sqlite_adapters
 
 # Intentar importar driver MySQL (PyMySQL). Si no está disponible, seguiremos usando sqlite.
 try:
@@ -13,11 +20,39 @@ except Exception:
     DictCursor = None
     _HAS_PYMYSQL = False
 
+# datetime/date se escriben en formato canónico (ver core.timestamps)
+register_sqlite_adapters()
+
 class Database:
-    """Manejador de base de datos SQLite"""
+    """Manejador de base de datos SQLite.
+
+    La base se crea y migra con la primera conexión, no al importar el módulo.
+    """
     
     def __init__(self):
-        self._create_database()
+        self._data_versions = defaultdict(int)
+        self._versions_lock = threading.Lock()
+        self._applied_migrations = set()
+        self._ready = False
+        self._initializing = False
+        self._init_lock = threading.RLock()
+        self._read_pool = queue.LifoQueue()
+    
+    def _ensure_ready(self):
+        """Crear la base y aplicar migraciones una sola vez"""
+        if self._ready:
+            return
+        with self._init_lock:
+            # La inicialización abre conexiones con get_connection: no reentrar
+            if self._ready or self._initializing:
+                return
+            self._initializing = True
+            try:
+                self._create_database()
+                self._run_migrations()
+                self._ready = True
+            finally:
+                self._initializing = False
     
     def _create_database(self):
         """Crear la base de datos y directorios necesarios"""
@@ -127,8 +162,8 @@ class Database:
                     nombre TEXT NOT NULL,
                     descripcion TEXT,
                     categoria TEXT NOT NULL,
-                    precio_compra REAL NOT NULL,
-                    precio_venta REAL NOT NULL,
+                    precio_compra INTEGER NOT NULL,
+                    precio_venta INTEGER NOT NULL,
                     stock_actual INTEGER DEFAULT 0,
                     stock_minimo INTEGER DEFAULT 10,
                     stock_maximo INTEGER DEFAULT 100,
@@ -147,9 +182,9 @@ class Database:
                     fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     cliente_nombre TEXT,
                     cliente_rut TEXT,
-                    subtotal REAL NOT NULL,
-                    iva REAL NOT NULL,
-                    total REAL NOT NULL,
+                    subtotal INTEGER NOT NULL,
+                    iva INTEGER NOT NULL,
+                    total INTEGER NOT NULL,
                     usuario_id INTEGER NOT NULL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (usuario_id) REFERENCES usuarios (id)
@@ -163,8 +198,8 @@ class Database:
                     venta_id INTEGER NOT NULL,
                     producto_id INTEGER NOT NULL,
                     cantidad INTEGER NOT NULL,
-                    precio_unitario REAL NOT NULL,
-                    total_linea REAL NOT NULL,
+                    precio_unitario INTEGER NOT NULL,
+                    total_linea INTEGER NOT NULL,
                     FOREIGN KEY (venta_id) REFERENCES ventas (id),
                     FOREIGN KEY (producto_id) REFERENCES productos (id)
                 )
@@ -177,9 +212,9 @@ class Database:
                     numero_factura TEXT UNIQUE NOT NULL,
                     fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     proveedor_id INTEGER NOT NULL,
-                    subtotal REAL NOT NULL,
-                    iva REAL NOT NULL,
-                    total REAL NOT NULL,
+                    subtotal INTEGER NOT NULL,
+                    iva INTEGER NOT NULL,
+                    total INTEGER NOT NULL,
                     usuario_id INTEGER NOT NULL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (proveedor_id) REFERENCES proveedores (id),
@@ -194,8 +229,8 @@ class Database:
                     compra_id INTEGER NOT NULL,
                     producto_id INTEGER NOT NULL,
                     cantidad INTEGER NOT NULL,
-                    precio_unitario REAL NOT NULL,
-                    total_linea REAL NOT NULL,
+                    precio_unitario INTEGER NOT NULL,
+                    total_linea INTEGER NOT NULL,
                     FOREIGN KEY (compra_id) REFERENCES compras (id),
                     FOREIGN KEY (producto_id) REFERENCES productos (id)
                 )
@@ -232,8 +267,50 @@ class Database:
             logger.error(f"Error al crear tablas: {e}")
             raise
     
+    def _run_migrations(self):
+        """Aplicar migraciones de esquema pendientes"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    name VARCHAR(191) PRIMARY KEY,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            conn.commit()
+
+            cursor.execute("SELECT name FROM schema_migrations")
+            self._applied_migrations = {
+                row['name'] if isinstance(row, dict) else row[0] for row in cursor.fetchall()
+            }
+
+            for name, migration in MIGRATIONS:
+                if name in self._applied_migrations:
+                    continue
+                try:
+                    migration(cursor, self.is_mysql)
+                    cursor.execute(
+                        self.adapt_query("INSERT INTO schema_migrations (name) VALUES (?)"), (name,)
+                    )
+                    conn.commit()
+                    self._applied_migrations.add(name)
+                    logger.info(f"Migración aplicada: {name}")
+                except Exception as e:
+                    # Una migración fallida no impide iniciar; se reintenta en el próximo arranque
+                    conn.rollback()
+                    logger.warning(f"No se pudo aplicar la migración {name}: {e}")
+        finally:
+            conn.close()
+
+    def has_migration(self, name: str) -> bool:
+        """Indica si una migración de esquema fue aplicada"""
+        self._ensure_ready()
+        return name in self._applied_migrations
+
     def get_connection(self):
         """Obtener conexión a la base de datos"""
+        self._ensure_ready()
         try:
             if env.database_type == 'mysql' and _HAS_PYMYSQL:
                 # Conectar a la base de datos MySQL y devolver connection con DictCursor
@@ -253,21 +330,165 @@ class Database:
             logger.error(f"Error al conectar a la base de datos: {e}")
             raise
     
+    def _open_read_connection(self):
+        """Abrir una conexión para el pool de lectura (filas como tuplas)"""
+        if self.is_mysql:
+            # autocommit: cada SELECT ve los datos confirmados más recientes
+            return pymysql.connect(host=env.mysql_host, port=env.mysql_port,
+                                   user=env.mysql_user, password=env.mysql_password,
+                                   database=env.mysql_database, autocommit=True)
+        # Se usa desde los hilos del pool de vistas, pero nunca por dos a la vez
+        conn = sqlite3.connect(env.database_path, check_same_thread=False)
+        conn.execute("PRAGMA query_only = 1")
+        return conn
+
+    @contextmanager
+    def read_connection(self):
+        """Conexión de solo lectura reutilizable (se devuelve al pool al salir).
+
+        Si todas están ocupadas se abre una más; al devolverla solo se conservan
+        settings.DB_READ_POOL_SIZE conexiones inactivas.
+        """
+        self._ensure_ready()
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            conn = self._open_read_connection()
+        try:
+            yield conn
+        except GeneratorExit:
+            # La usaba un generador cerrado antes de terminar (p. ej. iter_batches)
+            self._release_read_connection(conn)
+            raise
+        except Exception:
+            # Estado desconocido (p. ej. servidor caído): no se reutiliza
+            conn.close()
+            raise
+        self._release_read_connection(conn)
+
+    def _release_read_connection(self, conn):
+        if self._read_pool.qsize() < settings.DB_READ_POOL_SIZE:
+            self._read_pool.put(conn)
+        else:
+            conn.close()
+
+    def close_read_connections(self):
+        """Cerrar las conexiones inactivas del pool de lectura"""
+        while True:
+            try:
+                self._read_pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def get_data_version(self, table: str) -> int:
+        """Obtener el contador de versión de datos de una tabla.
+
+        Las cachés en memoria comparan este contador para saber si deben
+        refrescarse sin consultar la base de datos.
+        """
+        return self._data_versions[table]
+
+    def bump_data_version(self, table: str) -> int:
+        """Incrementar la versión de datos de una tabla tras una escritura"""
+        with self._versions_lock:
+            self._data_versions[table] += 1
+            return self._data_versions[table]
+
+    @property
+    def is_mysql(self) -> bool:
+        """Indica si el backend activo es MySQL"""
+        return env.database_type == 'mysql' and _HAS_PYMYSQL
+
+    def adapt_query(self, query: str) -> str:
+        """Adaptar placeholders de una consulta al backend activo.
+
+        PyMySQL usa %s como placeholder; sqlite3 usa ? -- asumimos que las consultas
+        en el código usan ? (sqlite). Para compatibilidad simple, si usamos MySQL
+        convertimos placeholders '?' -> '%s' en el query.
+        """
+        if self.is_mysql and '?' in query:
+            return query.replace('?', '%s')
+        return query
+
+    def query_rows(self, query, params=()):
+        """Ejecutar SELECT y retornar (columnas, filas como tuplas).
+
+        Evita construir un dict por fila; los repositorios mapean las tuplas
+        por índice de columna. Usa una conexión del pool de lectura.
+        """
+        try:
+            with self.read_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(self.adapt_query(query), params)
+                    columns = tuple(d[0] for d in cursor.description)
+                    return columns, cursor.fetchall()
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.error(f"Error en consulta: {e}")
+            raise
+
+    def iter_batches(self, query, params=(), batch_size=1000):
+        """Ejecutar SELECT y entregar las filas (tuplas) en lotes de fetchmany.
+
+        Solo hay un lote en memoria a la vez; en MySQL se usa un cursor sin
+        buffer. La conexión de lectura queda ocupada mientras se recorre el
+        generador; cerrarlo antes de tiempo la devuelve al pool.
+        """
+        with self.read_connection() as conn:
+            cursor = conn.cursor(pymysql.cursors.SSCursor) if self.is_mysql else conn.cursor()
+            try:
+                cursor.execute(self.adapt_query(query), params)
+                while True:
+                    filas = cursor.fetchmany(batch_size)
+                    if not filas:
+                        break
+                    yield filas
+            finally:
+                cursor.close()
+
+    def query_columns(self, query, params=(), dtypes=None, batch_size=10000):
+        """Ejecutar SELECT y retornar {columna: numpy.ndarray}.
+
+        Las filas se leen en lotes con fetchmany y cada lote se convierte por
+        columna al dtype indicado en `dtypes` (o el que infiera numpy). Los
+        NULL quedan como NaN / NaT en columnas float y datetime64.
+        """
+        import numpy as np  # solo reportes; fuera del arranque
+
+        dtypes = dtypes or {}
+        try:
+            with self.read_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(self.adapt_query(query), params)
+                    columns = [d[0] for d in cursor.description]
+                    partes = {c: [] for c in columns}
+                    while True:
+                        filas = cursor.fetchmany(batch_size)
+                        if not filas:
+                            break
+                        for columna, valores in zip(columns, zip(*filas)):
+                            partes[columna].append(np.array(valores, dtype=dtypes.get(columna)))
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.error(f"Error en consulta: {e}")
+            raise
+
+        return {
+            c: np.concatenate(p) if p else np.array([], dtype=dtypes.get(c, float))
+            for c, p in partes.items()
+        }
+
     def execute_query(self, query, params=()):
         """Ejecutar consulta y retornar resultados"""
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            # PyMySQL usa %s como placeholder; sqlite3 usa ? -- asumimos que las consultas
-            # en el código usan ? (sqlite). Para compatibilidad simple, si usamos MySQL
-            # convertimos placeholders '?' -> '%s' en el query.
-            use_mysql = env.database_type == 'mysql' and _HAS_PYMYSQL
-            if use_mysql:
-                # Reemplazar todos los '?' por '%s' salvo si ya hay '%s'
-                if '?' in query:
-                    query = query.replace('?', '%s')
-
+            query = self.adapt_query(query)
             cursor.execute(query, params)
 
             if query.strip().upper().startswith('SELECT'):
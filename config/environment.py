@@ -42,6 +42,11 @@ class Environment:
     def mysql_database(self):
         return os.getenv('APP_DB_NAME', 'donarosa')
     
+    @property
+    def profile_boot(self):
+        """Medición del arranque: '' (desactivada), '1' (tiempos) o 'cprofile'"""
+        return os.getenv('APP_PROFILE_BOOT', '')
+    
     @property
     def logs_path(self):
         return self.base_dir / 'data' / 'logs'
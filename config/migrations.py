@@ -0,0 +1,178 @@
+"""Migraciones de esquema aplicadas al iniciar la base de datos.
+
+Cada migración es un par (nombre, función). La función recibe el cursor de una
+conexión abierta y un indicador de backend MySQL, y debe ser idempotente. Las
+migraciones aplicadas se registran en la tabla `schema_migrations`.
+"""
+import re
+
+def _productos_fts(cursor, mysql: bool):
+    """Índice de texto completo sobre productos"""
+    if mysql:
+        cursor.execute(
+            "ALTER TABLE productos ADD FULLTEXT INDEX ft_productos (codigo, nombre, descripcion, categoria)"
+        )
+        return
+
+    # Tabla FTS5 de contenido externo: no duplica los datos, solo el índice.
+    # remove_diacritics 2 permite buscar "azucar" y encontrar "Azúcar".
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS productos_fts USING fts5(
+            codigo, nombre, descripcion, categoria,
+            content='productos', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    ''')
+
+    # Triggers que mantienen el índice sincronizado con productos
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS productos_fts_ai AFTER INSERT ON productos BEGIN
+            INSERT INTO productos_fts(rowid, codigo, nombre, descripcion, categoria)
+            VALUES (new.id, new.codigo, new.nombre, new.descripcion, new.categoria);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS productos_fts_ad AFTER DELETE ON productos BEGIN
+            INSERT INTO productos_fts(productos_fts, rowid, codigo, nombre, descripcion, categoria)
+            VALUES ('delete', old.id, old.codigo, old.nombre, old.descripcion, old.categoria);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS productos_fts_au
+        AFTER UPDATE OF codigo, nombre, descripcion, categoria ON productos BEGIN
+            INSERT INTO productos_fts(productos_fts, rowid, codigo, nombre, descripcion, categoria)
+            VALUES ('delete', old.id, old.codigo, old.nombre, old.descripcion, old.categoria);
+            INSERT INTO productos_fts(rowid, codigo, nombre, descripcion, categoria)
+            VALUES (new.id, new.codigo, new.nombre, new.descripcion, new.categoria);
+        END
+    ''')
+
+    # Indexar los productos existentes
+    cursor.execute("INSERT INTO productos_fts(productos_fts) VALUES ('rebuild')")
+
+def _historial_precios(cursor, mysql: bool):
+    """Auditoría de cambios de precio de venta"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS historial_precios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            producto_id INTEGER NOT NULL,
+            precio_anterior REAL NOT NULL,
+            precio_nuevo REAL NOT NULL,
+            motivo TEXT,
+            usuario_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (producto_id) REFERENCES productos (id)
+        )
+    ''')
+    si_no_existe = '' if mysql else 'IF NOT EXISTS '
+    cursor.execute(
+        f"CREATE INDEX {si_no_existe}idx_historial_precios_producto ON historial_precios (producto_id, created_at)"
+    )
+
+# Columnas de dinero que pasan de REAL a pesos enteros
+_MONTOS = {
+    'productos': ('precio_compra', 'precio_venta'),
+    'ventas': ('subtotal', 'iva', 'total'),
+    'detalle_ventas': ('precio_unitario', 'total_linea'),
+    'compras': ('subtotal', 'iva', 'total'),
+    'detalle_compras': ('precio_unitario', 'total_linea'),
+    'historial_precios': ('precio_anterior', 'precio_nuevo'),
+}
+
+def _reconstruir_sqlite(cursor, tabla: str, columnas):
+    """Recrear una tabla SQLite con columnas INTEGER en lugar de REAL.
+
+    SQLite no permite cambiar el tipo de una columna y la afinidad REAL vuelve
+    a convertir los enteros a float, así que se copia a una tabla nueva con el
+    mismo esquema (ids incluidos) y se restauran índices y triggers.
+    """
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (tabla,))
+    sql_tabla = cursor.fetchone()[0]
+    sql_nueva = sql_tabla
+    for columna in columnas:
+        sql_nueva = re.sub(rf"(\b{columna}\s+)REAL\b", r"\1INTEGER", sql_nueva, flags=re.IGNORECASE)
+    if sql_nueva == sql_tabla:
+        return  # ya creada con columnas enteras
+
+    cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (tabla,)
+    )
+    dependientes = [row[0] for row in cursor.fetchall()]
+    cursor.execute(f"PRAGMA table_info({tabla})")
+    todas = [row[1] for row in cursor.fetchall()]
+    seleccion = ', '.join(f"CAST(ROUND({c}) AS INTEGER)" if c in columnas else c for c in todas)
+
+    temporal = f"{tabla}_migracion"
+    cursor.execute(f"DROP TABLE IF EXISTS {temporal}")
+    cursor.execute(re.sub(rf"\b{tabla}\b", temporal, sql_nueva, count=1))
+    cursor.execute(f"INSERT INTO {temporal} ({', '.join(todas)}) SELECT {seleccion} FROM {tabla}")
+    cursor.execute(f"DROP TABLE {tabla}")
+    cursor.execute(f"ALTER TABLE {temporal} RENAME TO {tabla}")
+    for sql in dependientes:
+        cursor.execute(sql)
+
+def _montos_enteros(cursor, mysql: bool):
+    """Guardar precios, líneas y totales como pesos enteros"""
+    for tabla, columnas in _MONTOS.items():
+        if mysql:
+            cursor.execute(f"UPDATE {tabla} SET {', '.join(f'{c} = ROUND({c})' for c in columnas)}")
+            cursor.execute(f"ALTER TABLE {tabla} {', '.join(f'MODIFY {c} BIGINT NOT NULL' for c in columnas)}")
+        else:
+            _reconstruir_sqlite(cursor, tabla, columnas)
+
+    # Redondear cada columna por separado puede romper subtotal + iva = total por
+    # un peso; se conserva el total cobrado y el IVA absorbe la diferencia.
+    for tabla in ('ventas', 'compras'):
+        cursor.execute(f"UPDATE {tabla} SET iva = total - subtotal WHERE iva <> total - subtotal")
+
+def _fechas_canonicas(cursor, mysql: bool):
+    """Normalizar fechas-hora guardadas a 'YYYY-MM-DD HH:MM:SS'"""
+    if mysql:
+        return  # columnas DATETIME/TIMESTAMP nativas
+
+    # Valores enlazados desde Python quedaban con microsegundos y a veces con 'T'
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+    for tabla in [row[0] for row in cursor.fetchall()]:
+        cursor.execute(f"PRAGMA table_info({tabla})")
+        columnas = [row[1] for row in cursor.fetchall() if (row[2] or '').upper() in ('TIMESTAMP', 'DATETIME')]
+        for columna in columnas:
+            cursor.execute(f"UPDATE {tabla} SET {columna} = NULL WHERE {columna} = ''")
+            cursor.execute(f"""
+                UPDATE {tabla} SET {columna} = substr(replace({columna}, 'T', ' '), 1, 19)
+                WHERE length({columna}) > 19 OR {columna} LIKE '%T%'
+            """)
+
+def _indice_ventas_fecha(cursor, mysql: bool):
+    """Índice para listar ventas por fecha (ventas recientes, rangos)"""
+    si_no_existe = '' if mysql else 'IF NOT EXISTS '
+    cursor.execute(f"CREATE INDEX {si_no_existe}idx_ventas_fecha ON ventas (fecha)")
+
+def _indice_compras_fecha(cursor, mysql: bool):
+    """Índice para listar compras por fecha (resumen, paginación)"""
+    si_no_existe = '' if mysql else 'IF NOT EXISTS '
+    cursor.execute(f"CREATE INDEX {si_no_existe}idx_compras_fecha ON compras (fecha)")
+
+def _indices_paginacion(cursor, mysql: bool):
+    """Índices para los listados paginados por clave (orden, id).
+
+    El id queda incluido en cada índice (rowid en SQLite, clave primaria en
+    InnoDB), así que sirve de desempate sin columna extra.
+    """
+    si_no_existe = '' if mysql else 'IF NOT EXISTS '
+    cursor.execute(f"CREATE INDEX {si_no_existe}idx_movimientos_fecha ON inventario_movimientos (created_at)")
+    cursor.execute(
+        f"CREATE INDEX {si_no_existe}idx_movimientos_producto ON inventario_movimientos (producto_id, created_at)"
+    )
+
+# Orden de aplicación. No renombrar ni reordenar migraciones ya publicadas.
+MIGRATIONS = [
+    ('0001_productos_fts', _productos_fts),
+    ('0002_historial_precios', _historial_precios),
+    ('0003_montos_enteros', _montos_enteros),
+    ('0004_fechas_canonicas', _fechas_canonicas),
+    ('0005_indice_ventas_fecha', _indice_ventas_fecha),
+    ('0006_indice_compras_fecha', _indice_compras_fecha),
+    ('0007_indices_paginacion', _indices_paginacion),
+]
@@ -23,6 +23,12 @@ class Settings:
     IVA_PERCENT = 0.19  # 19% IVA
     STOCK_MINIMO = 10
     STOCK_MAXIMO = 100
+    
+    # Configuración de cachés
+    CATALOGO_CACHE_MAX = 20000  # productos en la caché del catálogo
+    VIEW_CACHE_MAX = 6  # vistas que el router conserva construidas (LRU)
+    DB_READ_POOL_SIZE = 4  # conexiones de lectura inactivas que se reutilizan
+    QUERY_CACHE_TTL = 30  # segundos de vida de los resultados en query_cache
 
 # Instancia global
 settings = Settings()
\ No newline at end of file
@@ -3,7 +3,7 @@ from models.usuario import Usuario
 from core.exceptions import AuthenticationError, ValidationError
 from core.logger import logger
 from core.security import security
-from datetime import datetime
+from core.timestamps import parse_timestamp
 
 class AuthService:
     """Servicio de autenticación y gestión de usuarios"""
@@ -39,7 +39,7 @@ class AuthService:
                 email=usuario_data['email'],
                 rol=usuario_data['rol'],
                 activo=usuario_data['activo'],
-                created_at=datetime.fromisoformat(usuario_data['created_at']) if usuario_data['created_at'] else None
+                created_at=parse_timestamp(usuario_data['created_at'])
             )
             
             cls._current_user = usuario
@@ -188,7 +188,7 @@ class AuthService:
                     email=usuario_data['email'],
                     rol=usuario_data['rol'],
                     activo=usuario_data['activo'],
-                    created_at=datetime.fromisoformat(usuario_data['created_at']) if usuario_data['created_at'] else None
+                    created_at=parse_timestamp(usuario_data['created_at'])
                 )
                 usuarios.append(usuario)
             
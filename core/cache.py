@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Sequence
+from config.database import db
+from config.settings import settings
+
+class TTLCache:
+    """Caché compartida de resultados de consultas.
+
+    Cada entrada vence a los `ttl` segundos o cuando avanza la versión de datos
+    (ver db.get_data_version) de alguna de las tablas de las que depende. Si
+    varios hilos piden la misma clave vencida, solo uno ejecuta la consulta y
+    el resto espera su resultado.
+    """
+
+    def __init__(self, ttl: float = settings.QUERY_CACHE_TTL, max_items: int = 256):
+        self.ttl = ttl
+        self.max_items = max_items
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _versions(tables: Sequence[str]) -> tuple:
+        return tuple(db.get_data_version(table) for table in tables)
+
+    def _lookup(self, key: Hashable, versions: tuple):
+        """Retornar (True, valor) si la entrada sigue vigente"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires, entry_versions, value = entry
+            if expires < time.monotonic() or entry_versions != versions:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], tables: Sequence[str] = (),
+                    ttl: float = None) -> Any:
+        """Obtener `key` de la caché o calcularla con loader()"""
+        versions = self._versions(tables)
+        found, value = self._lookup(key, versions)
+        if found:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Otro hilo pudo cargarla mientras se esperaba
+            found, value = self._lookup(key, versions)
+            if found:
+                return value
+            with self._lock:
+                self.misses += 1
+            value = loader()
+            expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+            with self._lock:
+                self._entries[key] = (expires, versions, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_items:
+                    old_key, _ = self._entries.popitem(last=False)
+                    self._key_locks.pop(old_key, None)
+            return value
+
+    def invalidate(self, key: Hashable = None):
+        """Eliminar una entrada (o todas si no se indica clave)"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+# Instancia global, compartida por todas las sesiones
+query_cache = TTLCache()
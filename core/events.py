@@ -0,0 +1,55 @@
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+from .logger import logger
+
+# Eventos de inventario emitidos al modificar el stock de un producto
+STOCK_ESTADO_CAMBIADO = 'stock.estado_cambiado'
+STOCK_BAJO_MINIMO = 'stock.bajo_minimo'
+STOCK_AGOTADO = 'stock.agotado'
+STOCK_SOBRE_MAXIMO = 'stock.sobre_maximo'
+
+class EventBus:
+    """Bus de eventos en proceso (publicación/suscripción síncrona)"""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[dict], Any]]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, event: str, handler: Callable[[dict], Any]) -> Callable[[], None]:
+        """Suscribir un handler a un evento. Retorna una función para desuscribirlo."""
+        with self._lock:
+            self._handlers[event].append(handler)
+        return lambda: self.unsubscribe(event, handler)
+
+    def unsubscribe(self, event: str, handler: Callable[[dict], Any]):
+        """Eliminar un handler de un evento"""
+        with self._lock:
+            handlers = self._handlers.get(event)
+            if handlers and handler in handlers:
+                handlers.remove(handler)
+
+    def publish(self, event: str, payload: Optional[dict] = None):
+        """Publicar un evento a todos sus suscriptores.
+
+        Los errores de un handler se registran y no interrumpen al publicador
+        ni al resto de suscriptores.
+        """
+        with self._lock:
+            handlers = list(self._handlers.get(event, ()))
+
+        data = dict(payload or {})
+        data['evento'] = event
+        for handler in handlers:
+            try:
+                handler(data)
+            except Exception as e:
+                logger.error(f"Error en handler del evento {event}: {e}")
+
+    def clear(self):
+        """Eliminar todas las suscripciones"""
+        with self._lock:
+            self._handlers.clear()
+
+# Instancia global
+event_bus = EventBus()
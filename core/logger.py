@@ -26,9 +26,10 @@ class Logger:
         console_handler.setLevel(logging.DEBUG)
         console_handler.setFormatter(formatter)
         
-        # Handler para archivo
+        # Handler para archivo (se abre con el primer mensaje, no al importar)
+        env.logs_path.mkdir(parents=True, exist_ok=True)
         log_file = env.logs_path / f"app_{datetime.now().strftime('%Y%m%d')}.log"
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler = logging.FileHandler(log_file, encoding='utf-8', delay=True)
         file_handler.setLevel(logging.INFO)
         file_handler.setFormatter(formatter)
         
@@ -0,0 +1,36 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+_PESO = Decimal(1)
+
+class Money:
+    """Montos en pesos enteros.
+
+    Precios, líneas y totales se guardan y suman como int (el peso no tiene
+    decimales). Las conversiones desde float/texto y el IVA se redondean al
+    peso más cercano con las mitades hacia arriba, no al par como round().
+    """
+
+    @staticmethod
+    def to_pesos(value) -> int:
+        """Convertir un número o texto a pesos enteros"""
+        if value is None or value == '':
+            return 0
+        if isinstance(value, int):
+            return int(value)
+        try:
+            return int(Decimal(str(value).strip()).quantize(_PESO, rounding=ROUND_HALF_UP))
+        except InvalidOperation:
+            raise ValueError(f"Monto inválido: {value}")
+
+    @staticmethod
+    def line_total(cantidad: int, precio_unitario: int) -> int:
+        """Total de una línea (cantidad × precio unitario)"""
+        return cantidad * Money.to_pesos(precio_unitario)
+
+    @staticmethod
+    def iva(neto: int, tasa: float) -> int:
+        """IVA de un monto neto, calculado sobre el total del documento"""
+        return int((Decimal(neto) * Decimal(str(tasa))).quantize(_PESO, rounding=ROUND_HALF_UP))
+
+# Instancia global
+money = Money()
@@ -0,0 +1,103 @@
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional
+from config.environment import env
+from config.settings import settings
+from core.logger import logger
+
+class BootProfiler:
+    """Medición de las fases de arranque de la aplicación.
+
+    Se activa con la variable de entorno APP_PROFILE_BOOT: '1' registra solo
+    tiempos y 'cprofile' además guarda un perfil .prof por cada fase de primer
+    nivel. Desactivado, `phase` no hace nada más que ceder el control.
+    """
+
+    def __init__(self, mode: str = None):
+        mode = (env.profile_boot if mode is None else mode).strip().lower()
+        self.enabled = mode not in ('', '0', 'false', 'no')
+        self.use_cprofile = mode == 'cprofile'
+        self._start = time.perf_counter()
+        self._phases: List[dict] = []
+        self._depth = 0
+        self._finished = False
+        self._stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    def _elapsed_ms(self, instant: float = None) -> float:
+        return round(((instant or time.perf_counter()) - self._start) * 1000, 2)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Medir una fase de arranque (se pueden anidar)"""
+        if not self.enabled or self._finished:
+            yield
+            return
+
+        record = {'name': name, 'level': self._depth, 'start_ms': self._elapsed_ms()}
+        self._phases.append(record)
+        profile = None
+        if self.use_cprofile and self._depth == 0:
+            import cProfile  # solo cuando se pide el perfil detallado
+            profile = cProfile.Profile()
+            profile.enable()
+        self._depth += 1
+        begin = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            record['error'] = str(e)
+            raise
+        finally:
+            record['duration_ms'] = round((time.perf_counter() - begin) * 1000, 2)
+            self._depth -= 1
+            if profile:
+                profile.disable()
+                record['profile'] = self._dump_profile(profile, name)
+
+    def mark(self, name: str):
+        """Registrar un instante sin duración (p. ej. primera ventana visible)"""
+        if self.enabled and not self._finished:
+            self._phases.append({'name': name, 'level': self._depth, 'start_ms': self._elapsed_ms(),
+                                 'duration_ms': 0.0, 'mark': True})
+
+    def _dump_profile(self, profile, name: str) -> Optional[str]:
+        """Guardar el perfil cProfile de una fase y devolver el nombre del archivo"""
+        try:
+            env.logs_path.mkdir(parents=True, exist_ok=True)
+            path = env.logs_path / f"boot_{self._stamp}_{name}.prof"
+            profile.dump_stats(str(path))
+            return path.name
+        except Exception as e:
+            logger.warning(f"No se pudo guardar el perfil de {name}: {e}")
+            return None
+
+    def finish(self):
+        """Cerrar la medición y escribir la línea de tiempo en env.logs_path"""
+        if not self.enabled or self._finished:
+            return None
+        self._finished = True
+        total_ms = self._elapsed_ms()
+        timeline = {
+            'version': settings.APP_VERSION,
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'mode': 'cprofile' if self.use_cprofile else 'time',
+            'total_ms': total_ms,
+            'phases': self._phases,
+        }
+        try:
+            env.logs_path.mkdir(parents=True, exist_ok=True)
+            path = env.logs_path / f"boot_{self._stamp}.json"
+            path.write_text(json.dumps(timeline, indent=2, ensure_ascii=False), encoding='utf-8')
+        except Exception as e:
+            logger.warning(f"No se pudo guardar la línea de tiempo de arranque: {e}")
+            return None
+
+        resumen = ', '.join(f"{p['name']} {p['duration_ms']:.0f} ms" for p in self._phases
+                           if p['level'] == 0 and not p.get('mark'))
+        logger.info(f"Arranque en {total_ms:.0f} ms ({resumen}) -> {path.name}")
+        return path
+
+# Instancia global
+boot_profiler = BootProfiler()
@@ -0,0 +1,289 @@
+import dataclasses
+import threading
+import typing
+from array import array
+from collections import abc
+from datetime import date, datetime
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+from core.timestamps import parse_timestamp
+
+def _to_date(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+class RowMapper:
+    """Compilador de mappers fila → modelo.
+
+    Para cada (modelo, columnas) se genera una función que construye el modelo
+    leyendo la tupla por índice, con las conversiones resueltas de antemano
+    según el tipo declarado en el dataclass. Las columnas que no existen en el
+    modelo (p.ej. nombres de JOIN) se ignoran, igual que las indicadas en
+    `skip`: el campo queda con su valor por defecto y no se decodifica.
+    """
+
+    def __init__(self):
+        self._cache: Dict[Tuple[type, Tuple[str, ...], FrozenSet[str]], Callable[[Sequence], Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _tipo_base(tipo):
+        """Retornar (tipo sin Optional[...], si admite None)"""
+        if typing.get_origin(tipo) is typing.Union:
+            args = [a for a in typing.get_args(tipo) if a is not type(None)]
+            if len(args) == 1:
+                return args[0], True
+        return tipo, False
+
+    def _compilar(self, model: type, columns: Tuple[str, ...], skip: FrozenSet[str]) -> Callable[[Sequence], Any]:
+        campos = {f.name: f for f in dataclasses.fields(model) if f.init}
+        argumentos = []
+        for i, columna in enumerate(columns):
+            campo = campos.get(columna)
+            if campo is None or columna in skip:
+                continue
+            tipo, opcional = self._tipo_base(campo.type)
+            valor = f"row[{i}]"
+            if tipo is datetime:
+                # Texto canónico de SQLite: fromisoformat directo (C); el resto
+                # (None, datetime de MySQL, bytes) pasa por parse_timestamp
+                expr = f"(_fromiso({valor}) if {valor}.__class__ is str and {valor} else _to_datetime({valor}))"
+            elif tipo is date:
+                expr = f"_to_date({valor})"
+            elif opcional:
+                expr = valor
+            elif tipo is bool:
+                expr = f"bool({valor})"
+            elif tipo is float:
+                expr = f"float({valor} or 0)"
+            elif tipo is str:
+                expr = f"({valor} or '')"
+            else:
+                expr = valor
+            argumentos.append(f"{columna}={expr}")
+
+        fuente = f"def mapper(row):\n    return _model({', '.join(argumentos)})\n"
+        espacio = {
+            '_model': model, '_fromiso': datetime.fromisoformat,
+            '_to_datetime': parse_timestamp, '_to_date': _to_date,
+        }
+        exec(compile(fuente, f"<mapper {model.__name__}>", 'exec'), espacio)
+        return espacio['mapper']
+
+    def get(self, model: type, columns: Tuple[str, ...], skip: Iterable[str] = ()) -> Callable[[Sequence], Any]:
+        """Obtener (o compilar) el mapper para un modelo y un conjunto de columnas"""
+        key = (model, columns, frozenset(skip))
+        mapper = self._cache.get(key)
+        if mapper is None:
+            with self._lock:
+                mapper = self._cache.get(key)
+                if mapper is None:
+                    mapper = self._compilar(model, columns, key[2])
+                    self._cache[key] = mapper
+        return mapper
+
+    def map_rows(self, model: type, columns: Tuple[str, ...], rows: Iterable[Sequence], skip: Iterable[str] = ()) -> List[Any]:
+        mapper = self.get(model, columns, skip)
+        return [mapper(row) for row in rows]
+
+# Instancia global
+row_mapper = RowMapper()
+
+# Columnas numéricas no nulas se guardan en buffers compactos. Se usa `array`
+# y no numpy (que solo cargan los reportes) porque este módulo se importa al
+# iniciar y porque al leer una fila `array` entrega int/float de Python, que
+# es lo que esperan los modelos.
+_TYPECODES = {bool: 'b', int: 'q', float: 'd'}
+
+def _buffer(tipo, valores):
+    typecode = _TYPECODES.get(tipo)
+    if typecode is not None:
+        try:
+            return array(typecode, valores)
+        except (TypeError, OverflowError):
+            pass  # NULLs o tipos mixtos
+    # Valores repetidos (categorías, fechas de carga, textos vacíos) comparten objeto
+    unicos = {}
+    return [unicos.setdefault(v, v) for v in valores]
+
+class ColumnarResult(abc.Sequence):
+    """Resultado de consulta almacenado por columnas.
+
+    Cada columna numérica vive en un `array` y el resto en una lista, sin
+    objetos por fila. Los modelos se construyen recién al acceder a una fila,
+    por lo que se puede usar como una lista de modelos (índices, slices,
+    iteración) o leer columnas completas con `column()`.
+    """
+
+    def __init__(self, model: type, columns: Sequence[str], rows: Sequence[Sequence], skip: Iterable[str] = ()):
+        self.model = model
+        self.columns = tuple(columns)
+        self._posiciones = {c: i for i, c in enumerate(self.columns)}
+        self._mapper = row_mapper.get(model, self.columns, skip)
+        tipos = {f.name: RowMapper._tipo_base(f.type)[0] for f in dataclasses.fields(model)}
+        valores = list(zip(*rows)) or [()] * len(self.columns)
+        self._data = [_buffer(tipos.get(c), col) for c, col in zip(self.columns, valores)]
+        self._len = len(rows)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("índice fuera de rango")
+        return self._mapper(tuple(col[index] for col in self._data))
+
+    def __iter__(self):
+        mapper = self._mapper
+        for row in zip(*self._data):
+            yield mapper(row)
+
+    def column(self, name: str) -> Sequence:
+        """Valores crudos de una columna (sin construir modelos)"""
+        return self._data[self._posiciones[name]]
+
+def column_values(items: Iterable[Any], name: str) -> Sequence:
+    """Valores de un atributo para una lista de modelos o un ColumnarResult"""
+    if isinstance(items, ColumnarResult):
+        return items.column(name)
+    return [getattr(item, name) for item in items]
+
+class Repository:
+    """Repositorio genérico de una tabla mapeada a un dataclass.
+
+    Las sentencias SQL se generan una vez por operación y conjunto de campos y
+    se reutilizan. Las lecturas usan `db.query_rows` (tuplas + columnas) y los
+    mappers compilados de `row_mapper`. Los campos del modelo con
+    metadata {'join': True} se leen de consultas con JOIN pero no se persisten.
+    """
+
+    def __init__(self, database, table: str, model: type = None, columns: Optional[Sequence[str]] = None):
+        self.db = database
+        self.table = table
+        self.model = model
+        if columns is None and model is not None:
+            columns = [
+                f.name for f in dataclasses.fields(model)
+                if f.init and f.name not in ('id', 'created_at') and f.default_factory is dataclasses.MISSING
+                and not f.metadata.get('join')
+            ]
+        self.columns = tuple(columns or ())
+        self._sql: Dict[tuple, str] = {}
+
+    def _cached_sql(self, key: tuple, builder: Callable[[], str]) -> str:
+        sql = self._sql.get(key)
+        if sql is None:
+            sql = self.db.adapt_query(builder())
+            self._sql[key] = sql
+        return sql
+
+    # --- Lecturas ---
+
+    def query(self, sql: str, params: Sequence = (), model: type = None, skip: Iterable[str] = ()) -> List[Any]:
+        """Ejecutar un SELECT arbitrario y mapear las filas al modelo.
+
+        `skip`: columnas que el llamador no usa; no se decodifican.
+        """
+        columns, rows = self.db.query_rows(sql, params)
+        return row_mapper.map_rows(model or self.model, columns, rows, skip)
+
+    def query_columnar(self, sql: str, params: Sequence = (), model: type = None, skip: Iterable[str] = ()) -> ColumnarResult:
+        """Como `query`, pero retornando un ColumnarResult (para listados grandes)"""
+        columns, rows = self.db.query_rows(sql, params)
+        return ColumnarResult(model or self.model, columns, rows, skip)
+
+    def _select_sql(self, where: Optional[str], order_by: Optional[str], limit: bool) -> str:
+        return self._cached_sql(('select', where, order_by, limit), lambda: (
+            f"SELECT * FROM {self.table}"
+            + (f" WHERE {where}" if where else "")
+            + (f" ORDER BY {order_by}" if order_by else "")
+            + (" LIMIT ?" if limit else "")
+        ))
+
+    def find_all(self, where: str = None, params: Sequence = (), order_by: str = None, limit: int = None,
+                 skip: Iterable[str] = ()) -> List[Any]:
+        """Obtener filas que cumplan una condición"""
+        sql = self._select_sql(where, order_by, limit is not None)
+        if limit is not None:
+            params = tuple(params) + (limit,)
+        return self.query(sql, params, skip=skip)
+
+    def find_columnar(self, where: str = None, params: Sequence = (), order_by: str = None,
+                      skip: Iterable[str] = ()) -> ColumnarResult:
+        """Como `find_all`, pero retornando un ColumnarResult"""
+        return self.query_columnar(self._select_sql(where, order_by, False), params, skip=skip)
+
+    @staticmethod
+    def keyset_condition(key: Tuple[str, str], after: Optional[Sequence], descending: bool = True) -> Tuple[str, tuple]:
+        """Condición SQL para seguir un listado después del cursor `after`.
+
+        `key` es (columna de orden, columna de desempate única), p.ej.
+        ('fecha', 'id'); `after` son sus valores en la última fila ya leída.
+        """
+        if after is None:
+            return "", ()
+        col, tie = key
+        op = '<' if descending else '>'
+        return f"({col} {op} ? OR ({col} = ? AND {tie} {op} ?))", (after[0], after[0], after[1])
+
+    def find_page(self, key: Tuple[str, str] = ('fecha', 'id'), after: Optional[Sequence] = None,
+                  limit: int = 100, where: str = None, params: Sequence = (), descending: bool = True,
+                  skip: Iterable[str] = ()) -> List[Any]:
+        """Página de un listado por keyset: las `limit` filas siguientes a `after`.
+
+        A diferencia de OFFSET, el costo no crece con la página: la condición
+        usa el mismo índice que el ORDER BY.
+        """
+        cursor, cursor_params = self.keyset_condition(key, after, descending)
+        where = " AND ".join(c for c in (where, cursor) if c) or None
+        direction = "DESC" if descending else "ASC"
+        return self.find_all(
+            where, tuple(params) + cursor_params, order_by=f"{key[0]} {direction}, {key[1]} {direction}",
+            limit=limit, skip=skip
+        )
+
+    def find_one(self, where: str, params: Sequence = ()) -> Optional[Any]:
+        result = self.find_all(where, params, limit=1)
+        return result[0] if result else None
+
+    def get(self, entity_id: int) -> Optional[Any]:
+        """Obtener por id"""
+        return self.find_one("id = ?", (entity_id,))
+
+    # --- Escrituras ---
+
+    def insert_sql(self, fields: Tuple[str, ...]) -> str:
+        return self._cached_sql(('insert', fields), lambda: (
+            f"INSERT INTO {self.table} ({', '.join(fields)}) VALUES ({', '.join('?' for _ in fields)})"
+        ))
+
+    def update_sql(self, fields: Tuple[str, ...]) -> str:
+        return self._cached_sql(('update', fields), lambda: (
+            f"UPDATE {self.table} SET {', '.join(f'{f} = ?' for f in fields)} WHERE id = ?"
+        ))
+
+    def insert(self, values: Dict[str, Any]) -> int:
+        """Insertar una fila y retornar su id"""
+        fields = tuple(values)
+        return self.db.execute_query(self.insert_sql(fields), tuple(values.values()))
+
+    def insert_entity(self, entity: Any, fields: Sequence[str] = None) -> int:
+        """Insertar un modelo usando las columnas del repositorio"""
+        fields = tuple(fields or self.columns)
+        return self.db.execute_query(
+            self.insert_sql(fields), tuple(getattr(entity, f) for f in fields)
+        )
+
+    def update(self, entity_id: int, values: Dict[str, Any]) -> None:
+        """Actualizar campos de una fila (sentencia cacheada por conjunto de campos)"""
+        fields = tuple(sorted(values))
+        params = tuple(values[f] for f in fields) + (entity_id,)
+        self.db.execute_query(self.update_sql(fields), params)
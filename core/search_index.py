@@ -0,0 +1,145 @@
+import re
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from .utils import utils
+
+_SEPARADORES = re.compile(r'[^\w]+')
+
+def _normalize(text: str) -> str:
+    """Texto normalizado con palabras separadas por un espacio"""
+    if not text:
+        return ''
+    text = text.lower() if text.isascii() else utils.normalize_text(text)
+    return ' '.join(_SEPARADORES.sub(' ', text).split())
+
+class SearchIndex:
+    """Índice en memoria para búsqueda incremental mientras se escribe.
+
+    Cada elemento se indexa por los prefijos (1 a PREFIX_LEN caracteres) de las
+    palabras de sus campos normalizados. Una palabra de la consulta coincide si
+    es prefijo de alguna palabra del elemento, de modo que al extender la
+    consulta los resultados se obtienen filtrando los de la consulta anterior.
+
+    Orden de los resultados: el primer campo (p.ej. el código) empieza con la
+    consulta, otro campo empieza con la consulta, resto; luego orden de carga.
+    """
+
+    PREFIX_LEN = 3
+
+    # Marcas de los prefijos de inicio de campo y de inicio del primer campo
+    _CAMPO = '\t'
+    _PRIMERO = '\t\t'
+
+    def __init__(self, fields: Callable[[Any], Sequence[str]], key: Callable[[Any], Any] = lambda item: item.id):
+        self._fields = fields
+        self._key = key
+        self._items: List[Any] = []
+        self._firma: List[tuple] = []
+        self._texts: List[str] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._last_query: Optional[str] = None
+        self._last_matches: Optional[List[int]] = None
+
+    def __len__(self):
+        return len(self._items)
+
+    def load(self, items: Sequence[Any]) -> bool:
+        """Cargar elementos. Retorna True si el índice tuvo que reconstruirse.
+
+        Si las claves y los textos no cambiaron (p.ej. solo cambió el stock) se
+        reemplazan los elementos sin reindexar.
+        """
+        firma = [(self._key(item), tuple(self._fields(item))) for item in items]
+        self._items = list(items)
+        self._last_query = None
+        self._last_matches = None
+        if firma == self._firma:
+            return False
+
+        postings = defaultdict(set)
+        texts = []
+        n = self.PREFIX_LEN
+        for pos, (_, fields) in enumerate(firma):
+            campos = [_normalize(field) for field in fields]
+            texts.append('\t ' + '\t '.join(campos))
+            for i, campo in enumerate(campos):
+                for j, word in enumerate(campo.split()):
+                    for k in range(1, min(len(word), n) + 1):
+                        prefix = word[:k]
+                        postings[prefix].add(pos)
+                        if j == 0:
+                            postings[self._CAMPO + prefix].add(pos)
+                            if i == 0:
+                                postings[self._PRIMERO + prefix].add(pos)
+
+        self._texts = texts
+        self._firma = firma
+        self._postings = {prefix: sorted(positions) for prefix, positions in postings.items()}
+        return True
+
+    def search(self, query: str, limit: int = 50) -> List[Any]:
+        """Buscar elementos y retornar los `limit` mejores"""
+        tokens = _normalize(query).split()
+        if not tokens:
+            self._last_query = None
+            self._last_matches = None
+            return self._items[:limit]
+
+        consulta = ' '.join(tokens)
+        n = self.PREFIX_LEN
+
+        if len(tokens) == 1 and len(tokens[0]) <= n:
+            # La lista de prefijos ya es exacta: no hace falta filtrar
+            matches = self._postings.get(tokens[0], [])
+        else:
+            listas = [self._postings.get(token[:n], []) for token in tokens]
+            if self._last_matches is not None and consulta.startswith(self._last_query):
+                # La consulta extiende a la anterior: basta con filtrar sus coincidencias
+                listas.append(self._last_matches)
+            candidatos = min(listas, key=len)
+            texts = self._texts
+            patron, *resto = [' ' + token for token in tokens]
+            matches = [pos for pos in candidatos if patron in texts[pos]]
+            for patron in resto:
+                matches = [pos for pos in matches if patron in texts[pos]]
+
+        self._last_query = consulta
+        self._last_matches = matches
+        return [self._items[pos] for pos in self._top(tokens[0], matches, limit)]
+
+    def _top(self, token: str, matches: List[int], limit: int) -> List[int]:
+        """Seleccionar las `limit` mejores posiciones sin ordenar todas las coincidencias"""
+        if len(matches) <= limit:
+            niveles = [[], [], []]
+            for pos in matches:
+                niveles[self._nivel(token, pos)].append(pos)
+            return niveles[0] + niveles[1] + niveles[2]
+
+        # Las listas de inicio de campo están ordenadas por posición: se recorren
+        # por nivel y se corta en cuanto hay `limit` resultados
+        prefix = token[:self.PREFIX_LEN]
+        exacto = prefix == token
+        coincidencias = None if matches is self._postings.get(token) else set(matches)
+        elegidos = []
+        vistos = set()
+        for nivel, lista in ((0, self._postings.get(self._PRIMERO + prefix, [])),
+                             (1, self._postings.get(self._CAMPO + prefix, [])),
+                             (2, matches)):
+            for pos in lista:
+                if pos in vistos or (coincidencias is not None and pos not in coincidencias):
+                    continue
+                if nivel < 2 and not exacto and self._nivel(token, pos) != nivel:
+                    continue
+                vistos.add(pos)
+                elegidos.append(pos)
+                if len(elegidos) == limit:
+                    return elegidos
+        return elegidos
+
+    def _nivel(self, token: str, pos: int) -> int:
+        text = self._texts[pos]
+        if text.startswith('\t ' + token):
+            return 0
+        if ('\t ' + token) in text:
+            return 1
+        return 2
@@ -0,0 +1,42 @@
+import sqlite3
+from datetime import date, datetime
+from typing import Optional
+
+# Formato canónico de fechas-hora guardadas (el mismo de CURRENT_TIMESTAMP)
+FORMATO = '%Y-%m-%d %H:%M:%S'
+
+# Valores repetidos (created_at de cargas masivas, fechas sin hora) se decodifican una vez
+_CACHE_MAX = 4096
+_cache = {}
+
+def format_timestamp(value: datetime) -> str:
+    """Fecha-hora en formato canónico 'YYYY-MM-DD HH:MM:SS'"""
+    return value.isoformat(sep=' ', timespec='seconds')
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """Decodificar una fecha-hora guardada (str, bytes, date o datetime)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, bytes):
+        value = value.decode()
+    resultado = _cache.get(value)
+    if resultado is None:
+        resultado = datetime.fromisoformat(value)
+        if len(_cache) >= _CACHE_MAX:
+            _cache.clear()
+        _cache[value] = resultado
+    return resultado
+
+def register_sqlite_adapters():
+    """Escribir datetime/date en formato canónico en todas las conexiones sqlite3.
+
+    Reemplaza el adaptador por defecto (isoformat con microsegundos, obsoleto
+    desde Python 3.12), de modo que los valores enlazados desde Python y los de
+    CURRENT_TIMESTAMP se guarden igual y se comparen bien como texto.
+    """
+    sqlite3.register_adapter(datetime, format_timestamp)
+    sqlite3.register_adapter(date, date.isoformat)
@@ -1,3 +1,4 @@
+import unicodedata
 import tkinter as tk
 from tkinter import messagebox
 from datetime import datetime, date
@@ -77,6 +78,14 @@ class Utils:
             return messagebox.askyesno(title, message, parent=parent)
         return None
     
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalizar texto para búsquedas (minúsculas, sin tildes)"""
+        if not text:
+            return ""
+        decomposed = unicodedata.normalize('NFKD', str(text).lower())
+        return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
     @staticmethod
     def validate_email(email: str) -> bool:
         """Validar formato de email"""
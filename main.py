@@ -9,22 +9,11 @@ from app.app_context import app_context
 from app.router import router
 from config.database import db
 from core.logger import logger
+from core.profiler import boot_profiler
 from data.seeds.seed_data import SeedData
 
-from ui.login.login_controller import LoginController
-from ui.login.login_view import LoginView
 from ui.styles.theme import apply_theme
 
-from modules.acerca_de.empresa_view import EmpresaView
-from modules.acerca_de.proveedores_view import ProveedoresView
-from modules.acerca_de.trabajadores_view import TrabajadoresView
-from modules.inicio.dashboard_view import DashboardView
-from modules.inventario.alerta_stock_view import AlertaStockView
-from modules.inventario.stock_view import StockView
-from modules.procesos.compra_view import CompraView
-from modules.procesos.resumen_view import ResumenView
-from modules.procesos.venta_view import VentaView
-
 class DoñaRosaApp:
 
     def __init__(self):
@@ -36,17 +25,25 @@ class DoñaRosaApp:
         try:
             logger.info("Iniciando aplicación Doña Rosa...")
 
-            SeedData.cargar_datos_iniciales()
+            with boot_profiler.phase('datos_iniciales'):
+                SeedData.cargar_datos_iniciales()
 
-            self._create_main_window()
+            with boot_profiler.phase('ventana_principal'):
+                self._create_main_window()
 
-            self._setup_routes()
+            with boot_profiler.phase('rutas'):
+                self._setup_routes()
 
-            router.navigate_to('login')
+            with boot_profiler.phase('navegacion_login'):
+                router.navigate_to('login')
 
             logger.info("Aplicación inicializada correctamente")
 
+            # La línea de tiempo se cierra cuando el bucle de eventos queda libre
+            self.root.after_idle(self._finish_boot_profile)
+
         except Exception as e:
+            boot_profiler.finish()
             logger.critical(f"Error crítico al inicializar aplicación: {e}")
             self._show_critical_error(e)
 
@@ -64,11 +61,13 @@ class DoñaRosaApp:
 
         # Aplicar tema global y responsividad
         try:
-            apply_theme(self.root)
+            with boot_profiler.phase('tema'):
+                apply_theme(self.root)
         except Exception:
             pass
 
-        self._set_window_icon()
+        with boot_profiler.phase('icono'):
+            self._set_window_icon()
 
         self.root.grid_rowconfigure(0, weight=1)
         self.root.grid_columnconfigure(1, weight=1)
@@ -87,6 +86,10 @@ class DoñaRosaApp:
         except Exception as e:
             logger.warning(f"No se pudo cargar el icono: {e}")
 
+    def _finish_boot_profile(self):
+        boot_profiler.mark('primer_ciclo_eventos')
+        boot_profiler.finish()
+
     def _center_window(self):
         self.root.update_idletasks()
         width = self.root.winfo_width()
@@ -96,17 +99,19 @@ class DoñaRosaApp:
         self.root.geometry(f"{width}x{height}+{x}+{y}")
 
     def _setup_routes(self):
-        router.register_route('login', LoginView, LoginController)
-
-        router.register_route('dashboard', DashboardView)
-        router.register_route('empresa', EmpresaView)
-        router.register_route('trabajadores', TrabajadoresView)
-        router.register_route('proveedores', ProveedoresView)
-        router.register_route('ventas', VentaView)
-        router.register_route('compras', CompraView)
-        router.register_route('resumen', ResumenView)
-        router.register_route('stock', StockView)
-        router.register_route('alertas', AlertaStockView)
+        # Las vistas se importan en la primera navegación a cada ruta
+        router.register_route('login', 'ui.login.login_view:LoginView',
+                              'ui.login.login_controller:LoginController', cache=False)
+
+        router.register_route('dashboard', 'modules.inicio.dashboard_view:DashboardView')
+        router.register_route('empresa', 'modules.acerca_de.empresa_view:EmpresaView')
+        router.register_route('trabajadores', 'modules.acerca_de.trabajadores_view:TrabajadoresView')
+        router.register_route('proveedores', 'modules.acerca_de.proveedores_view:ProveedoresView')
+        router.register_route('ventas', 'modules.procesos.venta_view:VentaView')
+        router.register_route('compras', 'modules.procesos.compra_view:CompraView')
+        router.register_route('resumen', 'modules.procesos.resumen_view:ResumenView')
+        router.register_route('stock', 'modules.inventario.stock_view:StockView')
+        router.register_route('alertas', 'modules.inventario.alerta_stock_view:AlertaStockView')
 
     def _create_menu_bar(self):
         from ui.components.menu_bar import MenuBar
@@ -1,33 +1,36 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, List
+from core.money import money
 
-@dataclass
+@dataclass(slots=True)
 class DetalleCompra:
     """Modelo de detalle de compra"""
     id: Optional[int] = None
     compra_id: Optional[int] = None
     producto_id: int = 0
     cantidad: int = 0
-    precio_unitario: float = 0.0
-    total_linea: float = 0.0
+    precio_unitario: int = 0
+    total_linea: int = 0
     
     def calcular_total(self):
         """Calcular total de la línea"""
-        self.total_linea = self.cantidad * self.precio_unitario
+        self.total_linea = money.line_total(self.cantidad, self.precio_unitario)
 
-@dataclass
+@dataclass(slots=True)
 class Compra:
     """Modelo de compra"""
     id: Optional[int] = None
     numero_factura: str = ""
     fecha: Optional[datetime] = None
     proveedor_id: int = 0
-    subtotal: float = 0.0
-    iva: float = 0.0
-    total: float = 0.0
+    subtotal: int = 0
+    iva: int = 0
+    total: int = 0
     usuario_id: int = 0
     created_at: Optional[datetime] = None
+    # Columna de JOIN con proveedores: se lee, no se persiste
+    proveedor_nombre: Optional[str] = field(default=None, metadata={'join': True})
     detalles: List[DetalleCompra] = field(default_factory=list)
     
     def agregar_detalle(self, detalle: DetalleCompra):
@@ -38,7 +41,7 @@ class Compra:
     def calcular_totales(self, iva_percent: float = 0.19):
         """Calcular subtotal, IVA y total"""
         self.subtotal = sum(detalle.total_linea for detalle in self.detalles)
-        self.iva = self.subtotal * iva_percent
+        self.iva = money.iva(self.subtotal, iva_percent)
         self.total = self.subtotal + self.iva
     
     def to_dict(self) -> dict:
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class InventarioMovimiento:
     """Modelo de movimiento de inventario"""
     id: Optional[int] = None
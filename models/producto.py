@@ -1,8 +1,10 @@
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
+from core.money import money
+from core.timestamps import parse_timestamp
 
-@dataclass
+@dataclass(slots=True)
 class Producto:
     """Modelo de producto"""
     id: Optional[int] = None
@@ -10,8 +12,8 @@ class Producto:
     nombre: str = ""
     descripcion: str = ""
     categoria: str = ""
-    precio_compra: float = 0.0
-    precio_venta: float = 0.0
+    precio_compra: int = 0
+    precio_venta: int = 0
     stock_actual: int = 0
     stock_minimo: int = 10
     stock_maximo: int = 100
@@ -59,7 +61,7 @@ class Producto:
         """Crear desde diccionario"""
         created_at = None
         if data.get('created_at'):
-            created_at = datetime.fromisoformat(data['created_at'])
+            created_at = parse_timestamp(data['created_at'])
         
         return cls(
             id=data.get('id'),
@@ -67,8 +69,8 @@ class Producto:
             nombre=data.get('nombre', ''),
             descripcion=data.get('descripcion', ''),
             categoria=data.get('categoria', ''),
-            precio_compra=float(data.get('precio_compra', 0)),
-            precio_venta=float(data.get('precio_venta', 0)),
+            precio_compra=money.to_pesos(data.get('precio_compra', 0)),
+            precio_venta=money.to_pesos(data.get('precio_venta', 0)),
             stock_actual=int(data.get('stock_actual', 0)),
             stock_minimo=int(data.get('stock_minimo', 10)),
             stock_maximo=int(data.get('stock_maximo', 100)),
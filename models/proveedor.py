@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
+from core.timestamps import parse_timestamp
 
 @dataclass
 class Proveedor:
@@ -34,7 +35,7 @@ class Proveedor:
         """Crear desde diccionario"""
         created_at = None
         if data.get('created_at'):
-            created_at = datetime.fromisoformat(data['created_at'])
+            created_at = parse_timestamp(data['created_at'])
         
         return cls(
             id=data.get('id'),
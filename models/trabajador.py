@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from datetime import datetime, date
 from typing import Optional
+from core.timestamps import parse_timestamp
 
 @dataclass
 class Trabajador:
@@ -46,7 +47,7 @@ class Trabajador:
         
         created_at = None
         if data.get('created_at'):
-            created_at = datetime.fromisoformat(data['created_at'])
+            created_at = parse_timestamp(data['created_at'])
         
         return cls(
             id=data.get('id'),
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
+from core.timestamps import parse_timestamp
 
 @dataclass
 class Usuario:
@@ -37,5 +38,5 @@ class Usuario:
             email=data.get('email', ''),
             rol=data.get('rol', 'trabajador'),
             activo=bool(data.get('activo', True)),
-            created_at=datetime.fromisoformat(data['created_at']) if data.get('created_at') else None
+            created_at=parse_timestamp(data.get('created_at'))
         )
\ No newline at end of file
@@ -1,22 +1,23 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, List
+from core.money import money
 
-@dataclass
+@dataclass(slots=True)
 class DetalleVenta:
     """Modelo de detalle de venta"""
     id: Optional[int] = None
     venta_id: Optional[int] = None
     producto_id: int = 0
     cantidad: int = 0
-    precio_unitario: float = 0.0
-    total_linea: float = 0.0
+    precio_unitario: int = 0
+    total_linea: int = 0
     
     def calcular_total(self):
         """Calcular total de la línea"""
-        self.total_linea = self.cantidad * self.precio_unitario
+        self.total_linea = money.line_total(self.cantidad, self.precio_unitario)
 
-@dataclass
+@dataclass(slots=True)
 class Venta:
     """Modelo de venta"""
     id: Optional[int] = None
@@ -24,9 +25,9 @@ class Venta:
     fecha: Optional[datetime] = None
     cliente_nombre: str = ""
     cliente_rut: str = ""
-    subtotal: float = 0.0
-    iva: float = 0.0
-    total: float = 0.0
+    subtotal: int = 0
+    iva: int = 0
+    total: int = 0
     usuario_id: int = 0
     created_at: Optional[datetime] = None
     detalles: List[DetalleVenta] = field(default_factory=list)
@@ -39,7 +40,7 @@ class Venta:
     def calcular_totales(self, iva_percent: float = 0.19):
         """Calcular subtotal, IVA y total"""
         self.subtotal = sum(detalle.total_linea for detalle in self.detalles)
-        self.iva = self.subtotal * iva_percent
+        self.iva = money.iva(self.subtotal, iva_percent)
         self.total = self.subtotal + self.iva
     
     def to_dict(self) -> dict:
@@ -139,7 +139,7 @@ class ProveedoresView(BaseView):
                     '_tags': 'success' if proveedor.activo else 'danger'
                 })
             
-            self.table.load_data(table_data)
+            self.table.load_data(table_data, id_key='id')
             
         except Exception as e:
             logger.error(f"Error cargando proveedores: {e}")
@@ -381,7 +381,7 @@ class ProveedoresView(BaseView):
                     '_tags': 'success' if proveedor.activo else 'danger'
                 })
             
-            self.table.load_data(table_data)
+            self.table.load_data(table_data, id_key='id')
             
         except Exception as e:
             logger.error(f"Error buscando proveedores: {e}")
@@ -173,7 +173,7 @@ class TrabajadoresView(BaseView):
                     '_tags': 'success' if trabajador.activo else 'danger'
                 })
             
-            self.table.load_data(table_data)
+            self.table.load_data(table_data, id_key='id')
             
         except Exception as e:
             logger.error(f"Error cargando trabajadores: {e}")
@@ -557,7 +557,7 @@ class TrabajadoresView(BaseView):
                     '_tags': 'success' if trabajador.activo else 'danger'
                 })
             
-            self.table.load_data(table_data)
+            self.table.load_data(table_data, id_key='id')
             
         except Exception as e:
             logger.error(f"Error buscando trabajadores: {e}")
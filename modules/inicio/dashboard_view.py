@@ -2,17 +2,21 @@ import tkinter as tk
 from tkinter import ttk
 from ui.components.table import CustomTable
 from ui.components.button import CustomButton
-from datetime import datetime, timedelta
+from datetime import datetime
 from app.base_view import BaseView
 from services.venta_service import VentaService
 from services.inventario_service import InventarioService
 from services.producto_service import ProductoService
+from core.cache import query_cache
 from core.utils import utils
 from core.logger import logger
 
 class DashboardView(BaseView):
     """Vista del Dashboard Principal"""
     
+    # Intervalo de revisión de datos nuevos mientras la vista está visible (ms)
+    REFRESH_MS = 15000
+    
     def _setup_view(self):
         """Configurar el dashboard"""
         # Título
@@ -44,9 +48,6 @@ class DashboardView(BaseView):
         
         # Productos bajos en stock
         self._create_low_stock_products(content_frame)
-        
-        # Cargar datos
-        self._load_dashboard_data()
     
     def _create_kpi_cards(self, parent):
         """Crear tarjetas de KPIs"""
@@ -172,99 +173,89 @@ class DashboardView(BaseView):
         self.stock_table = CustomTable(stock_frame, columns=columns, height=8, show_toolbar=False)
         self.stock_table.grid(row=1, column=0, sticky="nsew")
     
-    def _load_dashboard_data(self):
-        """Cargar datos del dashboard"""
-        try:
-            # KPIs principales
-            self._load_kpi_data()
-            
-            # Ventas recientes
-            self._load_recent_sales()
-            
-            # Productos bajos en stock
-            self._load_low_stock_products()
-            
-        except Exception as e:
-            logger.error(f"Error cargando datos del dashboard: {e}")
-            self.show_message("Error", "No se pudieron cargar los datos del dashboard", "error")
+    def _consultas(self) -> list:
+        """Consultas del dashboard: (clave, tablas de las que depende, consulta, mostrar, aviso de carga)"""
+        hoy = datetime.now().date()
+        inicio_hoy = datetime(hoy.year, hoy.month, hoy.day)
+        inicio_mes = datetime(hoy.year, hoy.month, 1)
+        fin_hoy = datetime(hoy.year, hoy.month, hoy.day, 23, 59, 59)
+        return [
+            (('ventas_hoy', hoy), ('ventas',),
+             lambda: VentaService.obtener_total_periodo(inicio_hoy, fin_hoy), self._load_sales_today, None),
+            (('ventas_mes', hoy), ('ventas',),
+             lambda: VentaService.obtener_total_periodo(inicio_mes, fin_hoy), self._load_monthly_sales, None),
+            (('valor_inventario',), ('productos',),
+             InventarioService.obtener_valor_inventario, self._load_inventory_value, None),
+            (('ventas_recientes',), ('ventas',),
+             lambda: VentaService.obtener_recientes(10), self._load_recent_sales, self.sales_table),
+            (('stock_bajo',), ('productos',),
+             ProductoService.obtener_productos_bajo_stock, self._load_low_stock_products, self.stock_table),
+        ]
     
-    def _load_kpi_data(self):
-        """Cargar datos de KPIs"""
-        try:
-            # Ventas de hoy
-            hoy = datetime.now().date()
-            ventas_hoy = VentaService.obtener_ventas_por_fecha(
-                datetime(hoy.year, hoy.month, hoy.day),
-                datetime(hoy.year, hoy.month, hoy.day, 23, 59, 59)
+    def _load_dashboard_data(self):
+        """Lanzar en paralelo las consultas cuyos datos cambiaron desde la última carga.
+        
+        Los resultados pasan por query_cache, compartida con otras sesiones, así
+        que volver al dashboard sin escrituras de por medio no consulta la base.
+        """
+        for clave, tablas, consulta, mostrar, aviso in self._consultas():
+            if not self.data_changed(*tablas, key=clave):
+                continue
+            cargar = lambda clave=clave, tablas=tablas, consulta=consulta: query_cache.get_or_load(
+                ('dashboard',) + clave, consulta, tablas
             )
-            total_hoy = sum(venta.total for venta in ventas_hoy)
-            self.sales_amount.config(text=utils.format_currency(total_hoy))
-            
-            # Productos bajos en stock
-            productos_bajos = ProductoService.obtener_productos_bajo_stock()
-            self.low_stock_count.config(text=str(len(productos_bajos)))
-            
-            # Valor del inventario
-            kpi_inventario = InventarioService.obtener_kpi_inventario()
-            self.inventory_value.config(text=utils.format_currency(kpi_inventario['valor_total']))
-            
-            # Ventas del mes
-            inicio_mes = datetime(hoy.year, hoy.month, 1)
-            fin_mes = datetime(hoy.year, hoy.month, hoy.day, 23, 59, 59)
-            ventas_mes = VentaService.obtener_ventas_por_fecha(inicio_mes, fin_mes)
-            total_mes = sum(venta.total for venta in ventas_mes)
-            self.monthly_sales.config(text=utils.format_currency(total_mes))
-            
-        except Exception as e:
-            logger.error(f"Error cargando KPIs: {e}")
+            self.run_async(clave[0], cargar, mostrar, loading=aviso,
+                           on_error=lambda e, clave=clave: self.forget_data_versions(clave))
+    
+    def _auto_refresh(self):
+        """Revisar periódicamente si hay datos nuevos mientras la vista está visible"""
+        self._refresh_job = None
+        self._load_dashboard_data()
+        self._refresh_job = self.after(self.REFRESH_MS, self._auto_refresh)
     
-    def _load_recent_sales(self):
-        """Cargar ventas recientes"""
-        try:
-            # Limpiar tabla
-            for item in self.sales_table.get_children():
-                self.sales_table.delete(item)
-            
-            # Obtener ventas de los últimos 7 días
-            fecha_inicio = datetime.now() - timedelta(days=7)
-            ventas = VentaService.obtener_ventas_por_fecha(fecha_inicio, datetime.now())
-            
-            # Mostrar las 10 más recientes
-            for venta in ventas[:10]:
-                fecha_str = venta.fecha.strftime("%d/%m %H:%M") if venta.fecha else ""
-                cliente = venta.cliente_nombre or "Consumidor Final"
-                
-                self.sales_table.insert("", "end", values=(
-                    fecha_str,
-                    venta.numero_boleta,
-                    cliente,
-                    utils.format_currency(venta.total)
-                ))
-                
-        except Exception as e:
-            logger.error(f"Error cargando ventas recientes: {e}")
+    def _stop_auto_refresh(self):
+        if getattr(self, '_refresh_job', None):
+            self.after_cancel(self._refresh_job)
+            self._refresh_job = None
     
-    def _load_low_stock_products(self):
-        """Cargar productos bajos en stock"""
-        try:
-            # Limpiar tabla
-            for item in self.stock_table.get_children():
-                self.stock_table.delete(item)
-            
-            productos = ProductoService.obtener_productos_bajo_stock()
-            
-            for producto in productos[:10]:  # Mostrar máximo 10
-                estado = "CRÍTICO" if producto.stock_actual == 0 else "BAJO"
-                
-                self.stock_table.insert("", "end", values=(
-                    producto.nombre,
-                    producto.stock_actual,
-                    producto.stock_minimo,
-                    estado
-                ))
-                
-        except Exception as e:
-            logger.error(f"Error cargando productos bajos en stock: {e}")
+    def _load_sales_today(self, total: int):
+        self.sales_amount.config(text=utils.format_currency(total))
+    
+    def _load_monthly_sales(self, total: int):
+        self.monthly_sales.config(text=utils.format_currency(total))
+    
+    def _load_inventory_value(self, valor: int):
+        self.inventory_value.config(text=utils.format_currency(valor))
+    
+    def _load_recent_sales(self, ventas: list):
+        """Mostrar ventas recientes (solo se actualizan las filas que cambian)"""
+        table_data = []
+        for venta in ventas:
+            table_data.append({
+                'id': venta.id,
+                'fecha': venta.fecha.strftime("%d/%m %H:%M") if venta.fecha else "",
+                'boleta': venta.numero_boleta,
+                'cliente': venta.cliente_nombre or "Consumidor Final",
+                'total': utils.format_currency(venta.total)
+            })
+        
+        self.sales_table.load_data(table_data, id_key='id')
+    
+    def _load_low_stock_products(self, productos: list):
+        """Mostrar productos bajos en stock y su KPI"""
+        self.low_stock_count.config(text=str(len(productos)))
+        
+        table_data = []
+        for producto in productos[:10]:  # Mostrar máximo 10
+            table_data.append({
+                'id': producto.id,
+                'producto': producto.nombre,
+                'stock': producto.stock_actual,
+                'minimo': producto.stock_minimo,
+                'estado': "CRÍTICO" if producto.stock_actual == 0 else "BAJO"
+            })
+        
+        self.stock_table.load_data(table_data, id_key='id')
     
     def _navigate_to_ventas(self):
         """Navegar a módulo de ventas"""
@@ -284,4 +275,14 @@ class DashboardView(BaseView):
     def on_show(self):
         """Cuando se muestra la vista"""
         super().on_show()
-        self._load_dashboard_data()
\ No newline at end of file
+        self._stop_auto_refresh()
+        self._auto_refresh()
+    
+    def on_hide(self):
+        """Cuando se oculta la vista"""
+        self._stop_auto_refresh()
+        # Las cargas que no alcanzaron a terminar se repiten al volver
+        for clave, *_ in self._consultas():
+            if clave[0] in self._async_futures:
+                self.forget_data_versions(clave)
+        super().on_hide()
\ No newline at end of file
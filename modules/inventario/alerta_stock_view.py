@@ -3,6 +3,7 @@ from tkinter import ttk
 from app.base_view import BaseView
 from services.producto_service import ProductoService
 from services.inventario_service import InventarioService
+from core.events import event_bus, STOCK_ESTADO_CAMBIADO
 from core.logger import logger
 from core.utils import utils
 from ui.components.table import CustomTable
@@ -10,8 +11,16 @@ from ui.components.table import CustomTable
 class AlertaStockView(BaseView):
     """Vista de alertas de stock"""
     
+    # Orden de la tabla: primero las alertas de mayor prioridad
+    PRIORIDADES = ('ALTA', 'MEDIA', 'BAJA')
+    
     def _setup_view(self):
         """Configurar vista de alertas"""
+        self._alertas = {}
+        self._conteos = {'STOCK_BAJO': 0, 'SIN_STOCK': 0, 'STOCK_EXCESIVO': 0}
+        self._por_prioridad = {prioridad: 0 for prioridad in self.PRIORIDADES}
+        self._unsubscribe = None
+        
         # Título
         self.create_title("⚠️ Alertas de Stock", 0, 0, columnspan=2)
         
@@ -30,9 +39,6 @@ class AlertaStockView(BaseView):
         
         # Tabla de productos con alertas
         self._create_alertas_table(main_frame)
-        
-        # Cargar datos
-        self._load_alertas()
     
     def _create_alert_kpis(self, parent):
         """Crear KPIs de alertas"""
@@ -100,28 +106,31 @@ class AlertaStockView(BaseView):
         self.table.add_context_menu(menu_items)
     
     def _load_alertas(self):
-        """Cargar alertas de stock"""
-        try:
-            # Obtener todos los productos activos
-            productos = ProductoService.obtener_todos(activos_only=True)
-            
-            # Filtrar productos con alertas
-            productos_con_alerta = []
-            
-            for producto in productos:
-                alerta = self._evaluar_alerta(producto)
-                if alerta:
-                    productos_con_alerta.append((producto, alerta))
-            
-            # Actualizar KPIs
-            self._actualizar_kpis(productos_con_alerta)
-            
-            # Actualizar tabla
-            self._actualizar_tabla_alertas(productos_con_alerta)
-            
-        except Exception as e:
-            logger.error(f"Error cargando alertas: {e}")
-            self.show_message("Error", "No se pudieron cargar las alertas de stock", "error")
+        """Cargar alertas de stock (consulta en segundo plano)"""
+        self.run_async('alertas', ProductoService.obtener_todos, self._mostrar_alertas, True,
+                       on_error=self._error_alertas, loading=self.table)
+    
+    def _mostrar_alertas(self, productos):
+        """Evaluar y mostrar las alertas de los productos activos"""
+        # Filtrar productos con alertas
+        productos_con_alerta = []
+        
+        for producto in productos:
+            alerta = self._evaluar_alerta(producto)
+            if alerta:
+                productos_con_alerta.append((producto, alerta))
+        
+        self._alertas = {producto.id: (producto, alerta) for producto, alerta in productos_con_alerta}
+        
+        # Actualizar KPIs
+        self._actualizar_kpis(productos_con_alerta)
+        
+        # Actualizar tabla
+        self._actualizar_tabla_alertas(productos_con_alerta)
+    
+    def _error_alertas(self, error: Exception):
+        """Avisar que no se pudieron cargar las alertas"""
+        self.show_message("Error", "No se pudieron cargar las alertas de stock", "error")
     
     def _evaluar_alerta(self, producto):
         """Evaluar si un producto tiene alerta y de qué tipo"""
@@ -153,47 +162,90 @@ class AlertaStockView(BaseView):
     
     def _actualizar_kpis(self, productos_con_alerta):
         """Actualizar KPIs de alertas"""
-        bajo_count = sum(1 for _, alerta in productos_con_alerta if alerta['tipo'] == 'STOCK_BAJO')
-        sin_count = sum(1 for _, alerta in productos_con_alerta if alerta['tipo'] == 'SIN_STOCK')
-        exceso_count = sum(1 for _, alerta in productos_con_alerta if alerta['tipo'] == 'STOCK_EXCESIVO')
+        self._conteos = {'STOCK_BAJO': 0, 'SIN_STOCK': 0, 'STOCK_EXCESIVO': 0}
+        for _, alerta in productos_con_alerta:
+            self._conteos[alerta['tipo']] += 1
+        
+        self._mostrar_conteos()
+    
+    def _mostrar_conteos(self):
+        """Mostrar los contadores de alertas en los KPIs"""
+        self.bajo_count_label.config(text=str(self._conteos['STOCK_BAJO']))
+        self.sin_count_label.config(text=str(self._conteos['SIN_STOCK']))
+        self.exceso_count_label.config(text=str(self._conteos['STOCK_EXCESIVO']))
+    
+    def _on_estado_stock(self, evento: dict):
+        """Actualizar la alerta de un solo producto ante un cambio de estado de stock.
         
-        self.bajo_count_label.config(text=str(bajo_count))
-        self.sin_count_label.config(text=str(sin_count))
-        self.exceso_count_label.config(text=str(exceso_count))
+        Solo se toca la fila del producto y los contadores; la tabla no se recarga.
+        """
+        producto_id = evento['producto_id']
+        
+        alerta = None
+        if evento['estado_nuevo'] != 'normal':
+            try:
+                producto = ProductoService.obtener_por_id(producto_id)
+            except Exception as e:
+                logger.error(f"Error actualizando alerta del producto {producto_id}: {e}")
+                producto = None
+            alerta = self._evaluar_alerta(producto) if producto else None
+        
+        anterior = self._alertas.pop(producto_id, None)
+        if anterior:
+            self._conteos[anterior[1]['tipo']] -= 1
+            self._por_prioridad[anterior[1]['prioridad']] -= 1
+            if not alerta or alerta['prioridad'] != anterior[1]['prioridad']:
+                self.table.delete_row(producto_id)
+        
+        if alerta:
+            # Una fila nueva va al final del grupo de su prioridad, sin reordenar la tabla
+            rango = self.PRIORIDADES.index(alerta['prioridad'])
+            posicion = sum(self._por_prioridad[p] for p in self.PRIORIDADES[:rango + 1])
+            self._alertas[producto_id] = (producto, alerta)
+            self._conteos[alerta['tipo']] += 1
+            self._por_prioridad[alerta['prioridad']] += 1
+            self.table.update_row(self._fila_alerta(producto, alerta), posicion)
+        
+        self._mostrar_conteos()
     
     def _actualizar_tabla_alertas(self, productos_con_alerta):
         """Actualizar tabla de alertas"""
-        table_data = []
-        
-        for producto, alerta in productos_con_alerta:
-            # Determinar color según prioridad
-            tags = ""
-            if alerta['prioridad'] == 'ALTA':
-                tags = 'danger'
-            elif alerta['prioridad'] == 'MEDIA':
-                tags = 'warning'
-            else:
-                tags = 'info'
-            
-            table_data.append({
-                'codigo': producto.codigo,
-                'nombre': producto.nombre,
-                'categoria': producto.categoria,
-                'stock_actual': producto.stock_actual,
-                'stock_minimo': producto.stock_minimo,
-                'stock_maximo': producto.stock_maximo,
-                'diferencia': alerta['diferencia'],
-                'tipo_alerta': self._get_tipo_alerta_text(alerta['tipo']),
-                'prioridad': alerta['prioridad'],
-                '_tags': tags,
-                '_producto': producto,
-                '_alerta': alerta
-            })
+        table_data = [self._fila_alerta(producto, alerta) for producto, alerta in productos_con_alerta]
         
         # Ordenar por prioridad (ALTA primero)
-        table_data.sort(key=lambda x: {'ALTA': 0, 'MEDIA': 1, 'BAJA': 2}[x['prioridad']])
+        table_data.sort(key=lambda x: self.PRIORIDADES.index(x['prioridad']))
+        self._por_prioridad = {prioridad: 0 for prioridad in self.PRIORIDADES}
+        for fila in table_data:
+            self._por_prioridad[fila['prioridad']] += 1
         
-        self.table.load_data(table_data)
+        self.table.load_data(table_data, id_key='id')
+    
+    def _fila_alerta(self, producto, alerta) -> dict:
+        """Fila de la tabla para un producto con alerta"""
+        # Determinar color según prioridad
+        tags = ""
+        if alerta['prioridad'] == 'ALTA':
+            tags = 'danger'
+        elif alerta['prioridad'] == 'MEDIA':
+            tags = 'warning'
+        else:
+            tags = 'info'
+        
+        return {
+            'id': producto.id,
+            'codigo': producto.codigo,
+            'nombre': producto.nombre,
+            'categoria': producto.categoria,
+            'stock_actual': producto.stock_actual,
+            'stock_minimo': producto.stock_minimo,
+            'stock_maximo': producto.stock_maximo,
+            'diferencia': alerta['diferencia'],
+            'tipo_alerta': self._get_tipo_alerta_text(alerta['tipo']),
+            'prioridad': alerta['prioridad'],
+            '_tags': tags,
+            '_producto': producto,
+            '_alerta': alerta
+        }
     
     def _get_tipo_alerta_text(self, tipo):
         """Obtener texto descriptivo del tipo de alerta"""
@@ -284,4 +336,14 @@ class AlertaStockView(BaseView):
     def on_show(self):
         """Cuando se muestra la vista"""
         super().on_show()
-        self._load_alertas()
\ No newline at end of file
+        if self.data_changed('productos'):
+            self._load_alertas()
+        if not self._unsubscribe:
+            self._unsubscribe = event_bus.subscribe(STOCK_ESTADO_CAMBIADO, self._on_estado_stock)
+    
+    def on_hide(self):
+        """Cuando se oculta la vista"""
+        super().on_hide()
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
\ No newline at end of file
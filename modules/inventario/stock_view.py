@@ -1,19 +1,28 @@
+import os
 import tkinter as tk
 from tkinter import ttk
 from app.base_view import BaseView
 from services.producto_service import ProductoService
 from services.inventario_service import InventarioService
 from services.proveedor_service import ProveedorService
+from services.importacion_service import ImportacionService
+from services.exportacion_service import ExportacionService
+from services.precio_service import PrecioService, ReglaPrecio
 from core.auth import AuthService
 from core.exceptions import DatabaseError, ValidationError
 from core.logger import logger
 from core.utils import utils
+from core.money import money
 from ui.components.table import CustomTable
 from ui.components.modal import InputModal
+from ui.components.progress_dialog import ProgressDialog, export_to_file
 
 class StockView(BaseView):
     """Vista de control de stock e inventario"""
     
+    # Movimientos por página en la ventana de historial de un producto
+    PAGINA_MOVIMIENTOS = 100
+    
     def _setup_view(self):
         """Configurar vista de stock"""
         # Título
@@ -35,8 +44,9 @@ class StockView(BaseView):
         # Tabla de productos
         self._create_productos_table(main_frame)
         
-        # Cargar datos
-        self._load_productos()
+        # Los datos se cargan en segundo plano desde on_show
+        self.productos = []
+        self.productos_filtrados = []
     
     def _create_toolbar(self, parent):
         """Crear barra de herramientas"""
@@ -72,6 +82,20 @@ class StockView(BaseView):
             style="Secondary.TButton"
         ).pack(side="left", padx=2)
         
+        ttk.Button(
+            toolbar,
+            text="💲 Actualizar Precios",
+            command=self._actualizar_precios,
+            style="Secondary.TButton"
+        ).pack(side="left", padx=2)
+        
+        ttk.Button(
+            toolbar,
+            text="📥 Importar",
+            command=self._importar_productos,
+            style="Secondary.TButton"
+        ).pack(side="left", padx=2)
+        
         ttk.Button(
             toolbar,
             text="🔄 Actualizar",
@@ -147,15 +171,19 @@ class StockView(BaseView):
         self.table.add_context_menu(menu_items)
     
     def _load_productos(self):
-        """Cargar productos en la tabla"""
-        try:
-            self.productos = ProductoService.obtener_todos(activos_only=False)
-            self.productos_filtrados = self.productos.copy()
-            self._actualizar_tabla()
-            
-        except Exception as e:
-            logger.error(f"Error cargando productos: {e}")
-            self.show_message("Error", "No se pudieron cargar los productos", "error")
+        """Cargar productos en la tabla (consulta en segundo plano)"""
+        self.run_async('productos', ProductoService.obtener_todos, self._mostrar_productos, False,
+                       on_error=self._error_productos, loading=self.table)
+    
+    def _mostrar_productos(self, productos):
+        """Mostrar los productos cargados"""
+        self.productos = productos
+        self.productos_filtrados = self.productos.copy()
+        self._actualizar_tabla()
+    
+    def _error_productos(self, error: Exception):
+        """Avisar que no se pudieron cargar los productos"""
+        self.show_message("Error", "No se pudieron cargar los productos", "error")
     
     def _actualizar_tabla(self):
         """Actualizar tabla con productos filtrados"""
@@ -194,7 +222,7 @@ class StockView(BaseView):
                 '_producto_obj': producto  # Guardar objeto completo para referencia
             })
         
-        self.table.load_data(table_data)
+        self.table.load_data(table_data, id_key='id')
     
     def _nuevo_producto(self):
         """Abrir modal para nuevo producto"""
@@ -285,8 +313,8 @@ class StockView(BaseView):
             
             # Validar campos numéricos
             try:
-                precio_compra = float(datos['precio_compra'])
-                precio_venta = float(datos['precio_venta'])
+                precio_compra = money.to_pesos(datos['precio_compra'])
+                precio_venta = money.to_pesos(datos['precio_venta'])
                 stock_actual = int(datos.get('stock_actual', 0))
                 stock_minimo = int(datos.get('stock_minimo', 10))
                 stock_maximo = int(datos.get('stock_maximo', 100))
@@ -355,6 +383,139 @@ class StockView(BaseView):
             logger.error(f"Error creando producto: {e}")
             self.show_message("Error", "No se pudo crear el producto", "error")
     
+    def _actualizar_precios(self):
+        """Abrir modal de actualización masiva de precios"""
+        tipos = {
+            "Porcentaje sobre precio de venta": 'porcentaje',
+            "Monto fijo sobre precio de venta": 'monto',
+            "Margen % sobre precio de compra": 'margen'
+        }
+        try:
+            proveedores = ProveedorService.obtener_todos()
+            proveedores_values = [""] + [f"{p.nombre} ({p.id})" for p in proveedores]
+        except Exception as e:
+            logger.error(f"Error cargando proveedores: {e}")
+            proveedores_values = [""]
+        categorias = [""] + sorted({p.categoria for p in self.productos if p.categoria})
+        
+        fields = [
+            {'name': 'tipo', 'label': 'Tipo de cambio *', 'type': 'combobox',
+             'values': list(tipos), 'value': next(iter(tipos)), 'required': True},
+            {'name': 'valor', 'label': 'Valor (% o $) *', 'type': 'entry', 'required': True},
+            {'name': 'categoria', 'label': 'Categoría', 'type': 'combobox',
+             'values': categorias, 'required': False},
+            {'name': 'proveedor', 'label': 'Proveedor', 'type': 'combobox',
+             'values': proveedores_values, 'required': False},
+            {'name': 'codigos', 'label': 'Códigos (separados por coma)', 'type': 'entry', 'required': False},
+            {'name': 'redondeo', 'label': 'Redondear a múltiplo de', 'type': 'combobox',
+             'values': ["1", "10", "50", "100"], 'value': "10", 'required': True},
+            {'name': 'motivo', 'label': 'Motivo', 'type': 'entry', 'required': False}
+        ]
+        
+        modal = InputModal(self, "Actualización Masiva de Precios", fields)
+        result = modal.show()
+        if not result:
+            return
+        
+        try:
+            valor = float(result['valor'].replace(',', '.'))
+        except ValueError:
+            self.show_message("Error", "El valor debe ser un número válido", "error")
+            return
+        
+        proveedor_id = None
+        if result.get('proveedor'):
+            try:
+                proveedor_id = int(result['proveedor'].split('(')[-1].rstrip(')'))
+            except ValueError:
+                pass
+        codigos = [c.strip() for c in result.get('codigos', '').split(',') if c.strip()]
+        
+        regla = ReglaPrecio(
+            tipo=tipos[result['tipo']],
+            valor=valor,
+            categoria=result.get('categoria') or None,
+            proveedor_id=proveedor_id,
+            codigos=codigos or None,
+            redondeo=int(result['redondeo'])
+        )
+        
+        try:
+            afectados = PrecioService.contar_afectados(regla)
+            if not afectados:
+                self.show_message("Información", "Ningún producto coincide con los filtros", "info")
+                return
+            if not self.show_message(
+                "Confirmar",
+                f"Se actualizará el precio de venta de {afectados} producto(s). ¿Desea continuar?",
+                "question"
+            ):
+                return
+            
+            usuario_id = AuthService.get_current_user().id if AuthService.get_current_user() else 1
+            resultado = PrecioService.aplicar_reglas([regla], usuario_id, result.get('motivo', '').strip())
+            
+            mensaje = f"Precios actualizados: {resultado.actualizados}"
+            if resultado.omitidos:
+                mensaje += f"\nSin cambios (mismo precio o bajo el precio de compra): {resultado.omitidos}"
+            self.show_message("Éxito", mensaje, "info")
+            self._load_productos()
+        
+        except ValidationError as e:
+            self.show_message("Error de Validación", str(e), "error")
+        except Exception as e:
+            logger.error(f"Error actualizando precios: {e}")
+            self.show_message("Error", "No se pudieron actualizar los precios", "error")
+    
+    def _importar_productos(self):
+        """Importar productos desde un archivo CSV/XLSX"""
+        from tkinter import filedialog
+        
+        ruta = filedialog.askopenfilename(
+            title="Importar productos",
+            filetypes=ImportacionService.formatos_soportados(),
+            parent=self
+        )
+        if not ruta:
+            return
+        
+        usuario_id = AuthService.get_current_user().id if AuthService.get_current_user() else 1
+        # En un hilo aparte; las alertas de stock se publican después en el hilo de Tk
+        ProgressDialog(
+            self, "Importar productos", f"Importando {os.path.basename(ruta)}...",
+            lambda progress, cancelled: ImportacionService.importar_productos(
+                ruta, usuario_id, progress, cancelled, publicar=False
+            ),
+            on_done=self._importacion_terminada, on_error=self._error_importacion
+        )
+    
+    def _importacion_terminada(self, resultado):
+        """Informar el resultado de la importación (None si se canceló)"""
+        if resultado is None:
+            return
+        ImportacionService.publicar_alertas(resultado)
+        
+        mensaje = (
+            f"Productos nuevos: {resultado.insertados}\n"
+            f"Productos actualizados: {resultado.actualizados}\n"
+            f"Filas rechazadas: {len(resultado.rechazados)}"
+        )
+        if resultado.rechazados:
+            detalle = "\n".join(f"Fila {fila}: {motivo}" for fila, motivo in resultado.rechazados[:10])
+            if len(resultado.rechazados) > 10:
+                detalle += f"\n... y {len(resultado.rechazados) - 10} más"
+            mensaje += f"\n\n{detalle}"
+        
+        self.show_message("Importación", mensaje, "warning" if resultado.rechazados else "info")
+        self._load_productos()
+    
+    def _error_importacion(self, e: Exception):
+        if isinstance(e, ValidationError):
+            self.show_message("Error de Validación", str(e), "error")
+            return
+        logger.error(f"Error importando productos: {e}")
+        self.show_message("Error", "No se pudieron importar los productos", "error")
+    
     def _editar_producto(self):
         """Editar producto seleccionado"""
         selected = self.table.get_selected_item()
@@ -468,10 +629,10 @@ class StockView(BaseView):
             # Validar campos numéricos
             try:
                 if 'precio_compra' in datos and datos['precio_compra']:
-                    update_data['precio_compra'] = float(datos['precio_compra'])
+                    update_data['precio_compra'] = money.to_pesos(datos['precio_compra'])
                 
                 if 'precio_venta' in datos and datos['precio_venta']:
-                    update_data['precio_venta'] = float(datos['precio_venta'])
+                    update_data['precio_venta'] = money.to_pesos(datos['precio_venta'])
                 
                 if 'stock_minimo' in datos and datos['stock_minimo']:
                     update_data['stock_minimo'] = int(datos['stock_minimo'])
@@ -594,7 +755,9 @@ class StockView(BaseView):
             return
         
         try:
-            movimientos = InventarioService.obtener_movimientos_por_producto(producto_id, limit=100)
+            movimientos = InventarioService.obtener_movimientos_por_producto(
+                producto_id, limit=self.PAGINA_MOVIMIENTOS
+            )
             
             # Crear ventana de movimientos
             self._mostrar_ventana_movimientos(producto, movimientos)
@@ -645,7 +808,48 @@ class StockView(BaseView):
         table = CustomTable(table_frame, columns=columns, height=20, show_toolbar=True)
         table.grid(row=0, column=0, sticky="nsew")
         
-        # Cargar datos en la tabla
+        # Cargar datos en la tabla; las páginas siguientes llegan al desplazarse
+        movimientos = list(movimientos)
+        table.on_scroll_end = lambda: self._cargar_mas_movimientos(producto.id, movimientos, table)
+        table.on_export = lambda: export_to_file(
+            movimientos_window,
+            lambda ruta, progreso, cancelado: ExportacionService.exportar_movimientos(
+                ruta, producto.id, progreso=progreso, cancelado=cancelado
+            ),
+            ExportacionService.formatos_soportados(),
+            title="Exportar movimientos",
+            initialfile=f"movimientos_{producto.codigo}"
+        )
+        table.load_data(self._filas_movimientos(movimientos),
+                        has_more=len(movimientos) == self.PAGINA_MOVIMIENTOS)
+        
+        # Botón cerrar
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill="x", pady=(10, 0))
+        
+        ttk.Button(
+            button_frame,
+            text="Cerrar",
+            command=movimientos_window.destroy,
+            style="Primary.TButton"
+        ).pack(side="right")
+    
+    def _cargar_mas_movimientos(self, producto_id: int, movimientos: list, table: CustomTable):
+        """Pedir los movimientos que siguen al último mostrado"""
+        ultimo = movimientos[-1]
+        
+        def agregar(pagina):
+            if not table.winfo_exists():
+                return  # ventana cerrada
+            movimientos.extend(pagina)
+            table.append_data(self._filas_movimientos(pagina), has_more=len(pagina) == self.PAGINA_MOVIMIENTOS)
+        
+        self.run_async('movimientos', InventarioService.obtener_movimientos_por_producto, agregar,
+                       producto_id, self.PAGINA_MOVIMIENTOS, (ultimo.created_at, ultimo.id),
+                       on_error=lambda e: table.winfo_exists() and table.set_has_more(False))
+    
+    def _filas_movimientos(self, movimientos) -> list:
+        """Filas de la tabla de movimientos"""
         table_data = []
         for mov in movimientos:
             # Determinar texto de referencia
@@ -673,19 +877,7 @@ class StockView(BaseView):
                 'usuario': f"Usuario {mov.usuario_id}",
                 '_tags': tags
             })
-        
-        table.load_data(table_data)
-        
-        # Botón cerrar
-        button_frame = ttk.Frame(main_frame)
-        button_frame.pack(fill="x", pady=(10, 0))
-        
-        ttk.Button(
-            button_frame,
-            text="Cerrar",
-            command=movimientos_window.destroy,
-            style="Primary.TButton"
-        ).pack(side="right")
+        return table_data
     
     def _ver_detalles(self):
         """Ver detalles del producto seleccionado"""
@@ -782,17 +974,16 @@ class StockView(BaseView):
     
     def _buscar_productos(self, event=None):
         """Buscar productos por nombre o código"""
-        search_term = self.search_var.get().lower().strip()
+        search_term = self.search_var.get().strip()
         
         if not search_term:
             self.productos_filtrados = self.productos.copy()
         else:
-            self.productos_filtrados = [
-                p for p in self.productos 
-                if search_term in p.nombre.lower() or 
-                   search_term in p.codigo.lower() or 
-                   search_term in p.categoria.lower()
-            ]
+            try:
+                self.productos_filtrados = ProductoService.buscar(search_term, activos_only=False)
+            except Exception as e:
+                logger.error(f"Error buscando productos: {e}")
+                self.productos_filtrados = []
         
         self._aplicar_filtro()
     
@@ -828,4 +1019,5 @@ class StockView(BaseView):
     def on_show(self):
         """Cuando se muestra la vista"""
         super().on_show()
-        self._load_productos()
\ No newline at end of file
+        if self.data_changed('productos'):
+            self._load_productos()
\ No newline at end of file
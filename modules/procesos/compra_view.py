@@ -9,6 +9,7 @@ from core.auth import AuthService
 from core.exceptions import DatabaseError, ValidationError
 from core.logger import logger
 from core.utils import utils
+from core.money import money
 from models.compra import Compra, DetalleCompra
 from ui.components.table import CustomTable
 
@@ -279,15 +280,16 @@ class CompraView(BaseView):
     
     def _buscar_productos(self, event=None):
         """Buscar productos por nombre o código"""
-        search_term = self.producto_search_var.get().lower().strip()
+        search_term = self.producto_search_var.get().strip()
         
         if not search_term:
             self.productos_filtrados = self.productos.copy()
         else:
-            self.productos_filtrados = [
-                p for p in self.productos 
-                if search_term in p.nombre.lower() or search_term in p.codigo.lower()
-            ]
+            try:
+                self.productos_filtrados = ProductoService.buscar(search_term)
+            except Exception as e:
+                logger.error(f"Error buscando productos: {e}")
+                self.productos_filtrados = []
         
         self._actualizar_lista_productos()
         self._limpiar_seleccion()
@@ -336,8 +338,8 @@ class CompraView(BaseView):
         
         try:
             cantidad = int(self.cantidad_var.get())
-            precio_compra = float(self.precio_compra_var.get())
-            precio_venta = float(self.precio_venta_var.get())
+            precio_compra = money.to_pesos(self.precio_compra_var.get())
+            precio_venta = money.to_pesos(self.precio_venta_var.get())
             
             if cantidad <= 0 or precio_compra <= 0 or precio_venta <= 0:
                 self.show_message("Error", "Los valores deben ser mayores a 0", "error")
@@ -385,7 +387,7 @@ class CompraView(BaseView):
         
         # Agregar detalles
         for detalle in self.compra_actual.detalles:
-            producto = next((p for p in self.productos if p.id == detalle.producto_id), None)
+            producto = ProductoService.obtener_por_id(detalle.producto_id)
             if producto:
                 self.detalles_table.tree.insert("", "end", values=(
                     producto.nombre,
@@ -412,7 +414,7 @@ class CompraView(BaseView):
         # Encontrar índice del producto
         producto_nombre = selected['producto']
         for i, detalle in enumerate(self.compra_actual.detalles):
-            producto = next((p for p in self.productos if p.id == detalle.producto_id), None)
+            producto = ProductoService.obtener_por_id(detalle.producto_id)
             if producto and producto.nombre == producto_nombre:
                 self.compra_actual.detalles.pop(i)
                 break
@@ -1,16 +1,26 @@
 import tkinter as tk
+from collections import OrderedDict
 from tkinter import ttk
 from datetime import datetime, timedelta
 from app.base_view import BaseView
 from services.venta_service import VentaService
 from services.compra_service import CompraService
+from services.reporte_service import ReporteService
+from services.exportacion_service import ExportacionService
 from core.logger import logger
 from core.utils import utils
 from ui.components.table import CustomTable
+from ui.components.chart import TrendChart
+from ui.components.progress_dialog import export_to_file
 
 class ResumenView(BaseView):
     """Vista de resumen de ventas y compras"""
     
+    # Resultados (pestaña, rango de fechas) que se conservan para no volver a consultar
+    CACHE_PESTANAS = 8
+    # Filas por página en las pestañas de ventas y compras (el resto llega al desplazarse)
+    PAGINA = 200
+    
     def _setup_view(self):
         """Configurar vista de resumen"""
         # Título
@@ -31,9 +41,6 @@ class ResumenView(BaseView):
         
         # Pestañas
         self._create_tabs(main_frame)
-        
-        # Cargar datos iniciales
-        self._cargar_resumen()
     
     def _create_filters(self, parent):
         """Crear sección de filtros"""
@@ -89,23 +96,39 @@ class ResumenView(BaseView):
         """Crear pestañas de contenido"""
         notebook = ttk.Notebook(parent)
         notebook.grid(row=1, column=0, sticky="nsew")
+        self.notebook = notebook
+        
+        # Cada pestaña consulta sus datos solo cuando se selecciona (ver _cargar_pestana_visible)
+        self._pestanas = {}
+        self._datos_pestanas = OrderedDict()
+        self._rango_mostrado = {}
+        self._datos_mostrados = {}
         
         # Pestaña de resumen
-        resumen_frame = ttk.Frame(notebook, padding=10)
-        notebook.add(resumen_frame, text="📊 Resumen General")
+        resumen_frame = self._agregar_pestana("📊 Resumen General", 'resumen',
+                                              self._consultar_resumen, self._mostrar_resumen)
         
         # Pestaña de ventas
-        ventas_frame = ttk.Frame(notebook, padding=10)
-        notebook.add(ventas_frame, text="💰 Ventas")
+        ventas_frame = self._agregar_pestana("💰 Ventas", 'ventas',
+                                             self._consultar_ventas, self._actualizar_tabla_ventas)
         
         # Pestaña de compras
-        compras_frame = ttk.Frame(notebook, padding=10)
-        notebook.add(compras_frame, text="🛒 Compras")
+        compras_frame = self._agregar_pestana("🛒 Compras", 'compras',
+                                              self._consultar_compras, self._actualizar_tabla_compras)
         
         # Configurar pestañas
         self._setup_resumen_tab(resumen_frame)
         self._setup_ventas_tab(ventas_frame)
         self._setup_compras_tab(compras_frame)
+        
+        notebook.bind('<<NotebookTabChanged>>', lambda event: self._cargar_pestana_visible())
+    
+    def _agregar_pestana(self, texto: str, nombre: str, consulta, mostrar) -> ttk.Frame:
+        """Agregar una pestaña con su carga: consulta(inicio, fin) -> datos, mostrar(datos)"""
+        frame = ttk.Frame(self.notebook, padding=10)
+        self.notebook.add(frame, text=texto)
+        self._pestanas[str(frame)] = (nombre, consulta, mostrar)
+        return frame
     
     def _setup_resumen_tab(self, parent):
         """Configurar pestaña de resumen"""
@@ -155,15 +178,14 @@ class ResumenView(BaseView):
         
         ttk.Label(cantidad_kpi, text="Ventas + Compras", style="Normal.TLabel").pack()
         
-        # Gráfico de tendencia (simulado)
+        # Gráfico de tendencia
         trend_frame = ttk.LabelFrame(parent, text="Tendencia de Ventas", padding=10)
         trend_frame.grid(row=1, column=0, sticky="nsew", pady=(0, 10))
         trend_frame.rowconfigure(0, weight=1)
         trend_frame.columnconfigure(0, weight=1)
         
-        # Simular gráfico con texto
-        self.trend_text = tk.Text(trend_frame, height=8, wrap=tk.WORD, state=tk.DISABLED)
-        self.trend_text.grid(row=0, column=0, sticky="nsew")
+        self.trend_chart = TrendChart(trend_frame, height=200, y_formatter=utils.format_currency)
+        self.trend_chart.grid(row=0, column=0, sticky="nsew")
         
         # Últimas transacciones
         transacciones_frame = ttk.LabelFrame(parent, text="Últimas Transacciones", padding=10)
@@ -207,6 +229,10 @@ class ResumenView(BaseView):
             show_toolbar=True
         )
         self.ventas_table.grid(row=0, column=0, sticky="nsew")
+        self.ventas_table.on_scroll_end = lambda: self._cargar_pagina(
+            'ventas', self._consultar_ventas, self.ventas_table, self._filas_ventas
+        )
+        self.ventas_table.on_export = lambda: self._exportar_periodo('ventas', ExportacionService.exportar_ventas)
     
     def _setup_compras_tab(self, parent):
         """Configurar pestaña de compras"""
@@ -229,43 +255,130 @@ class ResumenView(BaseView):
             show_toolbar=True
         )
         self.compras_table.grid(row=0, column=0, sticky="nsew")
+        self.compras_table.on_scroll_end = lambda: self._cargar_pagina(
+            'compras', self._consultar_compras, self.compras_table, self._filas_compras
+        )
+        self.compras_table.on_export = lambda: self._exportar_periodo('compras', ExportacionService.exportar_compras)
     
-    def _cargar_resumen(self):
-        """Cargar datos del resumen"""
-        try:
-            # Obtener fechas según el período seleccionado
-            fecha_inicio, fecha_fin = self._obtener_rango_fechas()
-            
-            # Cargar ventas y compras
-            self.ventas = VentaService.obtener_ventas_por_fecha(fecha_inicio, fecha_fin)
-            self.compras = CompraService.obtener_compras_por_fecha(fecha_inicio, fecha_fin)
-            
-            # Actualizar KPIs
-            self._actualizar_kpis()
-            
-            # Actualizar tablas
-            self._actualizar_tabla_ventas()
-            self._actualizar_tabla_compras()
-            self._actualizar_transacciones_recientes()
-            self._actualizar_tendencia()
-            
-        except Exception as e:
-            logger.error(f"Error cargando resumen: {e}")
-            self.show_message("Error", "No se pudieron cargar los datos del resumen", "error")
+    def _cargar_pestana_visible(self):
+        """Mostrar la pestaña seleccionada para el rango actual, consultando solo si no está en caché"""
+        seleccion = self.notebook.select()
+        if not seleccion:
+            return
+        nombre, consulta, mostrar = self._pestanas[seleccion]
+        rango = self._obtener_rango_fechas()
+        # Una consulta en curso de un rango anterior no debe pisar lo que se muestre ahora
+        self.cancel_async(f'pestana_{nombre}')
+        if self._rango_mostrado.get(nombre) == rango:
+            return
+        
+        clave = (nombre,) + rango
+        if clave in self._datos_pestanas:
+            self._datos_pestanas.move_to_end(clave)
+            self._mostrar_pestana(clave, mostrar, self._datos_pestanas[clave])
+            return
+        
+        self.run_async(f'pestana_{nombre}', consulta,
+                       lambda datos: self._guardar_pestana(clave, mostrar, datos), *rango,
+                       on_error=self._error_resumen, loading=self.notebook.nametowidget(seleccion))
+    
+    def _guardar_pestana(self, clave: tuple, mostrar, datos):
+        """Guardar en caché los datos consultados de una pestaña y mostrarlos"""
+        self._datos_pestanas[clave] = datos
+        while len(self._datos_pestanas) > self.CACHE_PESTANAS:
+            self._datos_pestanas.popitem(last=False)
+        self._mostrar_pestana(clave, mostrar, datos)
+    
+    def _mostrar_pestana(self, clave: tuple, mostrar, datos):
+        nombre, rango = clave[0], clave[1:]
+        mostrar(datos)
+        self._rango_mostrado[nombre] = rango
+        self._datos_mostrados[nombre] = datos
+    
+    def _olvidar_datos(self):
+        """Descartar los datos en caché (tras escrituras en ventas o compras)"""
+        self._datos_pestanas.clear()
+        self._rango_mostrado.clear()
+        self._datos_mostrados.clear()
+    
+    def _cargar_pagina(self, nombre: str, consulta, tabla: CustomTable, filas):
+        """Pedir la página que sigue a la última fila mostrada (al llegar al final de la tabla)"""
+        datos = self._datos_mostrados.get(nombre)
+        if not datos or not datos['filas']:
+            tabla.set_has_more(False)
+            return
+        ultima = datos['filas'][-1]
+        self.run_async(f'pagina_{nombre}', consulta,
+                       lambda pagina: self._agregar_pagina(nombre, datos, pagina, tabla, filas),
+                       *self._rango_mostrado[nombre], (ultima.fecha, ultima.id),
+                       on_error=lambda e: tabla.set_has_more(False))
+    
+    def _agregar_pagina(self, nombre: str, datos: dict, pagina: dict, tabla: CustomTable, filas):
+        """Sumar la página a los datos en caché y, si siguen a la vista, a la tabla"""
+        datos['filas'].extend(pagina['filas'])
+        datos['hay_mas'] = pagina['hay_mas']
+        if self._datos_mostrados.get(nombre) is datos:
+            tabla.append_data(filas(pagina['filas']), has_more=pagina['hay_mas'])
+    
+    def _exportar_periodo(self, nombre: str, exportar):
+        """Exportar todo el período desde la base (no solo las páginas cargadas en la tabla)"""
+        inicio, fin = self._obtener_rango_fechas()
+        export_to_file(
+            self,
+            lambda ruta, progreso, cancelado: exportar(ruta, inicio, fin, progreso, cancelado),
+            ExportacionService.formatos_soportados(),
+            title=f"Exportar {nombre}",
+            initialfile=f"{nombre}_{inicio:%Y%m%d}_{fin:%Y%m%d}"
+        )
+    
+    def _consultar_resumen(self, fecha_inicio, fecha_fin) -> dict:
+        """KPIs, tendencia y últimas transacciones del período (fuera del hilo de Tk)"""
+        return {
+            'columnas_ventas': ReporteService.columnas_ventas(fecha_inicio, fecha_fin),
+            'columnas_compras': ReporteService.columnas_compras(fecha_inicio, fecha_fin),
+            'ventas_recientes': VentaService.obtener_recientes(10, desde=fecha_inicio, hasta=fecha_fin),
+            'compras_recientes': CompraService.obtener_recientes(10, desde=fecha_inicio, hasta=fecha_fin),
+        }
+    
+    def _consultar_ventas(self, fecha_inicio, fecha_fin, antes_de: tuple = None) -> dict:
+        """Una página de ventas del período, siguiente a `antes_de` (fuera del hilo de Tk)"""
+        ventas = VentaService.obtener_recientes(self.PAGINA, antes_de, fecha_inicio, fecha_fin)
+        return {'filas': ventas, 'hay_mas': len(ventas) == self.PAGINA}
+    
+    def _consultar_compras(self, fecha_inicio, fecha_fin, antes_de: tuple = None) -> dict:
+        """Una página de compras del período con el nombre del proveedor (fuera del hilo de Tk)"""
+        compras = CompraService.obtener_compras_por_fecha(fecha_inicio, fecha_fin, self.PAGINA, antes_de)
+        return {'filas': compras, 'hay_mas': len(compras) == self.PAGINA}
+    
+    def _mostrar_resumen(self, datos: dict):
+        """Mostrar KPIs, tendencia y últimas transacciones"""
+        self._actualizar_kpis(datos['columnas_ventas'], datos['columnas_compras'])
+        self._actualizar_transacciones_recientes(datos['ventas_recientes'], datos['compras_recientes'])
+        self._actualizar_tendencia(datos['columnas_ventas'])
+    
+    def _error_resumen(self, error: Exception):
+        """Avisar que no se pudo cargar el resumen"""
+        self.show_message("Error", "No se pudieron cargar los datos del resumen", "error")
     
     def _obtener_rango_fechas(self):
-        """Obtener rango de fechas según el período seleccionado"""
-        hoy = datetime.now()
+        """Obtener rango de fechas según el período seleccionado.
+        
+        Los rangos van de medianoche a fin de día, así el mismo período da la
+        misma clave de caché durante todo el día.
+        """
+        ahora = datetime.now()
+        hoy = datetime(ahora.year, ahora.month, ahora.day)
+        fin_hoy = hoy + timedelta(days=1, seconds=-1)
         periodo = self.periodo_var.get()
         
         if periodo == "1d":
-            return datetime(hoy.year, hoy.month, hoy.day), hoy
+            return hoy, fin_hoy
         elif periodo == "7d":
-            return hoy - timedelta(days=7), hoy
+            return hoy - timedelta(days=7), fin_hoy
         elif periodo == "30d":
-            return hoy - timedelta(days=30), hoy
+            return hoy - timedelta(days=30), fin_hoy
         elif periodo == "month":
-            return datetime(hoy.year, hoy.month, 1), hoy
+            return datetime(hoy.year, hoy.month, 1), fin_hoy
         elif periodo == "last_month":
             if hoy.month == 1:
                 return datetime(hoy.year-1, 12, 1), datetime(hoy.year, 1, 1) - timedelta(seconds=1)
@@ -275,27 +388,34 @@ class ResumenView(BaseView):
             try:
                 fecha_desde = utils.parse_date(self.fecha_desde_var.get())
                 fecha_hasta = utils.parse_date(self.fecha_hasta_var.get())
-                return fecha_desde, fecha_hasta
+                return (datetime(fecha_desde.year, fecha_desde.month, fecha_desde.day),
+                        datetime(fecha_hasta.year, fecha_hasta.month, fecha_hasta.day, 23, 59, 59))
             except:
                 # Si hay error en fechas personalizadas, usar último mes
-                return hoy - timedelta(days=30), hoy
+                return hoy - timedelta(days=30), fin_hoy
     
-    def _actualizar_kpis(self):
+    def _actualizar_kpis(self, columnas_ventas, columnas_compras):
         """Actualizar KPIs del resumen"""
-        total_ventas = sum(venta.total for venta in self.ventas)
-        total_compras = sum(compra.total for compra in self.compras)
+        ventas = ReporteService.totales(columnas_ventas)
+        compras = ReporteService.totales(columnas_compras)
+        total_ventas = ventas['total']
+        total_compras = compras['total']
         utilidad = total_ventas - total_compras
-        total_transacciones = len(self.ventas) + len(self.compras)
+        total_transacciones = ventas['cantidad'] + compras['cantidad']
         
         self.ventas_total_label.config(text=utils.format_currency(total_ventas))
         self.compras_total_label.config(text=utils.format_currency(total_compras))
         self.utilidad_label.config(text=utils.format_currency(utilidad))
         self.transacciones_label.config(text=str(total_transacciones))
     
-    def _actualizar_tabla_ventas(self):
+    def _actualizar_tabla_ventas(self, datos: dict):
         """Actualizar tabla de ventas"""
+        self.ventas_table.load_data(self._filas_ventas(datos['filas']), has_more=datos['hay_mas'])
+    
+    def _filas_ventas(self, ventas) -> list:
+        """Filas de la tabla de ventas"""
         table_data = []
-        for venta in self.ventas:
+        for venta in ventas:
             table_data.append({
                 'fecha': venta.fecha.strftime("%d/%m/%Y %H:%M") if venta.fecha else "",
                 'numero_boleta': venta.numero_boleta,
@@ -304,40 +424,32 @@ class ResumenView(BaseView):
                 'iva': venta.iva,
                 'total': venta.total
             })
-        
-        self.ventas_table.load_data(table_data)
+        return table_data
     
-    def _actualizar_tabla_compras(self):
+    def _actualizar_tabla_compras(self, datos: dict):
         """Actualizar tabla de compras"""
+        self.compras_table.load_data(self._filas_compras(datos['filas']), has_more=datos['hay_mas'])
+    
+    def _filas_compras(self, compras) -> list:
+        """Filas de la tabla de compras"""
         table_data = []
-        for compra in self.compras:
-            # Obtener nombre del proveedor
-            proveedor_nombre = "Proveedor"
-            try:
-                from services.proveedor_service import ProveedorService
-                proveedor = ProveedorService.obtener_por_id(compra.proveedor_id)
-                if proveedor:
-                    proveedor_nombre = proveedor.nombre
-            except:
-                pass
-            
+        for compra in compras:
             table_data.append({
                 'fecha': compra.fecha.strftime("%d/%m/%Y %H:%M") if compra.fecha else "",
                 'numero_factura': compra.numero_factura,
-                'proveedor': proveedor_nombre,
+                'proveedor': compra.proveedor_nombre or "Proveedor",
                 'subtotal': compra.subtotal,
                 'iva': compra.iva,
                 'total': compra.total
             })
-        
-        self.compras_table.load_data(table_data)
+        return table_data
     
-    def _actualizar_transacciones_recientes(self):
+    def _actualizar_transacciones_recientes(self, ventas, compras):
         """Actualizar transacciones recientes"""
         # Combinar ventas y compras
         transacciones = []
         
-        for venta in self.ventas[-10:]:  # Últimas 10 ventas
+        for venta in ventas:  # Últimas 10 ventas
             transacciones.append({
                 'fecha': venta.fecha,
                 'tipo': 'VENTA',
@@ -346,7 +458,7 @@ class ResumenView(BaseView):
                 'obj': venta
             })
         
-        for compra in self.compras[-10:]:  # Últimas 10 compras
+        for compra in compras:  # Últimas 10 compras
             transacciones.append({
                 'fecha': compra.fecha,
                 'tipo': 'COMPRA',
@@ -370,44 +482,35 @@ class ResumenView(BaseView):
         
         self.transacciones_table.load_data(table_data)
     
-    def _actualizar_tendencia(self):
+    def _actualizar_tendencia(self, columnas_ventas):
         """Actualizar tendencia de ventas"""
         try:
-            # Agrupar ventas por día
-            ventas_por_dia = {}
-            for venta in self.ventas:
-                if venta.fecha:
-                    fecha_str = venta.fecha.strftime("%d/%m")
-                    if fecha_str not in ventas_por_dia:
-                        ventas_por_dia[fecha_str] = 0
-                    ventas_por_dia[fecha_str] += venta.total
-            
-            # Crear texto de tendencia
-            trend_text = "Tendencia de ventas por día:\n\n"
-            for fecha, total in list(ventas_por_dia.items())[-7:]:  # Últimos 7 días
-                bar = "█" * int(total / 1000)  # Un carácter por cada $1000
-                trend_text += f"{fecha}: {utils.format_currency(total)} {bar}\n"
-            
-            # Actualizar widget de texto
-            self.trend_text.config(state=tk.NORMAL)
-            self.trend_text.delete(1.0, tk.END)
-            self.trend_text.insert(1.0, trend_text)
-            self.trend_text.config(state=tk.DISABLED)
-            
+            # Totales diarios de todo el período (el gráfico reduce series largas)
+            dias, totales = ReporteService.por_dia(columnas_ventas, rellenar=True)
+            self.trend_chart.set_series(dias, totales)
         except Exception as e:
             logger.error(f"Error actualizando tendencia: {e}")
     
     def _aplicar_filtros(self):
         """Aplicar filtros automáticos"""
         if self.periodo_var.get() != "custom":
-            self._cargar_resumen()
+            self._cargar_pestana_visible()
     
     def _aplicar_filtros_personalizados(self):
         """Aplicar filtros personalizados"""
         self.periodo_var.set("custom")
-        self._cargar_resumen()
+        self._cargar_pestana_visible()
     
     def on_show(self):
         """Cuando se muestra la vista"""
         super().on_show()
-        self._cargar_resumen()
\ No newline at end of file
+        if self.data_changed('ventas', 'compras'):
+            self._olvidar_datos()
+        self._cargar_pestana_visible()
+    
+    def on_hide(self):
+        """Cuando se oculta la vista"""
+        super().on_hide()
+        # Las páginas pedidas se descartaron: se vuelven a pedir al desplazarse
+        for tabla in (self.ventas_table, self.compras_table):
+            tabla.set_has_more(tabla.has_more)
\ No newline at end of file
@@ -7,6 +7,7 @@ from core.auth import AuthService
 from core.exceptions import DatabaseError, ValidationError
 from core.logger import logger
 from core.utils import utils
+from core.money import money
 from ui.components.table import CustomTable
 from ui.components.modal import InputModal
 
@@ -191,7 +192,7 @@ class StockView(BaseView):
                 '_tags': tags
             })
         
-        self.table.load_data(table_data)
+        self.table.load_data(table_data, id_key='id')
     
     def _nuevo_producto(self):
         """Abrir modal para nuevo producto"""
@@ -289,8 +290,8 @@ class StockView(BaseView):
                 nombre=datos['nombre'],
                 descripcion=datos.get('descripcion', ''),
                 categoria=datos['categoria'],
-                precio_compra=float(datos['precio_compra']),
-                precio_venta=float(datos['precio_venta']),
+                precio_compra=money.to_pesos(datos['precio_compra']),
+                precio_venta=money.to_pesos(datos['precio_venta']),
                 stock_actual=0,
                 stock_minimo=int(datos.get('stock_minimo', 10)),
                 stock_maximo=int(datos.get('stock_maximo', 100)),
@@ -423,7 +424,7 @@ class StockView(BaseView):
             
             for field in ['precio_compra', 'precio_venta']:
                 if field in datos and datos[field]:
-                    update_data[field] = float(datos[field])
+                    update_data[field] = money.to_pesos(datos[field])
             
             for field in ['stock_minimo', 'stock_maximo']:
                 if field in datos and datos[field]:
@@ -667,15 +668,16 @@ class StockView(BaseView):
     
     def _buscar_productos(self, event=None):
         """Buscar productos por nombre o código"""
-        search_term = self.search_var.get().lower().strip()
+        search_term = self.search_var.get().strip()
         
         if not search_term:
             self.productos_filtrados = self.productos.copy()
         else:
-            self.productos_filtrados = [
-                p for p in self.productos 
-                if search_term in p.nombre.lower() or search_term in p.codigo.lower()
-            ]
+            try:
+                self.productos_filtrados = ProductoService.buscar(search_term, activos_only=False)
+            except Exception as e:
+                logger.error(f"Error buscando productos: {e}")
+                self.productos_filtrados = []
         
         self._aplicar_filtro()
     
@@ -1,4 +1,5 @@
 import tkinter as tk
+from collections import deque
 from tkinter import ttk
 from datetime import datetime
 from app.base_view import BaseView
@@ -8,6 +9,7 @@ from core.auth import AuthService
 from core.exceptions import DatabaseError, ValidationError, InsufficientStockError
 from core.logger import logger
 from core.utils import utils
+from core.search_index import SearchIndex
 from models.venta import Venta, DetalleVenta
 from ui.components.table import CustomTable
 from ui.components.modal import InputModal
@@ -15,6 +17,8 @@ from ui.components.modal import InputModal
 class VentaView(BaseView):
     """Vista de registro de ventas"""
     
+    MAX_RESULTADOS = 50  # productos mostrados en la lista de búsqueda
+    
     def _setup_view(self):
         """Configurar vista de ventas"""
         # Título
@@ -38,7 +42,14 @@ class VentaView(BaseView):
         self.venta_actual = Venta()
         self.venta_actual.usuario_id = AuthService.get_current_user().id if AuthService.get_current_user() else 1
         
+        # Líneas de la venta por producto (acceso directo al escanear)
+        self._detalles_por_producto = {}
+        self._cola_escaneos = deque()
+        self._escaneo_programado = None
+        
         # Cargar productos
+        self.indice_productos = SearchIndex(lambda p: (p.codigo, p.nombre))
+        self._etiquetas_lista = []
         self._load_productos()
     
     def _create_form_panel(self, parent):
@@ -159,6 +170,23 @@ class VentaView(BaseView):
         details_frame.columnconfigure(0, weight=1)
         details_frame.rowconfigure(1, weight=1)
         
+        # Entrada del lector de códigos de barra
+        scan_frame = ttk.Frame(details_frame)
+        scan_frame.grid(row=0, column=0, sticky="ew", pady=(0, 10))
+        scan_frame.columnconfigure(1, weight=1)
+        
+        ttk.Label(scan_frame, text="📷 Escanear código:", style="Normal.TLabel").grid(
+            row=0, column=0, sticky="w"
+        )
+        self.escaner_var = tk.StringVar()
+        self.escaner_entry = ttk.Entry(scan_frame, textvariable=self.escaner_var)
+        self.escaner_entry.grid(row=0, column=1, sticky="ew", padx=(5, 0))
+        self.escaner_entry.bind("<Return>", self._escanear_codigo)
+        self.escaner_entry.bind("<KP_Enter>", self._escanear_codigo)
+        
+        self.escaner_estado = ttk.Label(scan_frame, text="", style="Normal.TLabel")
+        self.escaner_estado.grid(row=1, column=0, columnspan=2, sticky="w")
+        
         # Tabla de detalles
         columns = [
             {'id': 'producto', 'text': 'Producto', 'width': 200},
@@ -228,30 +256,37 @@ class VentaView(BaseView):
         """Cargar lista de productos"""
         try:
             self.productos = ProductoService.obtener_todos()
-            self.productos_filtrados = self.productos.copy()
+            self.indice_productos.load(self.productos)
+            self.productos_filtrados = self.indice_productos.search(
+                self.producto_search_var.get(), self.MAX_RESULTADOS
+            )
             self._actualizar_lista_productos()
         except Exception as e:
             logger.error(f"Error cargando productos: {e}")
             self.show_message("Error", "No se pudieron cargar los productos", "error")
     
     def _actualizar_lista_productos(self):
-        """Actualizar lista de productos"""
-        self.productos_listbox.delete(0, tk.END)
-        for producto in self.productos_filtrados:
-            self.productos_listbox.insert(tk.END, f"{producto.codigo} - {producto.nombre}")
+        """Actualizar lista de productos (solo se redibujan las filas que cambian)"""
+        etiquetas = [f"{producto.codigo} - {producto.nombre}" for producto in self.productos_filtrados]
+        
+        # Conservar el tramo inicial que no cambió
+        comunes = 0
+        for anterior, nueva in zip(self._etiquetas_lista, etiquetas):
+            if anterior != nueva:
+                break
+            comunes += 1
+        
+        if comunes < len(self._etiquetas_lista):
+            self.productos_listbox.delete(comunes, tk.END)
+        if comunes < len(etiquetas):
+            self.productos_listbox.insert(tk.END, *etiquetas[comunes:])
+        self._etiquetas_lista = etiquetas
     
     def _buscar_productos(self, event=None):
         """Buscar productos por nombre o código"""
-        search_term = self.producto_search_var.get().lower().strip()
-        
-        if not search_term:
-            self.productos_filtrados = self.productos.copy()
-        else:
-            self.productos_filtrados = [
-                p for p in self.productos 
-                if search_term in p.nombre.lower() or search_term in p.codigo.lower()
-            ]
-        
+        self.productos_filtrados = self.indice_productos.search(
+            self.producto_search_var.get(), self.MAX_RESULTADOS
+        )
         self._actualizar_lista_productos()
         self._limpiar_seleccion()
     
@@ -306,24 +341,8 @@ class VentaView(BaseView):
                 )
                 return
             
-            # Crear detalle
-            detalle = DetalleVenta(
-                producto_id=self.producto_seleccionado.id,
-                cantidad=cantidad,
-                precio_unitario=self.producto_seleccionado.precio_venta
-            )
-            detalle.calcular_total()
-            
-            # Verificar si el producto ya está en la venta
-            for det in self.venta_actual.detalles:
-                if det.producto_id == self.producto_seleccionado.id:
-                    # Actualizar cantidad
-                    det.cantidad += cantidad
-                    det.calcular_total()
-                    break
-            else:
-                # Agregar nuevo detalle
-                self.venta_actual.agregar_detalle(detalle)
+            # Agregar línea o sumar a la existente
+            self._agregar_linea(self.producto_seleccionado, cantidad)
             
             # Actualizar interfaz
             self._actualizar_detalles_tabla()
@@ -336,6 +355,70 @@ class VentaView(BaseView):
             logger.error(f"Error agregando producto: {e}")
             self.show_message("Error", "No se pudo agregar el producto", "error")
     
+    def _agregar_linea(self, producto, cantidad: int) -> DetalleVenta:
+        """Agregar producto a la venta o sumar la cantidad a su línea existente"""
+        detalle = self._detalles_por_producto.get(producto.id)
+        if detalle:
+            detalle.cantidad += cantidad
+        else:
+            detalle = DetalleVenta(
+                producto_id=producto.id,
+                cantidad=cantidad,
+                precio_unitario=producto.precio_venta
+            )
+            self.venta_actual.agregar_detalle(detalle)
+            self._detalles_por_producto[producto.id] = detalle
+        detalle.calcular_total()
+        return detalle
+    
+    def _escanear_codigo(self, event=None):
+        """Encolar el código leído; las lecturas seguidas se procesan juntas"""
+        codigo = self.escaner_var.get().strip()
+        self.escaner_var.set("")
+        if codigo:
+            self._cola_escaneos.append(codigo)
+            if self._escaneo_programado is None:
+                self._escaneo_programado = self.after_idle(self._procesar_escaneos)
+        return "break"
+    
+    def _procesar_escaneos(self):
+        """Procesar los códigos encolados y refrescar la interfaz una sola vez"""
+        self._escaneo_programado = None
+        agregados = 0
+        errores = []
+        
+        while self._cola_escaneos:
+            codigo = self._cola_escaneos.popleft()
+            try:
+                producto = ProductoService.obtener_por_codigo(codigo)
+            except Exception as e:
+                logger.error(f"Error leyendo código {codigo}: {e}")
+                errores.append(f"Error leyendo {codigo}")
+                continue
+            
+            if not producto or not producto.activo:
+                errores.append(f"Código no encontrado: {codigo}")
+                continue
+            
+            detalle = self._detalles_por_producto.get(producto.id)
+            en_venta = detalle.cantidad if detalle else 0
+            if producto.stock_actual < en_venta + 1:
+                errores.append(f"Stock insuficiente: {producto.nombre} ({producto.stock_actual})")
+                continue
+            
+            self._agregar_linea(producto, 1)
+            agregados += 1
+        
+        if agregados:
+            self._actualizar_detalles_tabla()
+            self._actualizar_totales()
+        
+        if errores:
+            self.escaner_estado.config(text="⚠️ " + "; ".join(errores[-3:]))
+            self.bell()
+        elif agregados:
+            self.escaner_estado.config(text=f"✅ {agregados} producto(s) agregado(s)")
+    
     def _actualizar_detalles_tabla(self):
         """Actualizar tabla de detalles"""
         # Limpiar tabla
@@ -344,7 +427,7 @@ class VentaView(BaseView):
         
         # Agregar detalles
         for detalle in self.venta_actual.detalles:
-            producto = next((p for p in self.productos if p.id == detalle.producto_id), None)
+            producto = ProductoService.obtener_por_id(detalle.producto_id)
             if producto:
                 self.detalles_table.tree.insert("", "end", values=(
                     producto.nombre,
@@ -371,9 +454,10 @@ class VentaView(BaseView):
         # Encontrar índice del producto
         producto_nombre = selected['producto']
         for i, detalle in enumerate(self.venta_actual.detalles):
-            producto = next((p for p in self.productos if p.id == detalle.producto_id), None)
+            producto = ProductoService.obtener_por_id(detalle.producto_id)
             if producto and producto.nombre == producto_nombre:
                 self.venta_actual.detalles.pop(i)
+                self._detalles_por_producto.pop(detalle.producto_id, None)
                 break
         
         self._actualizar_detalles_tabla()
@@ -413,6 +497,9 @@ class VentaView(BaseView):
         """Iniciar nueva venta"""
         self.venta_actual = Venta()
         self.venta_actual.usuario_id = AuthService.get_current_user().id if AuthService.get_current_user() else 1
+        self._detalles_por_producto = {}
+        self._cola_escaneos.clear()
+        self.escaner_estado.config(text="")
         
         self.cliente_entry.delete(0, tk.END)
         self.cliente_entry.insert(0, "Consumidor Final")
@@ -0,0 +1,80 @@
+"""Comprobar el presupuesto de tiempo de arranque de la aplicación.
+
+Importa `main` con `python -X importtime` y falla (código de salida 1) si el
+tiempo acumulado supera el presupuesto o si se importan módulos que deben
+cargarse solo al navegar a una vista (vistas, reportes, librerías pesadas).
+
+Uso:
+  python scripts/check_startup.py
+  python scripts/check_startup.py --budget-ms 300 --top 15
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Presupuesto por defecto para `import main`, en milisegundos
+DEFAULT_BUDGET_MS = 400
+
+# Prefijos de módulos que no deben importarse al iniciar
+FORBIDDEN = (
+    'modules.',
+    'services.reporte_service',
+    'numpy',
+    'PIL',
+    'openpyxl',
+    'matplotlib',
+)
+
+_LINE = re.compile(r'^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)')
+
+def measure():
+    """Ejecutar `import main` y devolver [(modulo, propio_us, acumulado_us, nivel)]"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        raise SystemExit(f"`import main` falló con código {result.returncode}")
+    modules = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            modules.append((name, int(own), int(cumulative), (len(indent) - 1) // 2))
+    return modules
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--top', type=int, default=10, help="módulos más lentos a mostrar")
+    args = parser.parse_args()
+
+    modules = measure()
+    total_ms = sum(cumulative for _, _, cumulative, level in modules if level == 0) / 1000
+    forbidden = [name for name, _, _, _ in modules
+                 if any(name == p or name.startswith(p.rstrip('.') + '.') for p in FORBIDDEN)]
+
+    print(f"Tiempo de importación de main: {total_ms:.1f} ms (presupuesto {args.budget_ms:.0f} ms)")
+    for name, _, cumulative, _ in sorted(modules, key=lambda m: m[2], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if total_ms > args.budget_ms:
+        print("ERROR: se superó el presupuesto de arranque")
+        failed = True
+    if forbidden:
+        print("ERROR: módulos importados al iniciar que deben cargarse de forma diferida:")
+        for name in forbidden:
+            print(f"  {name}")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import re
+from typing import List, Optional
+from config.database import db
+from models.producto import Producto
+from core.exceptions import DatabaseError
+from core.logger import logger
+from services import repositorios
+
+FTS_MIGRATION = '0001_productos_fts'
+
+class BusquedaService:
+    """Búsqueda de texto completo de productos.
+
+    Usa el índice FTS5 `productos_fts` en SQLite y el índice FULLTEXT en MySQL.
+    Si el índice no está disponible se recurre a LIKE sobre la tabla.
+    """
+
+    # Pesos bm25 por columna: codigo, nombre, descripcion, categoria
+    PESOS_FTS = (10.0, 5.0, 1.0, 2.0)
+
+    @staticmethod
+    def _tokens(termino: str) -> List[str]:
+        """Separar el término en palabras (sin operadores ni comillas)"""
+        return re.findall(r'\w+', termino.lower())
+
+    @staticmethod
+    def buscar_productos(termino: str, activos_only: bool = True, limite: Optional[int] = None) -> List[Producto]:
+        """Buscar productos por código, nombre, descripción o categoría.
+
+        Cada palabra se busca como prefijo ("azu" encuentra "Azúcar") y los
+        resultados se ordenan por relevancia.
+        """
+        tokens = BusquedaService._tokens(termino)
+        if not tokens:
+            return []
+
+        try:
+            if db.has_migration(FTS_MIGRATION):
+                try:
+                    if db.is_mysql:
+                        return BusquedaService._buscar_fulltext(tokens, activos_only, limite)
+                    return BusquedaService._buscar_fts5(tokens, activos_only, limite)
+                except Exception as e:
+                    logger.warning(f"Búsqueda de texto completo no disponible, usando LIKE: {e}")
+            return BusquedaService._buscar_like(tokens, activos_only, limite)
+        except Exception as e:
+            logger.error(f"Error buscando productos '{termino}': {e}")
+            raise DatabaseError("Error al buscar productos")
+
+    @staticmethod
+    def _buscar_fts5(tokens: List[str], activos_only: bool, limite: Optional[int]) -> List[Producto]:
+        # "tok"* es una consulta de prefijo; varios términos se combinan con AND
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        pesos = ', '.join(str(peso) for peso in BusquedaService.PESOS_FTS)
+        query = f"""
+            SELECT p.* FROM productos_fts
+            JOIN productos p ON p.id = productos_fts.rowid
+            WHERE productos_fts MATCH ?
+            {'AND p.activo = 1' if activos_only else ''}
+            ORDER BY bm25(productos_fts, {pesos}), p.nombre
+            {'LIMIT ?' if limite else ''}
+        """
+        params = (match, limite) if limite else (match,)
+        return repositorios.productos.query(query, params)
+
+    @staticmethod
+    def _buscar_fulltext(tokens: List[str], activos_only: bool, limite: Optional[int]) -> List[Producto]:
+        # Modo booleano: +tok* exige cada palabra como prefijo
+        match = ' '.join(f'+{token}*' for token in tokens)
+        query = f"""
+            SELECT p.*, MATCH(codigo, nombre, descripcion, categoria) AGAINST (? IN BOOLEAN MODE) AS relevancia
+            FROM productos p
+            WHERE MATCH(codigo, nombre, descripcion, categoria) AGAINST (? IN BOOLEAN MODE)
+            {'AND p.activo = 1' if activos_only else ''}
+            ORDER BY relevancia DESC, p.nombre
+            {'LIMIT ?' if limite else ''}
+        """
+        params = (match, match, limite) if limite else (match, match)
+        return repositorios.productos.query(query, params)
+
+    @staticmethod
+    def _buscar_like(tokens: List[str], activos_only: bool, limite: Optional[int]) -> List[Producto]:
+        condiciones = []
+        params = []
+        for token in tokens:
+            # Mismas columnas que el índice de texto completo
+            condiciones.append(
+                "(LOWER(codigo) LIKE ? OR LOWER(nombre) LIKE ? OR LOWER(descripcion) LIKE ? "
+                "OR LOWER(categoria) LIKE ?)"
+            )
+            params.extend([f"%{token}%"] * 4)
+        if activos_only:
+            condiciones.append("activo = 1")
+        query = f"SELECT * FROM productos WHERE {' AND '.join(condiciones)} ORDER BY nombre"
+        if limite:
+            query += " LIMIT ?"
+            params.append(limite)
+        return repositorios.productos.query(query, tuple(params))
@@ -0,0 +1,199 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from config.database import db
+from config.settings import settings
+from models.producto import Producto
+from core.logger import logger
+from services import repositorios
+
+class CatalogoCache:
+    """Caché compartida del catálogo de productos.
+
+    Indexa los productos por id y por código, con tamaño acotado (LRU). Las
+    escrituras marcan los ids modificados e incrementan la versión de datos de
+    `productos`; la siguiente lectura refresca solo esos ids con una consulta
+    `WHERE id IN (...)` en lugar de recargar todo el catálogo.
+
+    Los productos retornados son compartidos y deben tratarse como solo lectura.
+    """
+
+    TABLA = 'productos'
+    LOTE_DELTA = 500
+
+    def __init__(self, max_items: int = settings.CATALOGO_CACHE_MAX):
+        self.max_items = max_items
+        self._por_id: 'OrderedDict[int, Producto]' = OrderedDict()
+        self._por_codigo: Dict[str, int] = {}
+        self._listado: Optional[List[int]] = None
+        self._pendientes = set()
+        self._invalidado = False
+        self._version = db.get_data_version(self.TABLA)
+        self._lock = threading.RLock()
+
+        # Métricas
+        self.hits = 0
+        self.misses = 0
+        self.delta_refreshes = 0
+        self.full_loads = 0
+        self.evictions = 0
+
+    # --- Invalidación ---
+
+    def marcar_modificados(self, producto_ids: Iterable[int]):
+        """Registrar productos modificados (se refrescan en la próxima lectura)"""
+        with self._lock:
+            self._pendientes.update(pid for pid in producto_ids if pid is not None)
+            db.bump_data_version(self.TABLA)
+
+    def invalidar(self):
+        """Invalidar la caché completa (p.ej. tras escrituras masivas)"""
+        with self._lock:
+            self._invalidado = True
+            db.bump_data_version(self.TABLA)
+
+    def _sincronizar(self):
+        """Aplicar los cambios pendientes si la versión de datos avanzó"""
+        version = db.get_data_version(self.TABLA)
+        if version == self._version:
+            return
+
+        if self._invalidado:
+            self._por_id.clear()
+            self._por_codigo.clear()
+            self._listado = None
+            self._pendientes.clear()
+            self._invalidado = False
+        elif self._pendientes:
+            pendientes = self._pendientes
+            self._pendientes = set()
+            # Solo se consultan los ids que la caché conoce o que afectan al listado
+            ids = [pid for pid in pendientes if pid in self._por_id or self._listado is not None]
+            if ids:
+                self._refrescar_ids(ids)
+
+        self._version = version
+
+    def _refrescar_ids(self, ids: List[int]):
+        """Refrescar un conjunto de productos con consultas delta"""
+        encontrados = {}
+        for i in range(0, len(ids), self.LOTE_DELTA):
+            lote = ids[i:i + self.LOTE_DELTA]
+            placeholders = ', '.join('?' for _ in lote)
+            query = f"SELECT * FROM productos WHERE id IN ({placeholders})"
+            for producto in repositorios.productos.query(query, tuple(lote)):
+                encontrados[producto.id] = producto
+        self.delta_refreshes += 1
+
+        for pid in ids:
+            self._quitar(pid)
+            if pid in encontrados:
+                self._guardar(encontrados[pid])
+
+        if self._listado is not None:
+            listado = set(self._listado)
+            listado.difference_update(ids)
+            listado.update(encontrados)
+            self._listado = sorted(listado, key=lambda pid: (self._por_id[pid].nombre, pid))
+
+    # --- Almacenamiento ---
+
+    def _guardar(self, producto: Producto):
+        anterior = self._por_id.get(producto.id)
+        if anterior is not None and anterior.codigo != producto.codigo:
+            self._por_codigo.pop(anterior.codigo, None)
+        self._por_id[producto.id] = producto
+        self._por_id.move_to_end(producto.id)
+        self._por_codigo[producto.codigo] = producto.id
+
+        while len(self._por_id) > self.max_items:
+            pid, evicted = self._por_id.popitem(last=False)
+            self._por_codigo.pop(evicted.codigo, None)
+            self.evictions += 1
+            # El listado completo solo es válido si todos sus productos están en caché
+            self._listado = None
+
+    def _quitar(self, producto_id: int):
+        producto = self._por_id.pop(producto_id, None)
+        if producto is not None:
+            self._por_codigo.pop(producto.codigo, None)
+
+    # --- Lecturas ---
+
+    def obtener(self, producto_id: int) -> Optional[Producto]:
+        """Obtener producto por id"""
+        with self._lock:
+            self._sincronizar()
+            producto = self._por_id.get(producto_id)
+            if producto is not None:
+                self.hits += 1
+                self._por_id.move_to_end(producto_id)
+                return producto
+
+            self.misses += 1
+            producto = repositorios.productos.get(producto_id)
+            if producto is None:
+                return None
+            self._guardar(producto)
+            return producto
+
+    def obtener_por_codigo(self, codigo: str) -> Optional[Producto]:
+        """Obtener producto por código (índice único)"""
+        with self._lock:
+            self._sincronizar()
+            producto_id = self._por_codigo.get(codigo)
+            if producto_id is not None:
+                self.hits += 1
+                self._por_id.move_to_end(producto_id)
+                return self._por_id[producto_id]
+
+            self.misses += 1
+            producto = repositorios.productos.find_one("codigo = ?", (codigo,))
+            if producto is None:
+                return None
+            self._guardar(producto)
+            return producto
+
+    def obtener_todos(self, activos_only: bool = True) -> List[Producto]:
+        """Obtener el catálogo completo ordenado por nombre"""
+        with self._lock:
+            self._sincronizar()
+            if self._listado is None:
+                self.misses += 1
+                self.full_loads += 1
+                productos = repositorios.productos.find_all(order_by="nombre")
+                if len(productos) > self.max_items:
+                    logger.warning(
+                        f"Catálogo de {len(productos)} productos excede la caché ({self.max_items}); "
+                        "se omite el listado en caché"
+                    )
+                    return [p for p in productos if p.activo or not activos_only]
+                for producto in productos:
+                    self._guardar(producto)
+                self._listado = [p.id for p in productos]
+            else:
+                self.hits += 1
+
+            return [
+                producto for producto in (self._por_id[pid] for pid in self._listado)
+                if producto.activo or not activos_only
+            ]
+
+    def estadisticas(self) -> dict:
+        """Métricas de la caché (aciertos, fallos, refrescos, tamaño)"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits / total) if total else 0.0,
+                'delta_refreshes': self.delta_refreshes,
+                'full_loads': self.full_loads,
+                'evictions': self.evictions,
+                'size': len(self._por_id),
+                'max_items': self.max_items,
+                'version': self._version
+            }
+
+# Instancia global
+catalogo = CatalogoCache()
@@ -1,9 +1,11 @@
 from config.database import db
-from models.compra import Compra, DetalleCompra
+from models.compra import Compra
 from core.exceptions import DatabaseError, ValidationError
 from core.logger import logger
 from services.inventario_service import InventarioService
-from services.producto_service import ProductoService
+from services.catalogo_service import catalogo
+from services import repositorios
+from core.repository import Repository
 from datetime import datetime
 
 class CompraService:
@@ -20,91 +22,36 @@ class CompraService:
                 LEFT JOIN usuarios u ON c.usuario_id = u.id 
                 ORDER BY c.fecha DESC
             """
-            results = db.execute_query(query)
-            compras = []
-            
-            for row in results:
-                compra_data = dict(row)
-                compra = Compra(
-                    id=compra_data['id'],
-                    numero_factura=compra_data['numero_factura'],
-                    fecha=datetime.fromisoformat(compra_data['fecha']) if compra_data['fecha'] else None,
-                    proveedor_id=compra_data['proveedor_id'],
-                    subtotal=compra_data['subtotal'],
-                    iva=compra_data['iva'],
-                    total=compra_data['total'],
-                    usuario_id=compra_data['usuario_id'],
-                    created_at=datetime.fromisoformat(compra_data['created_at']) if compra_data['created_at'] else None
-                )
-                
-                # Obtener detalles
-                detalles_query = """
-                    SELECT dc.*, p.nombre as producto_nombre, p.codigo as producto_codigo
-                    FROM detalle_compras dc 
-                    LEFT JOIN productos p ON dc.producto_id = p.id 
-                    WHERE dc.compra_id = ?
-                """
-                detalles_results = db.execute_query(detalles_query, (compra.id,))
-                
-                for detalle_row in detalles_results:
-                    detalle_data = dict(detalle_row)
-                    detalle = DetalleCompra(
-                        id=detalle_data['id'],
-                        compra_id=detalle_data['compra_id'],
-                        producto_id=detalle_data['producto_id'],
-                        cantidad=detalle_data['cantidad'],
-                        precio_unitario=detalle_data['precio_unitario'],
-                        total_linea=detalle_data['total_linea']
-                    )
-                    compra.agregar_detalle(detalle)
-                
-                compras.append(compra)
+            compras = repositorios.compras.query(query)
             
+            # Detalles de todas las compras en una sola consulta
+            detalles = repositorios.detalle_compras.find_all(order_by="compra_id, id")
+            CompraService._asignar_detalles(compras, detalles)
             return compras
             
         except Exception as e:
             logger.error(f"Error obteniendo compras: {e}")
             raise DatabaseError("Error al obtener compras")
     
+    @staticmethod
+    def _asignar_detalles(compras, detalles):
+        """Asignar a cada compra sus líneas de detalle"""
+        por_id = {compra.id: compra for compra in compras}
+        for detalle in detalles:
+            compra = por_id.get(detalle.compra_id)
+            if compra:
+                compra.agregar_detalle(detalle)
+    
     @staticmethod
     def obtener_por_id(compra_id: int):
         """Obtener compra por ID"""
         try:
-            query = "SELECT * FROM compras WHERE id = ?"
-            result = db.execute_query(query, (compra_id,))
-            
-            if not result:
+            compra = repositorios.compras.get(compra_id)
+            if not compra:
                 return None
             
-            compra_data = dict(result[0])
-            compra = Compra(
-                id=compra_data['id'],
-                numero_factura=compra_data['numero_factura'],
-                fecha=datetime.fromisoformat(compra_data['fecha']) if compra_data['fecha'] else None,
-                proveedor_id=compra_data['proveedor_id'],
-                subtotal=compra_data['subtotal'],
-                iva=compra_data['iva'],
-                total=compra_data['total'],
-                usuario_id=compra_data['usuario_id'],
-                created_at=datetime.fromisoformat(compra_data['created_at']) if compra_data['created_at'] else None
-            )
-            
             # Obtener detalles
-            detalles_query = "SELECT * FROM detalle_compras WHERE compra_id = ?"
-            detalles_results = db.execute_query(detalles_query, (compra_id,))
-            
-            for detalle_row in detalles_results:
-                detalle_data = dict(detalle_row)
-                detalle = DetalleCompra(
-                    id=detalle_data['id'],
-                    compra_id=detalle_data['compra_id'],
-                    producto_id=detalle_data['producto_id'],
-                    cantidad=detalle_data['cantidad'],
-                    precio_unitario=detalle_data['precio_unitario'],
-                    total_linea=detalle_data['total_linea']
-                )
-                compra.agregar_detalle(detalle)
-            
+            compra.detalles = repositorios.detalle_compras.find_all("compra_id = ?", (compra_id,), order_by="id")
             return compra
             
         except Exception as e:
@@ -146,10 +93,11 @@ class CompraService:
                 compra.usuario_id
             )
             
-            cursor.execute(query_compra, params_compra)
+            cursor.execute(db.adapt_query(query_compra), params_compra)
             compra_id = cursor.lastrowid
             
-            # Insertar detalles y actualizar stock
+            # Insertar detalles y actualizar stock dentro de la misma transacción
+            cambios_stock = []
             for detalle in compra.detalles:
                 detalle.compra_id = compra_id
                 detalle.calcular_total()
@@ -166,28 +114,46 @@ class CompraService:
                     detalle.precio_unitario,
                     detalle.total_linea
                 )
-                cursor.execute(query_detalle, params_detalle)
+                cursor.execute(db.adapt_query(query_detalle), params_detalle)
                 
                 # Actualizar stock y registrar movimiento
-                producto = ProductoService.obtener_por_id(detalle.producto_id)
-                nuevo_stock = producto.stock_actual + detalle.cantidad
+                cursor.execute(db.adapt_query(
+                    "SELECT stock_actual, stock_minimo, stock_maximo, activo FROM productos WHERE id = ?"
+                ), (detalle.producto_id,))
+                producto = cursor.fetchone()
+                if not producto:
+                    raise ValidationError(f"Producto ID {detalle.producto_id} no encontrado")
+                stock_anterior = producto['stock_actual']
+                nuevo_stock = stock_anterior + detalle.cantidad
                 
-                ProductoService.actualizar_stock(detalle.producto_id, nuevo_stock)
+                cursor.execute(db.adapt_query("UPDATE productos SET stock_actual = ? WHERE id = ?"),
+                               (nuevo_stock, detalle.producto_id))
                 
                 InventarioService.registrar_movimiento(
                     producto_id=detalle.producto_id,
                     tipo="entrada",
                     cantidad=detalle.cantidad,
-                    cantidad_anterior=producto.stock_actual,
+                    cantidad_anterior=stock_anterior,
                     cantidad_nueva=nuevo_stock,
                     motivo=f"Compra #{compra.numero_factura}",
                     referencia_id=compra_id,
                     referencia_tipo="compra",
-                    usuario_id=compra.usuario_id
+                    usuario_id=compra.usuario_id,
+                    cursor=cursor
                 )
+                cambios_stock.append((detalle.producto_id, stock_anterior, nuevo_stock, producto))
             
             conn.commit()
+            catalogo.marcar_modificados(c[0] for c in cambios_stock)
+            db.bump_data_version('compras')
             logger.info(f"Compra creada: {compra.numero_factura}")
+            
+            # Eventos de umbral solo tras confirmar la transacción
+            for producto_id, stock_anterior, nuevo_stock, producto in cambios_stock:
+                InventarioService.notificar_cambio_stock(
+                    producto_id, stock_anterior, nuevo_stock,
+                    producto['stock_minimo'], producto['stock_maximo'], bool(producto['activo'])
+                )
             return compra_id
             
         except Exception as e:
@@ -216,34 +182,71 @@ class CompraService:
             logger.error(f"Error generando número de factura: {e}")
             return f"F-{datetime.now().strftime('%Y%m%d')}-0001"
     
+    # Encabezados de compra con el nombre del proveedor (sin detalles)
+    _SELECT_CON_PROVEEDOR = """
+        SELECT c.id, c.numero_factura, c.fecha, c.proveedor_id, c.subtotal, c.iva, c.total,
+               c.usuario_id, p.nombre AS proveedor_nombre
+        FROM compras c
+        LEFT JOIN proveedores p ON c.proveedor_id = p.id
+    """
+    
+    @staticmethod
+    def _consultar_con_proveedor(desde=None, hasta=None, antes_de: tuple = None, limite: int = None,
+                                 columnar: bool = False):
+        """Compras (más recientes primero) filtradas por período y clave (fecha, id)"""
+        cursor, params = Repository.keyset_condition(('c.fecha', 'c.id'), antes_de)
+        condiciones, params = [cursor] if cursor else [], list(params)
+        if desde is not None:
+            condiciones.append("c.fecha >= ?")
+            params.append(desde)
+        if hasta is not None:
+            condiciones.append("c.fecha <= ?")
+            params.append(hasta)
+        query = CompraService._SELECT_CON_PROVEEDOR
+        if condiciones:
+            query += " WHERE " + " AND ".join(condiciones)
+        query += " ORDER BY c.fecha DESC, c.id DESC"
+        if limite is not None:
+            query += " LIMIT ?"
+            params.append(limite)
+        if columnar:
+            return repositorios.compras.query_columnar(query, params)
+        return repositorios.compras.query(query, params)
+    
+    @staticmethod
+    def obtener_compras_por_fecha(fecha_inicio: datetime, fecha_fin: datetime,
+                                  limite: int = None, antes_de: tuple = None):
+        """Compras del período con `proveedor_nombre`, en una sola consulta.
+        
+        Sin `limite` retorna todo el período como ColumnarResult. Con `limite`
+        retorna una página; la siguiente se pide con `antes_de` = (fecha, id)
+        de la última compra recibida.
+        """
+        try:
+            return CompraService._consultar_con_proveedor(
+                fecha_inicio, fecha_fin, antes_de, limite, columnar=limite is None
+            )
+        except Exception as e:
+            logger.error(f"Error obteniendo compras por fecha: {e}")
+            raise DatabaseError("Error al obtener compras por fecha")
+    
+    @staticmethod
+    def obtener_recientes(limite: int = 10, antes_de: tuple = None,
+                          desde: datetime = None, hasta: datetime = None):
+        """Compras más recientes, paginadas por clave (fecha, id) como en VentaService"""
+        try:
+            return CompraService._consultar_con_proveedor(desde, hasta, antes_de, limite)
+        except Exception as e:
+            logger.error(f"Error obteniendo compras recientes: {e}")
+            raise DatabaseError("Error al obtener compras recientes")
+    
     @staticmethod
     def obtener_compras_por_proveedor(proveedor_id: int):
         """Obtener compras por proveedor"""
         try:
-            query = """
-                SELECT * FROM compras 
-                WHERE proveedor_id = ? 
-                ORDER BY fecha DESC
-            """
-            results = db.execute_query(query, (proveedor_id,))
-            
-            compras = []
-            for row in results:
-                compra_data = dict(row)
-                compra = Compra(
-                    id=compra_data['id'],
-                    numero_factura=compra_data['numero_factura'],
-                    fecha=datetime.fromisoformat(compra_data['fecha']) if compra_data['fecha'] else None,
-                    proveedor_id=compra_data['proveedor_id'],
-                    subtotal=compra_data['subtotal'],
-                    iva=compra_data['iva'],
-                    total=compra_data['total'],
-                    usuario_id=compra_data['usuario_id']
-                )
-                compras.append(compra)
-            
-            return compras
-            
+            return repositorios.compras.find_columnar(
+                "proveedor_id = ?", (proveedor_id,), order_by="fecha DESC", skip=('created_at',)
+            )
         except Exception as e:
             logger.error(f"Error obteniendo compras por proveedor: {e}")
-            raise DatabaseError("Error al obtener compras por proveedor")
\ No newline at end of file
+            raise DatabaseError("Error al obtener compras por proveedor")
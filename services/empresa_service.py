@@ -2,6 +2,7 @@ from config.database import db
 from core.exceptions import DatabaseError, ValidationError
 from core.logger import logger
 from core.security import security
+from services import repositorios
 
 class EmpresaService:
     """Servicio para gestión de empresa"""
@@ -53,20 +54,12 @@ class EmpresaService:
     def actualizar_empresa(empresa_id: int, **kwargs):
         """Actualizar datos de la empresa"""
         try:
-            campos = []
-            valores = []
+            valores = {campo: valor for campo, valor in kwargs.items() if valor is not None}
             
-            for campo, valor in kwargs.items():
-                if valor is not None:
-                    campos.append(f"{campo} = ?")
-                    valores.append(valor)
-            
-            if not campos:
+            if not valores:
                 raise ValidationError("No hay datos para actualizar")
             
-            valores.append(empresa_id)
-            query = f"UPDATE empresas SET {', '.join(campos)} WHERE id = ?"
-            db.execute_query(query, valores)
+            repositorios.empresas.update(empresa_id, valores)
             
             logger.info("Empresa actualizada correctamente")
             return True
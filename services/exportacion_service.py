@@ -0,0 +1,243 @@
+import csv
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+from config.database import db
+from core.exceptions import DatabaseError, ValidationError
+from core.logger import logger
+from core.timestamps import parse_timestamp
+
+# Escritor XLSX opcional (openpyxl). Sin él solo se exporta a CSV.
+try:
+    from openpyxl import Workbook
+    _HAS_OPENPYXL = True
+except Exception:
+    Workbook = None
+    _HAS_OPENPYXL = False
+
+# Columna exportada: (encabezado, formateador del valor o None)
+Columna = Tuple[str, Optional[Callable]]
+# Avance informado tras cada lote: (filas escritas, total o None)
+Progreso = Callable[[int, Optional[int]], None]
+
+def _fecha(valor) -> str:
+    fecha = parse_timestamp(valor)
+    return fecha.strftime("%d/%m/%Y %H:%M") if fecha else ""
+
+class _EscritorCSV:
+    def __init__(self, path: Path, titulo: str):
+        # utf-8-sig: Excel reconoce las tildes al abrir el archivo
+        self._file = open(path, 'w', newline='', encoding='utf-8-sig', buffering=1 << 16)
+        self._writer = csv.writer(self._file)
+
+    def escribir(self, filas: Sequence[Sequence]):
+        self._writer.writerows(filas)
+
+    def cerrar(self):
+        self._file.close()
+
+    def descartar(self):
+        self._file.close()
+
+class _EscritorXLSX:
+    def __init__(self, path: Path, titulo: str):
+        # write_only: las filas se vuelcan a disco al agregarlas
+        self._path = path
+        self._libro = Workbook(write_only=True)
+        self._hoja = self._libro.create_sheet(titulo[:31])
+
+    def escribir(self, filas: Sequence[Sequence]):
+        for fila in filas:
+            self._hoja.append(fila)
+
+    def cerrar(self):
+        self._libro.save(self._path)
+
+    def descartar(self):
+        self._libro.close()
+
+class ExportacionService:
+    """Exportación de listados a CSV/XLSX leyendo y escribiendo por lotes"""
+
+    LOTE = 1000
+
+    COLUMNAS_VENTAS: List[Columna] = [
+        ("Fecha", _fecha), ("N° Boleta", None), ("Cliente", None), ("RUT", None),
+        ("Subtotal", None), ("IVA", None), ("Total", None),
+    ]
+    COLUMNAS_COMPRAS: List[Columna] = [
+        ("Fecha", _fecha), ("N° Factura", None), ("Proveedor", None),
+        ("Subtotal", None), ("IVA", None), ("Total", None),
+    ]
+    COLUMNAS_MOVIMIENTOS: List[Columna] = [
+        ("Fecha", _fecha), ("Código", None), ("Producto", None), ("Tipo", str.upper),
+        ("Cantidad", None), ("Stock Anterior", None), ("Stock Nuevo", None), ("Motivo", None),
+        ("Referencia", None), ("N° Referencia", None), ("Usuario", None),
+    ]
+
+    @staticmethod
+    def formatos_soportados() -> List[Tuple[str, str]]:
+        """Tipos de archivo para el diálogo de guardado"""
+        formatos = [("Archivos CSV", "*.csv")]
+        if _HAS_OPENPYXL:
+            formatos.append(("Archivos Excel", "*.xlsx"))
+        return formatos
+
+    @staticmethod
+    def _formatear(fila: Sequence, formateadores: List[Tuple[int, Callable]]) -> list:
+        fila = list(fila)
+        for i, formateador in formateadores:
+            if fila[i] is not None:
+                fila[i] = formateador(fila[i])
+        return fila
+
+    @staticmethod
+    def exportar_filas(
+        ruta: str,
+        columnas: Sequence[Columna],
+        lotes: Iterable[Sequence[Sequence]],
+        total: Optional[int] = None,
+        progreso: Optional[Progreso] = None,
+        cancelado: Optional[threading.Event] = None,
+        titulo: str = "Datos"
+    ) -> Optional[int]:
+        """Escribir lotes de filas en CSV o XLSX (según la extensión de `ruta`).
+
+        Cada lote se formatea y se escribe antes de pedir el siguiente, así la
+        memoria no depende del largo del listado. Se escribe en un archivo
+        temporal junto al destino, que lo reemplaza solo al terminar. Retorna
+        las filas escritas, o None si se canceló con `cancelado`.
+        """
+        path = Path(ruta)
+        xlsx = path.suffix.lower() == '.xlsx'
+        if xlsx and not _HAS_OPENPYXL:
+            raise ValidationError("Para exportar a Excel instale openpyxl")
+
+        parcial = path.with_name(path.name + '.parcial')
+        formateadores = [(i, formateador) for i, (_, formateador) in enumerate(columnas) if formateador]
+        escritas = 0
+        escritor = None
+        try:
+            escritor = (_EscritorXLSX if xlsx else _EscritorCSV)(parcial, titulo)
+            escritor.escribir([[encabezado for encabezado, _ in columnas]])
+            for lote in lotes:
+                if cancelado is not None and cancelado.is_set():
+                    break
+                if formateadores:
+                    lote = [ExportacionService._formatear(fila, formateadores) for fila in lote]
+                escritor.escribir(lote)
+                escritas += len(lote)
+                if progreso:
+                    progreso(escritas, total)
+            else:
+                escritor.cerrar()
+                escritor = None
+                os.replace(parcial, path)
+                logger.info(f"Exportadas {escritas} filas a {path}")
+                return escritas
+
+            logger.info(f"Exportación a {path} cancelada tras {escritas} filas")
+            return None
+        except OSError as e:
+            logger.error(f"Error escribiendo {path}: {e}")
+            raise ValidationError(f"No se pudo escribir el archivo {path.name}")
+        except Exception as e:
+            logger.error(f"Error exportando a {path}: {e}")
+            raise DatabaseError("Error al exportar los datos")
+        finally:
+            if escritor is not None:
+                escritor.descartar()
+            if parcial.exists():
+                parcial.unlink()
+
+    @staticmethod
+    def exportar_consulta(
+        ruta: str,
+        columnas: Sequence[Columna],
+        query: str,
+        params: Sequence = (),
+        total: Optional[int] = None,
+        progreso: Optional[Progreso] = None,
+        cancelado: Optional[threading.Event] = None,
+        titulo: str = "Datos"
+    ) -> Optional[int]:
+        """Exportar el resultado de un SELECT leyéndolo de a LOTE filas del cursor"""
+        lotes = db.iter_batches(query, tuple(params), ExportacionService.LOTE)
+        try:
+            return ExportacionService.exportar_filas(ruta, columnas, lotes, total, progreso, cancelado, titulo)
+        finally:
+            lotes.close()
+
+    @staticmethod
+    def _contar(query: str, params: Sequence) -> Optional[int]:
+        """Total de filas para la barra de avance (None si no se pudo contar)"""
+        try:
+            _, rows = db.query_rows(query, tuple(params))
+            return int(rows[0][0])
+        except Exception as e:
+            logger.error(f"Error contando filas a exportar: {e}")
+            return None
+
+    @staticmethod
+    def exportar_ventas(ruta: str, fecha_inicio, fecha_fin, progreso: Optional[Progreso] = None,
+                        cancelado: Optional[threading.Event] = None) -> Optional[int]:
+        """Exportar las ventas del período, más recientes primero"""
+        params = (fecha_inicio, fecha_fin)
+        total = ExportacionService._contar("SELECT COUNT(*) FROM ventas WHERE fecha BETWEEN ? AND ?", params)
+        query = """
+            SELECT fecha, numero_boleta, COALESCE(cliente_nombre, 'Consumidor Final'), cliente_rut,
+                   subtotal, iva, total
+            FROM ventas
+            WHERE fecha BETWEEN ? AND ?
+            ORDER BY fecha DESC, id DESC
+        """
+        return ExportacionService.exportar_consulta(
+            ruta, ExportacionService.COLUMNAS_VENTAS, query, params, total, progreso, cancelado, "Ventas"
+        )
+
+    @staticmethod
+    def exportar_compras(ruta: str, fecha_inicio, fecha_fin, progreso: Optional[Progreso] = None,
+                         cancelado: Optional[threading.Event] = None) -> Optional[int]:
+        """Exportar las compras del período con el nombre del proveedor"""
+        params = (fecha_inicio, fecha_fin)
+        total = ExportacionService._contar("SELECT COUNT(*) FROM compras WHERE fecha BETWEEN ? AND ?", params)
+        query = """
+            SELECT c.fecha, c.numero_factura, COALESCE(p.nombre, 'Proveedor'), c.subtotal, c.iva, c.total
+            FROM compras c
+            LEFT JOIN proveedores p ON c.proveedor_id = p.id
+            WHERE c.fecha BETWEEN ? AND ?
+            ORDER BY c.fecha DESC, c.id DESC
+        """
+        return ExportacionService.exportar_consulta(
+            ruta, ExportacionService.COLUMNAS_COMPRAS, query, params, total, progreso, cancelado, "Compras"
+        )
+
+    @staticmethod
+    def exportar_movimientos(ruta: str, producto_id: int = None, fecha_inicio=None, fecha_fin=None,
+                             progreso: Optional[Progreso] = None,
+                             cancelado: Optional[threading.Event] = None) -> Optional[int]:
+        """Exportar movimientos de inventario de un producto y/o un período"""
+        condiciones, params = [], []
+        if producto_id is not None:
+            condiciones.append("im.producto_id = ?")
+            params.append(producto_id)
+        if fecha_inicio is not None and fecha_fin is not None:
+            condiciones.append("im.created_at BETWEEN ? AND ?")
+            params += [fecha_inicio, fecha_fin]
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+
+        total = ExportacionService._contar(f"SELECT COUNT(*) FROM inventario_movimientos im {where}", params)
+        query = f"""
+            SELECT im.created_at, p.codigo, p.nombre, im.tipo, im.cantidad, im.cantidad_anterior,
+                   im.cantidad_nueva, im.motivo, im.referencia_tipo, im.referencia_id, u.nombre
+            FROM inventario_movimientos im
+            LEFT JOIN productos p ON im.producto_id = p.id
+            LEFT JOIN usuarios u ON im.usuario_id = u.id
+            {where}
+            ORDER BY im.created_at DESC, im.id DESC
+        """
+        return ExportacionService.exportar_consulta(
+            ruta, ExportacionService.COLUMNAS_MOVIMIENTOS, query, params, total, progreso, cancelado,
+            "Movimientos"
+        )
@@ -0,0 +1,377 @@
+import csv
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from config.database import db
+from core.exceptions import DatabaseError, ValidationError
+from core.logger import logger
+from core.utils import utils
+from core.money import money
+from services.catalogo_service import catalogo
+from services.inventario_service import InventarioService
+
+# Lector XLSX opcional (openpyxl). Sin él solo se importan archivos CSV.
+try:
+    import openpyxl
+    _HAS_OPENPYXL = True
+except Exception:
+    openpyxl = None
+    _HAS_OPENPYXL = False
+
+_MILES = re.compile(r'\d{1,3}(\.\d{3})+')
+
+@dataclass
+class ResultadoImportacion:
+    """Resumen de una importación de productos"""
+    insertados: int = 0
+    actualizados: int = 0
+    movimientos: int = 0
+    rechazados: List[Tuple[int, str]] = field(default_factory=list)  # (fila, motivo)
+    # Argumentos de InventarioService.notificar_cambio_stock aún sin publicar
+    cambios_stock: List[tuple] = field(default_factory=list)
+
+    @property
+    def procesados(self) -> int:
+        return self.insertados + self.actualizados
+
+class ImportacionService:
+    """Importación masiva de productos desde CSV/XLSX con upsert por código"""
+
+    LOTE = 1000
+    REQUERIDAS = ('codigo', 'nombre', 'categoria', 'precio_compra', 'precio_venta')
+    COLUMNAS = (
+        'codigo', 'nombre', 'descripcion', 'categoria', 'precio_compra', 'precio_venta',
+        'stock_actual', 'stock_minimo', 'stock_maximo', 'proveedor_id'
+    )
+    # Columnas que se actualizan si el código ya existe (el stock no se pisa)
+    ACTUALIZABLES = (
+        'nombre', 'descripcion', 'categoria', 'precio_compra', 'precio_venta',
+        'stock_minimo', 'stock_maximo', 'proveedor_id'
+    )
+
+    @staticmethod
+    def formatos_soportados() -> List[Tuple[str, str]]:
+        """Tipos de archivo para el diálogo de apertura"""
+        formatos = [("Archivos CSV", "*.csv")]
+        if _HAS_OPENPYXL:
+            formatos.append(("Archivos Excel", "*.xlsx"))
+        return formatos
+
+    # --- Lectura ---
+
+    @staticmethod
+    def _normalizar_encabezado(nombre) -> str:
+        return re.sub(r'\W+', '_', utils.normalize_text(str(nombre or '')).strip()).strip('_')
+
+    @staticmethod
+    def leer_filas(ruta: str, encoding: str = 'utf-8-sig') -> Iterator[Tuple[int, Dict[str, object]]]:
+        """Leer el archivo fila a fila. Retorna (número de fila, valores por columna)."""
+        path = Path(ruta)
+        if path.suffix.lower() == '.xlsx':
+            yield from ImportacionService._leer_xlsx(path)
+        else:
+            yield from ImportacionService._leer_csv(path, encoding)
+
+    @staticmethod
+    def _fila(encabezados: List[str], valores) -> Dict[str, object]:
+        """Valores por columna; las celdas faltantes al final de la fila quedan en None"""
+        fila = dict.fromkeys(encabezados)
+        fila.update(zip(encabezados, valores))
+        return fila
+
+    @staticmethod
+    def _leer_csv(path: Path, encoding: str):
+        with open(path, newline='', encoding=encoding) as f:
+            muestra = f.read(4096)
+            f.seek(0)
+            try:
+                dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+            except csv.Error:
+                dialecto = csv.excel
+            reader = csv.reader(f, dialecto)
+            encabezados = [ImportacionService._normalizar_encabezado(h) for h in next(reader, [])]
+            for numero, valores in enumerate(reader, start=2):
+                if any(v.strip() for v in valores):
+                    yield numero, ImportacionService._fila(encabezados, valores)
+
+    @staticmethod
+    def _leer_xlsx(path: Path):
+        if not _HAS_OPENPYXL:
+            raise ValidationError("Para importar archivos Excel instale openpyxl")
+        libro = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            filas = libro.active.iter_rows(values_only=True)
+            encabezados = [ImportacionService._normalizar_encabezado(h) for h in next(filas, ())]
+            for numero, valores in enumerate(filas, start=2):
+                if any(v not in (None, '') for v in valores):
+                    yield numero, ImportacionService._fila(encabezados, valores)
+        finally:
+            libro.close()
+
+    # --- Validación ---
+
+    @staticmethod
+    def _numero(valor, nombre: str) -> float:
+        """Convertir un valor numérico aceptando formato chileno (1.234,5)"""
+        if isinstance(valor, (int, float)):
+            return float(valor)
+        texto = str(valor or '').replace('$', '').replace(' ', '').strip()
+        if not texto:
+            raise ValueError(f"{nombre} vacío")
+        if ',' in texto:
+            texto = texto.replace('.', '').replace(',', '.')
+        elif _MILES.fullmatch(texto):
+            texto = texto.replace('.', '')
+        try:
+            return float(texto)
+        except ValueError:
+            raise ValueError(f"{nombre} inválido: {valor}")
+
+    @staticmethod
+    def _entero(valor, nombre: str, defecto: int) -> int:
+        if valor is None or str(valor).strip() == '':
+            return defecto
+        numero = ImportacionService._numero(valor, nombre)
+        if numero != int(numero):
+            raise ValueError(f"{nombre} debe ser entero: {valor}")
+        return int(numero)
+
+    @staticmethod
+    def columnas_presentes(fila: Dict[str, object]) -> Tuple[str, ...]:
+        """Columnas de COLUMNAS que trae el archivo (en el orden de COLUMNAS)"""
+        return tuple(c for c in ImportacionService.COLUMNAS if c in fila or c in ImportacionService.REQUERIDAS)
+
+    @staticmethod
+    def _validar_fila(fila: Dict[str, object], proveedores: set, columnas: Sequence[str] = None) -> tuple:
+        """Validar una fila y retornar los valores de `columnas` (por defecto, COLUMNAS)"""
+        textos = {}
+        for campo in ('codigo', 'nombre', 'descripcion', 'categoria'):
+            valor = fila.get(campo)
+            textos[campo] = '' if valor is None else str(valor).strip()
+        for campo in ('codigo', 'nombre', 'categoria'):
+            if not textos[campo]:
+                raise ValueError(f"{campo} es obligatorio")
+
+        precio_compra = money.to_pesos(ImportacionService._numero(fila.get('precio_compra'), 'precio_compra'))
+        precio_venta = money.to_pesos(ImportacionService._numero(fila.get('precio_venta'), 'precio_venta'))
+        if precio_compra <= 0 or precio_venta <= 0:
+            raise ValueError("Los precios deben ser mayores a 0")
+        if precio_venta < precio_compra:
+            raise ValueError("El precio de venta no puede ser menor al precio de compra")
+
+        stock_actual = ImportacionService._entero(fila.get('stock_actual'), 'stock_actual', 0)
+        stock_minimo = ImportacionService._entero(fila.get('stock_minimo'), 'stock_minimo', 10)
+        stock_maximo = ImportacionService._entero(fila.get('stock_maximo'), 'stock_maximo', 100)
+        if stock_actual < 0 or stock_minimo < 0 or stock_maximo < 0:
+            raise ValueError("El stock no puede ser negativo")
+
+        proveedor_id = None
+        if fila.get('proveedor_id') not in (None, ''):
+            proveedor_id = ImportacionService._entero(fila.get('proveedor_id'), 'proveedor_id', None)
+            if proveedor_id not in proveedores:
+                raise ValueError(f"Proveedor {proveedor_id} no existe")
+
+        valores = {
+            'codigo': textos['codigo'], 'nombre': textos['nombre'], 'descripcion': textos['descripcion'],
+            'categoria': textos['categoria'], 'precio_compra': precio_compra, 'precio_venta': precio_venta,
+            'stock_actual': stock_actual, 'stock_minimo': stock_minimo, 'stock_maximo': stock_maximo,
+            'proveedor_id': proveedor_id,
+        }
+        return tuple(valores[c] for c in (columnas or ImportacionService.COLUMNAS))
+
+    # --- Escritura ---
+
+    @staticmethod
+    def _query_upsert(columnas: Sequence[str]) -> str:
+        """Upsert de las columnas del archivo: las que no trae no se tocan en productos existentes
+        y en los nuevos toman el valor por defecto de la tabla"""
+        actualizables = [c for c in ImportacionService.ACTUALIZABLES if c in columnas]
+        placeholders = ', '.join('?' for _ in columnas)
+        if db.is_mysql:
+            cambios = ', '.join(f"{c} = VALUES({c})" for c in actualizables)
+            conflicto = f"ON DUPLICATE KEY UPDATE {cambios}"
+        else:
+            cambios = ', '.join(f"{c} = excluded.{c}" for c in actualizables)
+            conflicto = f"ON CONFLICT(codigo) DO UPDATE SET {cambios}"
+        return db.adapt_query(f"INSERT INTO productos ({', '.join(columnas)}) VALUES ({placeholders}) {conflicto}")
+
+    @staticmethod
+    def _codigos_existentes(cursor, codigos: List[str]) -> Dict[str, int]:
+        placeholders = ', '.join('?' for _ in codigos)
+        cursor.execute(
+            db.adapt_query(f"SELECT id, codigo FROM productos WHERE codigo IN ({placeholders})"),
+            tuple(codigos)
+        )
+        return {row['codigo']: row['id'] for row in cursor.fetchall()}
+
+    @staticmethod
+    def _escribir_lote(cursor, lote: List[tuple], columnas: Sequence[str], usuario_id: int,
+                       resultado: ResultadoImportacion, nuevos: set):
+        """Upsert de un lote y movimientos de stock inicial de los productos nuevos.
+
+        `columnas` son las del archivo, en el orden de los valores de cada fila;
+        los códigos insertados se agregan a `nuevos`.
+        """
+        i_codigo = columnas.index('codigo')
+        i_stock = columnas.index('stock_actual') if 'stock_actual' in columnas else None
+        codigos = [fila[i_codigo] for fila in lote]
+        existentes = ImportacionService._codigos_existentes(cursor, codigos)
+
+        cursor.executemany(ImportacionService._query_upsert(columnas), lote)
+
+        nuevos.update(codigo for codigo in codigos if codigo not in existentes)
+        nuevos_con_stock = {}
+        if i_stock is not None:
+            nuevos_con_stock = {
+                fila[i_codigo]: fila[i_stock] for fila in lote
+                if fila[i_codigo] not in existentes and fila[i_stock] > 0
+            }
+        resultado.actualizados += sum(1 for codigo in codigos if codigo in existentes)
+        resultado.insertados += len(lote) - sum(1 for codigo in codigos if codigo in existentes)
+
+        if nuevos_con_stock:
+            ids = ImportacionService._codigos_existentes(cursor, list(nuevos_con_stock))
+            movimientos = [
+                (ids[codigo], 'entrada', stock, 0, stock, 'Stock inicial (importación)', usuario_id)
+                for codigo, stock in nuevos_con_stock.items()
+            ]
+            cursor.executemany(db.adapt_query("""
+                INSERT INTO inventario_movimientos
+                (producto_id, tipo, cantidad, cantidad_anterior, cantidad_nueva, motivo, usuario_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """), movimientos)
+            resultado.movimientos += len(movimientos)
+
+    @staticmethod
+    def importar_productos(
+        ruta: str,
+        usuario_id: int,
+        progreso: Optional[Callable[[int], None]] = None,
+        cancelado: Optional[threading.Event] = None,
+        publicar: bool = True
+    ) -> Optional[ResultadoImportacion]:
+        """Importar productos desde un archivo CSV/XLSX.
+
+        Los códigos existentes se actualizan (sin modificar su stock ni las columnas
+        que el archivo no trae) y los nuevos se insertan con su movimiento de stock
+        inicial. Todo el archivo se escribe en una sola transacción; las filas
+        inválidas se informan en el resultado. Con `cancelado` activo se revierte
+        todo y se retorna None.
+
+        Al terminar se publican los cambios de estado de alerta de stock. Desde
+        otro hilo usar `publicar=False` y luego publicar_alertas(resultado) en el
+        hilo de Tk, ya que los suscriptores actualizan widgets.
+        """
+        resultado = ResultadoImportacion()
+        nuevos = set()
+        conn = None
+        try:
+            alertas_antes = InventarioService.obtener_estados_alerta()
+            conn = db.get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM proveedores")
+            proveedores = {row['id'] for row in cursor.fetchall()}
+
+            columnas = None
+            vistos = {}
+            lote = []
+            leidas = 0
+            for numero, fila in ImportacionService.leer_filas(ruta):
+                if cancelado is not None and cancelado.is_set():
+                    conn.rollback()
+                    logger.info(f"Importación de productos desde {ruta} cancelada tras {leidas} filas")
+                    return None
+                leidas += 1
+                if columnas is None:
+                    columnas = ImportacionService.columnas_presentes(fila)
+                try:
+                    valores = ImportacionService._validar_fila(fila, proveedores, columnas)
+                except ValueError as e:
+                    resultado.rechazados.append((numero, str(e)))
+                    continue
+
+                codigo = valores[0]
+                if codigo in vistos:
+                    resultado.rechazados.append((numero, f"Código {codigo} repetido (fila {vistos[codigo]})"))
+                    continue
+                vistos[codigo] = numero
+
+                lote.append(valores)
+                if len(lote) >= ImportacionService.LOTE:
+                    ImportacionService._escribir_lote(cursor, lote, columnas, usuario_id, resultado, nuevos)
+                    lote = []
+                    if progreso:
+                        progreso(leidas)
+
+            if lote:
+                ImportacionService._escribir_lote(cursor, lote, columnas, usuario_id, resultado, nuevos)
+            conn.commit()
+            if resultado.procesados:
+                catalogo.invalidar()
+            if progreso:
+                progreso(leidas)
+
+            logger.info(
+                f"Importación de productos desde {ruta}: {resultado.insertados} nuevos, "
+                f"{resultado.actualizados} actualizados, {len(resultado.rechazados)} rechazados"
+            )
+
+        except ValidationError:
+            if conn:
+                conn.rollback()
+            raise
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            logger.error(f"Error importando productos desde {ruta}: {e}")
+            raise DatabaseError("Error al importar productos")
+        finally:
+            if conn:
+                conn.close()
+
+        if resultado.procesados:
+            resultado.cambios_stock = ImportacionService._cambios_alerta(alertas_antes, nuevos)
+        if publicar:
+            ImportacionService.publicar_alertas(resultado)
+        return resultado
+
+    @staticmethod
+    def publicar_alertas(resultado: ResultadoImportacion):
+        """Publicar los cambios de estado de stock que dejó la importación"""
+        cambios, resultado.cambios_stock = resultado.cambios_stock, []
+        for producto_id, stock_anterior, stock_nuevo, minimo, maximo, activo, estado_anterior in cambios:
+            InventarioService.notificar_cambio_stock(
+                producto_id, stock_anterior, stock_nuevo, minimo, maximo, activo,
+                estado_anterior=estado_anterior
+            )
+
+    @staticmethod
+    def _cambios_alerta(alertas_antes: Dict[int, str], nuevos: set) -> List[tuple]:
+        """Cambios de estado de stock de los productos nuevos o con umbrales modificados"""
+        try:
+            alertas_despues = InventarioService.obtener_estados_alerta()
+            cambiados = [
+                producto_id for producto_id in alertas_antes.keys() | alertas_despues.keys()
+                if alertas_antes.get(producto_id, 'normal') != alertas_despues.get(producto_id, 'normal')
+            ]
+            if not cambiados:
+                return []
+            placeholders = ', '.join('?' for _ in cambiados)
+            query = f"""
+                SELECT id, codigo, stock_actual, stock_minimo, stock_maximo, activo
+                FROM productos WHERE id IN ({placeholders})
+            """
+            productos = db.execute_query(query, tuple(cambiados))
+        except Exception as e:
+            # Los datos ya quedaron importados: solo se pierde el aviso a las vistas
+            logger.error(f"Error obteniendo alertas tras la importación: {e}")
+            return []
+
+        return [
+            (producto['id'], 0 if producto['codigo'] in nuevos else producto['stock_actual'],
+             producto['stock_actual'], producto['stock_minimo'], producto['stock_maximo'],
+             bool(producto['activo']), alertas_antes.get(producto['id'], 'normal'))
+            for producto in productos
+        ]
@@ -1,7 +1,12 @@
 from config.database import db
-from models.inventario import InventarioMovimiento
 from core.exceptions import DatabaseError, ValidationError
+from core.events import (
+    event_bus, STOCK_ESTADO_CAMBIADO, STOCK_BAJO_MINIMO, STOCK_AGOTADO, STOCK_SOBRE_MAXIMO
+)
 from core.logger import logger
+from services.catalogo_service import catalogo
+from services import repositorios
+from core.repository import Repository
 from datetime import datetime
 
 class InventarioService:
@@ -17,9 +22,14 @@ class InventarioService:
         motivo: str = "",
         referencia_id: int = None,
         referencia_tipo: str = None,
-        usuario_id: int = None
+        usuario_id: int = None,
+        cursor=None
     ):
-        """Registrar movimiento de inventario"""
+        """Registrar movimiento de inventario.
+
+        Si se entrega `cursor`, el movimiento se inserta dentro de la transacción
+        del llamador (sin commit propio).
+        """
         try:
             # Validaciones
             if tipo not in ['entrada', 'salida', 'ajuste']:
@@ -39,7 +49,11 @@ class InventarioService:
                 motivo, referencia_id, referencia_tipo, usuario_id
             )
             
-            movimiento_id = db.execute_query(query, params)
+            if cursor is not None:
+                cursor.execute(db.adapt_query(query), params)
+                movimiento_id = cursor.lastrowid
+            else:
+                movimiento_id = db.execute_query(query, params)
             logger.info(f"Movimiento de inventario registrado: {tipo} para producto {producto_id}")
             return movimiento_id
             
@@ -49,40 +63,44 @@ class InventarioService:
             logger.error(f"Error registrando movimiento de inventario: {e}")
             raise DatabaseError("Error al registrar movimiento de inventario")
     
+    _SELECT_MOVIMIENTOS = """
+        SELECT im.*, p.nombre as producto_nombre, p.codigo as producto_codigo,
+               u.nombre as usuario_nombre
+        FROM inventario_movimientos im
+        LEFT JOIN productos p ON im.producto_id = p.id
+        LEFT JOIN usuarios u ON im.usuario_id = u.id
+    """
+    
     @staticmethod
-    def obtener_movimientos_por_producto(producto_id: int, limit: int = 100):
-        """Obtener movimientos de inventario por producto"""
+    def _consultar_movimientos(condiciones: list, params: list, antes_de: tuple = None,
+                               limite: int = None, columnar: bool = False):
+        """Movimientos (más recientes primero) paginados por clave (created_at, id)"""
+        cursor, cursor_params = Repository.keyset_condition(('im.created_at', 'im.id'), antes_de)
+        if cursor:
+            condiciones = condiciones + [cursor]
+            params = list(params) + list(cursor_params)
+        query = InventarioService._SELECT_MOVIMIENTOS
+        if condiciones:
+            query += " WHERE " + " AND ".join(condiciones)
+        query += " ORDER BY im.created_at DESC, im.id DESC"
+        if limite is not None:
+            query += " LIMIT ?"
+            params = list(params) + [limite]
+        if columnar:
+            return repositorios.movimientos.query_columnar(query, params)
+        return repositorios.movimientos.query(query, params)
+    
+    @staticmethod
+    def obtener_movimientos_por_producto(producto_id: int, limit: int = 100, antes_de: tuple = None):
+        """Obtener movimientos de inventario por producto.
+        
+        La página siguiente se pide con `antes_de` = (created_at, id) del
+        último movimiento recibido.
+        """
         try:
-            query = """
-                SELECT im.*, p.nombre as producto_nombre, u.nombre as usuario_nombre
-                FROM inventario_movimientos im
-                LEFT JOIN productos p ON im.producto_id = p.id
-                LEFT JOIN usuarios u ON im.usuario_id = u.id
-                WHERE im.producto_id = ?
-                ORDER BY im.created_at DESC
-                LIMIT ?
-            """
-            results = db.execute_query(query, (producto_id, limit))
-            
-            movimientos = []
-            for row in results:
-                movimiento_data = dict(row)
-                movimiento = InventarioMovimiento(
-                    id=movimiento_data['id'],
-                    producto_id=movimiento_data['producto_id'],
-                    tipo=movimiento_data['tipo'],
-                    cantidad=movimiento_data['cantidad'],
-                    cantidad_anterior=movimiento_data['cantidad_anterior'],
-                    cantidad_nueva=movimiento_data['cantidad_nueva'],
-                    motivo=movimiento_data['motivo'],
-                    referencia_id=movimiento_data['referencia_id'],
-                    referencia_tipo=movimiento_data['referencia_tipo'],
-                    usuario_id=movimiento_data['usuario_id'],
-                    created_at=datetime.fromisoformat(movimiento_data['created_at']) if movimiento_data['created_at'] else None
-                )
-                movimientos.append(movimiento)
-            
-            return movimientos
+            return InventarioService._consultar_movimientos(
+                ["im.producto_id = ?"], [producto_id], antes_de, limit
+            )
             
         except Exception as e:
             logger.error(f"Error obteniendo movimientos para producto {producto_id}: {e}")
@@ -92,37 +110,9 @@ class InventarioService:
     def obtener_movimientos_por_fecha(fecha_inicio: datetime, fecha_fin: datetime):
         """Obtener movimientos por rango de fechas"""
         try:
-            query = """
-                SELECT im.*, p.nombre as producto_nombre, p.codigo as producto_codigo,
-                       u.nombre as usuario_nombre
-                FROM inventario_movimientos im
-                LEFT JOIN productos p ON im.producto_id = p.id
-                LEFT JOIN usuarios u ON im.usuario_id = u.id
-                WHERE im.created_at BETWEEN ? AND ?
-                ORDER BY im.created_at DESC
-            """
-            params = (fecha_inicio, fecha_fin)
-            results = db.execute_query(query, params)
-            
-            movimientos = []
-            for row in results:
-                movimiento_data = dict(row)
-                movimiento = InventarioMovimiento(
-                    id=movimiento_data['id'],
-                    producto_id=movimiento_data['producto_id'],
-                    tipo=movimiento_data['tipo'],
-                    cantidad=movimiento_data['cantidad'],
-                    cantidad_anterior=movimiento_data['cantidad_anterior'],
-                    cantidad_nueva=movimiento_data['cantidad_nueva'],
-                    motivo=movimiento_data['motivo'],
-                    referencia_id=movimiento_data['referencia_id'],
-                    referencia_tipo=movimiento_data['referencia_tipo'],
-                    usuario_id=movimiento_data['usuario_id'],
-                    created_at=datetime.fromisoformat(movimiento_data['created_at']) if movimiento_data['created_at'] else None
-                )
-                movimientos.append(movimiento)
-            
-            return movimientos
+            return InventarioService._consultar_movimientos(
+                ["im.created_at BETWEEN ? AND ?"], [fecha_inicio, fecha_fin], columnar=True
+            )
             
         except Exception as e:
             logger.error(f"Error obteniendo movimientos por fecha: {e}")
@@ -137,8 +127,12 @@ class InventarioService:
             cursor = conn.cursor()
             
             # Obtener stock actual
-            query_stock = "SELECT stock_actual FROM productos WHERE id = ?"
-            result = cursor.execute(query_stock, (producto_id,)).fetchone()
+            query_stock = """
+                SELECT stock_actual, stock_minimo, stock_maximo, activo
+                FROM productos WHERE id = ?
+            """
+            cursor.execute(db.adapt_query(query_stock), (producto_id,))
+            result = cursor.fetchone()
             
             if not result:
                 raise ValidationError("Producto no encontrado")
@@ -157,9 +151,9 @@ class InventarioService:
             
             # Actualizar stock
             query_update = "UPDATE productos SET stock_actual = ? WHERE id = ?"
-            cursor.execute(query_update, (nueva_cantidad, producto_id))
+            cursor.execute(db.adapt_query(query_update), (nueva_cantidad, producto_id))
             
-            # Registrar movimiento
+            # Registrar movimiento en la misma transacción
             tipo = "ajuste"
             InventarioService.registrar_movimiento(
                 producto_id=producto_id,
@@ -168,11 +162,18 @@ class InventarioService:
                 cantidad_anterior=stock_actual,
                 cantidad_nueva=nueva_cantidad,
                 motivo=motivo,
-                usuario_id=usuario_id
+                usuario_id=usuario_id,
+                cursor=cursor
             )
             
             conn.commit()
+            catalogo.marcar_modificados([producto_id])
             logger.info(f"Stock ajustado para producto {producto_id}: {stock_actual} -> {nueva_cantidad}")
+            
+            InventarioService.notificar_cambio_stock(
+                producto_id, stock_actual, nueva_cantidad,
+                result['stock_minimo'], result['stock_maximo'], bool(result['activo'])
+            )
             return True
             
         except Exception as e:
@@ -186,6 +187,85 @@ class InventarioService:
             if conn:
                 conn.close()
     
+    @staticmethod
+    def clasificar_stock(stock_actual: int, stock_minimo: int, stock_maximo: int, activo: bool = True) -> str:
+        """Clasificar el estado de stock de un producto.
+
+        Retorna 'sin_stock', 'bajo', 'excesivo' o 'normal'. Los productos inactivos
+        no generan alertas y se consideran 'normal'.
+        """
+        if not activo:
+            return 'normal'
+        if stock_actual <= 0:
+            return 'sin_stock'
+        if stock_actual <= stock_minimo:
+            return 'bajo'
+        if stock_actual > stock_maximo:
+            return 'excesivo'
+        return 'normal'
+    
+    @staticmethod
+    def notificar_cambio_stock(
+        producto_id: int,
+        stock_anterior: int,
+        stock_nuevo: int,
+        stock_minimo: int,
+        stock_maximo: int,
+        activo: bool = True,
+        estado_anterior: str = None
+    ):
+        """Publicar eventos de cruce de umbral tras una escritura de stock.
+
+        Solo se publica cuando cambia el estado del producto, de modo que los
+        suscriptores (badge del menú, vista de alertas) se actualizan en O(1)
+        sin recalcular todo el inventario. `estado_anterior` permite indicar el
+        estado previo cuando también cambiaron los umbrales o el estado activo.
+        """
+        if estado_anterior is None:
+            estado_anterior = InventarioService.clasificar_stock(stock_anterior, stock_minimo, stock_maximo, activo)
+        estado_nuevo = InventarioService.clasificar_stock(stock_nuevo, stock_minimo, stock_maximo, activo)
+        
+        if estado_anterior == estado_nuevo:
+            return
+        
+        payload = {
+            'producto_id': producto_id,
+            'stock_anterior': stock_anterior,
+            'stock_nuevo': stock_nuevo,
+            'stock_minimo': stock_minimo,
+            'stock_maximo': stock_maximo,
+            'estado_anterior': estado_anterior,
+            'estado_nuevo': estado_nuevo
+        }
+        event_bus.publish(STOCK_ESTADO_CAMBIADO, payload)
+        
+        if estado_nuevo == 'sin_stock':
+            event_bus.publish(STOCK_AGOTADO, payload)
+        elif estado_nuevo == 'bajo' and estado_anterior != 'sin_stock':
+            event_bus.publish(STOCK_BAJO_MINIMO, payload)
+        elif estado_nuevo == 'excesivo':
+            event_bus.publish(STOCK_SOBRE_MAXIMO, payload)
+    
+    @staticmethod
+    def obtener_estados_alerta():
+        """Obtener {producto_id: estado} de los productos activos con alerta de stock"""
+        try:
+            query = """
+                SELECT id, stock_actual, stock_minimo, stock_maximo
+                FROM productos
+                WHERE activo = 1 AND (stock_actual <= stock_minimo OR stock_actual > stock_maximo)
+            """
+            results = db.execute_query(query)
+            return {
+                row['id']: InventarioService.clasificar_stock(
+                    row['stock_actual'], row['stock_minimo'], row['stock_maximo']
+                )
+                for row in results
+            }
+        except Exception as e:
+            logger.error(f"Error obteniendo estados de alerta: {e}")
+            raise DatabaseError("Error al obtener alertas de stock")
+    
     @staticmethod
     def obtener_kpi_inventario():
         """Obtener KPIs del inventario"""
@@ -236,4 +316,16 @@ class InventarioService:
             
         except Exception as e:
             logger.error(f"Error obteniendo KPIs de inventario: {e}")
-            raise DatabaseError("Error al obtener KPIs de inventario")
\ No newline at end of file
+            raise DatabaseError("Error al obtener KPIs de inventario")
+    
+    @staticmethod
+    def obtener_valor_inventario() -> int:
+        """Valor del stock activo a precio de compra (una sola consulta)"""
+        try:
+            _, rows = db.query_rows(
+                "SELECT COALESCE(SUM(stock_actual * precio_compra), 0) FROM productos WHERE activo = 1"
+            )
+            return int(rows[0][0])
+        except Exception as e:
+            logger.error(f"Error obteniendo valor de inventario: {e}")
+            raise DatabaseError("Error al obtener valor de inventario")
\ No newline at end of file
@@ -0,0 +1,160 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from config.database import db
+from core.exceptions import DatabaseError, ValidationError
+from core.logger import logger
+from services.catalogo_service import catalogo
+
+@dataclass
+class ReglaPrecio:
+    """Regla de cambio masivo de precio de venta.
+
+    tipo: 'porcentaje' (sobre el precio de venta), 'monto' (suma al precio de
+    venta) o 'margen' (precio de compra + margen %). Los filtros vacíos no
+    restringen; sin filtros la regla aplica a todo el catálogo.
+    """
+    tipo: str
+    valor: float
+    categoria: Optional[str] = None
+    proveedor_id: Optional[int] = None
+    codigos: Optional[List[str]] = None
+    redondeo: int = 1  # múltiplo al que se redondea el nuevo precio
+
+@dataclass
+class ResultadoPrecios:
+    """Resumen de la aplicación de reglas de precio"""
+    actualizados: int = 0
+    omitidos: int = 0  # quedarían bajo el precio de compra o sin cambio
+
+class PrecioService:
+    """Servicio de actualización masiva de precios"""
+
+    TIPOS = ('porcentaje', 'monto', 'margen')
+
+    @staticmethod
+    def _validar(regla: ReglaPrecio):
+        if regla.tipo not in PrecioService.TIPOS:
+            raise ValidationError("Tipo de regla de precio inválido")
+        if isinstance(regla.valor, bool) or not isinstance(regla.valor, (int, float)):
+            raise ValidationError("El valor de la regla de precio debe ser numérico")
+        if regla.redondeo <= 0:
+            raise ValidationError("El redondeo debe ser mayor a 0")
+        if regla.tipo == 'margen' and regla.valor < 0:
+            raise ValidationError("El margen no puede ser negativo")
+
+    @staticmethod
+    def _expresion(regla: ReglaPrecio) -> Tuple[str, list]:
+        """Expresión SQL del nuevo precio (redondeada al múltiplo indicado)"""
+        # Los montos son INTEGER: con valor y redondeo enteros la división sería
+        # entera y truncaría en vez de redondear
+        valor, redondeo = float(regla.valor), float(regla.redondeo)
+        if regla.tipo == 'porcentaje':
+            base, params = "precio_venta * (1 + ? / 100.0)", [valor]
+        elif regla.tipo == 'monto':
+            base, params = "precio_venta + ?", [valor]
+        else:
+            base, params = "precio_compra * (1 + ? / 100.0)", [valor]
+        return f"ROUND(({base}) / ?, 0) * ?", params + [redondeo, redondeo]
+
+    @staticmethod
+    def _filtro(regla: ReglaPrecio) -> Tuple[str, list]:
+        condiciones = []
+        params = []
+        if regla.categoria:
+            condiciones.append("categoria = ?")
+            params.append(regla.categoria)
+        if regla.proveedor_id:
+            condiciones.append("proveedor_id = ?")
+            params.append(regla.proveedor_id)
+        if regla.codigos:
+            condiciones.append(f"codigo IN ({', '.join('?' for _ in regla.codigos)})")
+            params.extend(regla.codigos)
+        return (' AND '.join(condiciones) or '1 = 1'), params
+
+    @staticmethod
+    def contar_afectados(regla: ReglaPrecio) -> int:
+        """Cantidad de productos que coinciden con los filtros de la regla"""
+        try:
+            filtro, params = PrecioService._filtro(regla)
+            result = db.execute_query(f"SELECT COUNT(*) AS total FROM productos WHERE {filtro}", tuple(params))
+            return result[0]['total'] if result else 0
+        except Exception as e:
+            logger.error(f"Error contando productos para regla de precio: {e}")
+            raise DatabaseError("Error al contar productos")
+
+    @staticmethod
+    def aplicar_reglas(reglas: List[ReglaPrecio], usuario_id: int, motivo: str = "") -> ResultadoPrecios:
+        """Aplicar reglas de precio en una sola transacción.
+
+        Cada regla se ejecuta como un INSERT ... SELECT al historial y un UPDATE
+        sobre el conjunto filtrado. Las reglas se aplican en orden, por lo que
+        una regla ve los precios dejados por las anteriores. Los productos cuyo
+        nuevo precio quedaría bajo el precio de compra no se modifican.
+        """
+        for regla in reglas:
+            PrecioService._validar(regla)
+
+        resultado = ResultadoPrecios()
+        conn = None
+        try:
+            conn = db.get_connection()
+            cursor = conn.cursor()
+
+            for regla in reglas:
+                nuevo, params_nuevo = PrecioService._expresion(regla)
+                filtro, params_filtro = PrecioService._filtro(regla)
+                condicion = f"{filtro} AND {nuevo} <> precio_venta AND {nuevo} >= precio_compra AND {nuevo} > 0"
+                params_condicion = params_filtro + params_nuevo * 3
+
+                cursor.execute(
+                    db.adapt_query(f"SELECT COUNT(*) AS total FROM productos WHERE {filtro}"),
+                    tuple(params_filtro)
+                )
+                coincidencias = cursor.fetchone()['total']
+
+                cursor.execute(db.adapt_query(f"""
+                    INSERT INTO historial_precios (producto_id, precio_anterior, precio_nuevo, motivo, usuario_id)
+                    SELECT id, precio_venta, {nuevo}, ?, ? FROM productos WHERE {condicion}
+                """), tuple(params_nuevo + [motivo or f"Regla {regla.tipo} {regla.valor}", usuario_id] + params_condicion))
+
+                cursor.execute(
+                    db.adapt_query(f"UPDATE productos SET precio_venta = {nuevo} WHERE {condicion}"),
+                    tuple(params_nuevo + params_condicion)
+                )
+                resultado.actualizados += cursor.rowcount
+                resultado.omitidos += coincidencias - cursor.rowcount
+
+            conn.commit()
+            if resultado.actualizados:
+                catalogo.invalidar()
+            logger.info(
+                f"Precios actualizados: {resultado.actualizados} productos "
+                f"({resultado.omitidos} omitidos) con {len(reglas)} regla(s)"
+            )
+            return resultado
+
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            logger.error(f"Error aplicando reglas de precio: {e}")
+            raise DatabaseError("Error al actualizar precios")
+        finally:
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def obtener_historial(producto_id: int, limit: int = 50):
+        """Obtener los cambios de precio de un producto (más recientes primero)"""
+        try:
+            query = """
+                SELECT hp.*, u.nombre AS usuario_nombre
+                FROM historial_precios hp
+                LEFT JOIN usuarios u ON hp.usuario_id = u.id
+                WHERE hp.producto_id = ?
+                ORDER BY hp.created_at DESC, hp.id DESC
+                LIMIT ?
+            """
+            return db.execute_query(query, (producto_id, limit))
+        except Exception as e:
+            logger.error(f"Error obteniendo historial de precios del producto {producto_id}: {e}")
+            raise DatabaseError("Error al obtener historial de precios")
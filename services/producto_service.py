@@ -2,6 +2,10 @@ from config.database import db
 from models.producto import Producto
 from core.logger import logger
 from core.exceptions import DatabaseError
+from services.inventario_service import InventarioService
+from services.catalogo_service import catalogo
+from services.busqueda_service import BusquedaService
+from services import repositorios
 
 
 class ProductoService:
@@ -10,51 +14,63 @@ class ProductoService:
     @staticmethod
     def obtener_por_id(producto_id: int):
         try:
-            query = "SELECT * FROM productos WHERE id = ?"
-            result = db.execute_query(query, (producto_id,))
-            if not result:
-                return None
-            data = dict(result[0])
-            return Producto.from_dict(data)
+            return catalogo.obtener(producto_id)
         except Exception as e:
             logger.error(f"Error obteniendo producto {producto_id}: {e}")
             raise DatabaseError("Error al obtener producto")
 
+    @staticmethod
+    def obtener_por_codigo(codigo: str):
+        try:
+            return catalogo.obtener_por_codigo(codigo)
+        except Exception as e:
+            logger.error(f"Error obteniendo producto con código {codigo}: {e}")
+            raise DatabaseError("Error al obtener producto")
+
     @staticmethod
     def actualizar_stock(producto_id: int, nuevo_stock: int):
         try:
+            anterior = ProductoService._obtener_umbrales(producto_id)
             query = "UPDATE productos SET stock_actual = ? WHERE id = ?"
             db.execute_query(query, (nuevo_stock, producto_id))
-            return True
+            catalogo.marcar_modificados([producto_id])
         except Exception as e:
             logger.error(f"Error actualizando stock producto {producto_id}: {e}")
             raise DatabaseError("Error al actualizar stock")
 
+        if anterior:
+            InventarioService.notificar_cambio_stock(
+                producto_id, anterior['stock_actual'], nuevo_stock,
+                anterior['stock_minimo'], anterior['stock_maximo'], bool(anterior['activo'])
+            )
+        return True
+
+    @staticmethod
+    def _obtener_umbrales(producto_id: int):
+        """Obtener stock, umbrales y estado activo de un producto (para eventos de stock)"""
+        query = "SELECT stock_actual, stock_minimo, stock_maximo, activo FROM productos WHERE id = ?"
+        result = db.execute_query(query, (producto_id,))
+        return dict(result[0]) if result else None
+
     @staticmethod
     def obtener_todos(activos_only: bool = True):
         try:
-            if activos_only:
-                query = "SELECT * FROM productos WHERE activo = 1 ORDER BY nombre"
-                results = db.execute_query(query)
-            else:
-                query = "SELECT * FROM productos ORDER BY nombre"
-                results = db.execute_query(query)
-
-            productos = []
-            for row in results:
-                productos.append(Producto.from_dict(dict(row)))
-            return productos
+            return catalogo.obtener_todos(activos_only)
         except Exception as e:
             logger.error(f"Error obteniendo productos: {e}")
             raise DatabaseError("Error al obtener productos")
 
+    @staticmethod
+    def buscar(termino: str, activos_only: bool = True, limite: int = None):
+        """Buscar productos por texto (índice de texto completo, ordenado por relevancia)"""
+        return BusquedaService.buscar_productos(termino, activos_only, limite)
+
     @staticmethod
     def obtener_productos_bajo_stock():
         try:
-            query = "SELECT * FROM productos WHERE stock_actual <= stock_minimo AND activo = 1 ORDER BY stock_actual ASC"
-            results = db.execute_query(query)
-            productos = [Producto.from_dict(dict(r)) for r in results]
-            return productos
+            return repositorios.productos.find_all(
+                "stock_actual <= stock_minimo AND activo = 1", order_by="stock_actual ASC"
+            )
         except Exception as e:
             logger.error(f"Error obteniendo productos bajo stock: {e}")
             raise DatabaseError("Error al obtener productos bajo stock")
@@ -63,27 +79,8 @@ class ProductoService:
     def crear_producto(producto: Producto):
         """Insertar un nuevo producto en la base de datos y retornar su id."""
         try:
-            query = """
-                INSERT INTO productos (
-                    codigo, nombre, descripcion, categoria,
-                    precio_compra, precio_venta, stock_actual,
-                    stock_minimo, stock_maximo, proveedor_id, activo
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            params = (
-                producto.codigo,
-                producto.nombre,
-                producto.descripcion,
-                producto.categoria,
-                producto.precio_compra,
-                producto.precio_venta,
-                producto.stock_actual,
-                producto.stock_minimo,
-                producto.stock_maximo,
-                producto.proveedor_id,
-                1 if producto.activo else 0
-            )
-            new_id = db.execute_query(query, params)
+            new_id = repositorios.productos.insert_entity(producto)
+            catalogo.marcar_modificados([new_id])
             logger.info(f"Producto creado con id {new_id}")
             return new_id
         except Exception as e:
@@ -97,41 +94,34 @@ class ProductoService:
             if not fields:
                 return True
 
-            # Mapear campos permitidos a columnas
-            allowed = {
-                'codigo': 'codigo',
-                'nombre': 'nombre',
-                'descripcion': 'descripcion',
-                'categoria': 'categoria',
-                'precio_compra': 'precio_compra',
-                'precio_venta': 'precio_venta',
-                'stock_actual': 'stock_actual',
-                'stock_minimo': 'stock_minimo',
-                'stock_maximo': 'stock_maximo',
-                'proveedor_id': 'proveedor_id',
-                'activo': 'activo'
-            }
-
-            set_clauses = []
-            params = []
-            for key, value in fields.items():
-                if key in allowed:
-                    set_clauses.append(f"{allowed[key]} = ?")
-                    # Ensure boolean is stored as int
-                    if key == 'activo':
-                        params.append(1 if value else 0)
-                    else:
-                        params.append(value)
-
-            if not set_clauses:
+            # Solo columnas conocidas del repositorio
+            valores = {k: v for k, v in fields.items() if k in repositorios.productos.columns}
+            if 'activo' in valores:
+                valores['activo'] = 1 if valores['activo'] else 0
+
+            if not valores:
                 return True
 
-            query = f"UPDATE productos SET {', '.join(set_clauses)} WHERE id = ?"
-            params.append(producto_id)
+            # Cambios de stock, umbrales o estado pueden cruzar un umbral de alerta
+            campos_stock = {'stock_actual', 'stock_minimo', 'stock_maximo', 'activo'}
+            anterior = ProductoService._obtener_umbrales(producto_id) if campos_stock & fields.keys() else None
 
-            db.execute_query(query, tuple(params))
+            repositorios.productos.update(producto_id, valores)
+            catalogo.marcar_modificados([producto_id])
             logger.info(f"Producto {producto_id} actualizado: {fields}")
-            return True
         except Exception as e:
             logger.error(f"Error actualizando producto {producto_id}: {e}")
             raise DatabaseError("Error al actualizar producto")
+
+        if anterior:
+            nuevo = {**anterior, **{k: v for k, v in fields.items() if k in campos_stock}}
+            # Con umbrales distintos se compara el estado previo con sus propios umbrales
+            estado_anterior = InventarioService.clasificar_stock(
+                anterior['stock_actual'], anterior['stock_minimo'], anterior['stock_maximo'], bool(anterior['activo'])
+            )
+            InventarioService.notificar_cambio_stock(
+                producto_id, anterior['stock_actual'], nuevo['stock_actual'],
+                nuevo['stock_minimo'], nuevo['stock_maximo'], bool(nuevo['activo']),
+                estado_anterior=estado_anterior
+            )
+        return True
@@ -4,6 +4,7 @@ from core.exceptions import DatabaseError, ValidationError
 from core.logger import logger
 from core.security import security
 from core.utils import utils
+from services import repositorios
 
 class ProveedorService:
     """Servicio para gestión de proveedores"""
@@ -12,13 +13,8 @@ class ProveedorService:
     def obtener_todos(activos_only: bool = True):
         """Obtener todos los proveedores"""
         try:
-            if activos_only:
-                query = "SELECT * FROM proveedores WHERE activo = 1 ORDER BY nombre"
-            else:
-                query = "SELECT * FROM proveedores ORDER BY nombre"
-            
-            results = db.execute_query(query)
-            return [Proveedor.from_dict(dict(row)) for row in results]
+            where = "activo = 1" if activos_only else None
+            return repositorios.proveedores.find_all(where, order_by="nombre")
         except Exception as e:
             logger.error(f"Error obteniendo proveedores: {e}")
             raise DatabaseError("Error al obtener proveedores")
@@ -27,9 +23,7 @@ class ProveedorService:
     def obtener_por_id(proveedor_id: int):
         """Obtener proveedor por ID"""
         try:
-            query = "SELECT * FROM proveedores WHERE id = ?"
-            result = db.execute_query(query, (proveedor_id,))
-            return Proveedor.from_dict(dict(result[0])) if result else None
+            return repositorios.proveedores.get(proveedor_id)
         except Exception as e:
             logger.error(f"Error obteniendo proveedor {proveedor_id}: {e}")
             raise DatabaseError("Error al obtener proveedor")
@@ -54,18 +48,7 @@ class ProveedorService:
             if existing:
                 raise ValidationError("Ya existe un proveedor con este RUT")
             
-            query = """
-                INSERT INTO proveedores 
-                (nombre, rut, direccion, telefono, email, producto_principal, activo)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            params = (
-                proveedor.nombre, proveedor.rut, proveedor.direccion,
-                proveedor.telefono, proveedor.email, proveedor.producto_principal,
-                proveedor.activo
-            )
-            
-            proveedor_id = db.execute_query(query, params)
+            proveedor_id = repositorios.proveedores.insert_entity(proveedor)
             logger.info(f"Proveedor creado: {proveedor.nombre}")
             return proveedor_id
             
@@ -79,20 +62,12 @@ class ProveedorService:
     def actualizar_proveedor(proveedor_id: int, **kwargs):
         """Actualizar proveedor"""
         try:
-            campos = []
-            valores = []
-            
-            for campo, valor in kwargs.items():
-                if valor is not None:
-                    campos.append(f"{campo} = ?")
-                    valores.append(valor)
+            valores = {campo: valor for campo, valor in kwargs.items() if valor is not None}
             
-            if not campos:
+            if not valores:
                 raise ValidationError("No hay datos para actualizar")
             
-            valores.append(proveedor_id)
-            query = f"UPDATE proveedores SET {', '.join(campos)} WHERE id = ?"
-            db.execute_query(query, valores)
+            repositorios.proveedores.update(proveedor_id, valores)
             
             logger.info(f"Proveedor {proveedor_id} actualizado")
             return True
@@ -117,10 +92,7 @@ class ProveedorService:
     def buscar_por_nombre(nombre: str):
         """Buscar proveedores por nombre"""
         try:
-            query = "SELECT * FROM proveedores WHERE nombre LIKE ? ORDER BY nombre"
-            params = (f"%{nombre}%",)
-            results = db.execute_query(query, params)
-            return [Proveedor.from_dict(dict(row)) for row in results]
+            return repositorios.proveedores.find_all("nombre LIKE ?", (f"%{nombre}%",), order_by="nombre")
         except Exception as e:
             logger.error(f"Error buscando proveedores: {e}")
             raise DatabaseError("Error al buscar proveedores")
\ No newline at end of file
@@ -0,0 +1,133 @@
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+from config.database import db
+from core.exceptions import DatabaseError
+from core.logger import logger
+from services.catalogo_service import catalogo
+
+# Columnas y tipos que usan los reportes (montos en pesos enteros, ver core.money)
+DTYPES_DOCUMENTO = {'fecha': 'datetime64[s]', 'subtotal': 'int64', 'iva': 'int64', 'total': 'int64'}
+DTYPES_DETALLE = {'producto_id': 'int64', 'cantidad': 'int64', 'total_linea': 'int64'}
+
+# {columna: numpy.ndarray}; numpy se importa en cada función para dejarlo fuera del arranque
+Columnas = Dict[str, Any]
+
+def _sumar_por_grupo(grupos, valores, cantidad: int):
+    """Suma exacta en int64 por índice de grupo (bincount acumula en float64)"""
+    import numpy as np
+
+    sumas = np.zeros(cantidad, dtype=np.int64)
+    np.add.at(sumas, grupos, valores)
+    return sumas
+
+class ReporteService:
+    """Agregaciones de ventas y compras sobre columnas NumPy"""
+
+    @staticmethod
+    def columnas_ventas(fecha_inicio: datetime, fecha_fin: datetime) -> Columnas:
+        """Fecha y montos de las ventas del período, por columna"""
+        try:
+            query = """
+                SELECT fecha, subtotal, iva, total FROM ventas
+                WHERE fecha BETWEEN ? AND ?
+                ORDER BY fecha
+            """
+            return db.query_columns(query, (fecha_inicio, fecha_fin), DTYPES_DOCUMENTO)
+        except Exception as e:
+            logger.error(f"Error obteniendo columnas de ventas: {e}")
+            raise DatabaseError("Error al obtener datos de ventas")
+
+    @staticmethod
+    def columnas_compras(fecha_inicio: datetime, fecha_fin: datetime) -> Columnas:
+        """Fecha y montos de las compras del período, por columna"""
+        try:
+            query = """
+                SELECT fecha, subtotal, iva, total FROM compras
+                WHERE fecha BETWEEN ? AND ?
+                ORDER BY fecha
+            """
+            return db.query_columns(query, (fecha_inicio, fecha_fin), DTYPES_DOCUMENTO)
+        except Exception as e:
+            logger.error(f"Error obteniendo columnas de compras: {e}")
+            raise DatabaseError("Error al obtener datos de compras")
+
+    @staticmethod
+    def totales(columnas: Columnas) -> Dict[str, int]:
+        """Cantidad, sumas y promedio de documentos"""
+        cantidad = len(columnas['total'])
+        total = int(columnas['total'].sum())
+        return {
+            'cantidad': cantidad,
+            'subtotal': int(columnas['subtotal'].sum()),
+            'iva': int(columnas['iva'].sum()),
+            'total': total,
+            'promedio': total / cantidad if cantidad else 0.0,
+        }
+
+    @staticmethod
+    def total_desde(columnas: Columnas, desde: datetime) -> int:
+        """Suma de `total` de los documentos con fecha >= desde"""
+        import numpy as np
+
+        mascara = columnas['fecha'] >= np.datetime64(desde, 's')
+        return int(columnas['total'][mascara].sum())
+
+    @staticmethod
+    def por_dia(columnas: Columnas, rellenar: bool = False) -> Tuple[Any, Any]:
+        """Agrupar `total` por día. Retorna (días datetime64[D], totales) ordenados.
+        
+        Con `rellenar` se incluyen con total 0 los días sin documentos entre el
+        primero y el último (serie continua para gráficos).
+        """
+        import numpy as np
+
+        fechas = columnas['fecha']
+        validas = ~np.isnat(fechas)
+        dias, inverso = np.unique(fechas[validas].astype('datetime64[D]'), return_inverse=True)
+        totales = _sumar_por_grupo(inverso, columnas['total'][validas], len(dias))
+        if rellenar and len(dias):
+            continuos = np.arange(dias[0], dias[-1] + 1)
+            completos = np.zeros(len(continuos), dtype=np.int64)
+            completos[(dias - dias[0]).astype(np.int64)] = totales
+            return continuos, completos
+        return dias, totales
+
+    @staticmethod
+    def top_productos(fecha_inicio: datetime, fecha_fin: datetime, n: int = 10) -> List[dict]:
+        """Productos más vendidos del período por monto"""
+        import numpy as np
+
+        try:
+            query = """
+                SELECT dv.producto_id, dv.cantidad, dv.total_linea
+                FROM detalle_ventas dv
+                JOIN ventas v ON dv.venta_id = v.id
+                WHERE v.fecha BETWEEN ? AND ?
+            """
+            columnas = db.query_columns(query, (fecha_inicio, fecha_fin), DTYPES_DETALLE)
+        except Exception as e:
+            logger.error(f"Error obteniendo detalle para top de productos: {e}")
+            raise DatabaseError("Error al obtener productos más vendidos")
+
+        if not len(columnas['producto_id']):
+            return []
+
+        ids, inverso = np.unique(columnas['producto_id'], return_inverse=True)
+        montos = _sumar_por_grupo(inverso, columnas['total_linea'], len(ids))
+        cantidades = _sumar_por_grupo(inverso, columnas['cantidad'], len(ids))
+
+        # argpartition evita ordenar todos los productos para quedarse con n
+        k = min(n, len(ids))
+        seleccion = np.argpartition(-montos, k - 1)[:k]
+        seleccion = seleccion[np.argsort(-montos[seleccion], kind='stable')]
+
+        resultado = []
+        for i in seleccion:
+            producto = catalogo.obtener(int(ids[i]))
+            resultado.append({
+                'producto_id': int(ids[i]),
+                'nombre': producto.nombre if producto else f"Producto {ids[i]}",
+                'cantidad': int(cantidades[i]),
+                'total': int(montos[i]),
+            })
+        return resultado
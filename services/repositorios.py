@@ -0,0 +1,19 @@
+"""Repositorios de las entidades persistidas (ver core.repository)"""
+from config.database import db
+from core.repository import Repository
+from models.producto import Producto
+from models.proveedor import Proveedor
+from models.trabajador import Trabajador
+from models.venta import Venta, DetalleVenta
+from models.compra import Compra, DetalleCompra
+from models.inventario import InventarioMovimiento
+
+productos = Repository(db, 'productos', Producto)
+proveedores = Repository(db, 'proveedores', Proveedor)
+trabajadores = Repository(db, 'trabajadores', Trabajador)
+ventas = Repository(db, 'ventas', Venta)
+detalle_ventas = Repository(db, 'detalle_ventas', DetalleVenta)
+compras = Repository(db, 'compras', Compra)
+detalle_compras = Repository(db, 'detalle_compras', DetalleCompra)
+movimientos = Repository(db, 'inventario_movimientos', InventarioMovimiento)
+empresas = Repository(db, 'empresas')
@@ -4,6 +4,7 @@ from core.exceptions import DatabaseError, ValidationError
 from core.logger import logger
 from core.security import security
 from core.utils import utils
+from services import repositorios
 
 class TrabajadorService:
     """Servicio para gestión de trabajadores"""
@@ -12,13 +13,8 @@ class TrabajadorService:
     def obtener_todos(activos_only: bool = True):
         """Obtener todos los trabajadores"""
         try:
-            if activos_only:
-                query = "SELECT * FROM trabajadores WHERE activo = 1 ORDER BY nombre, apellido"
-            else:
-                query = "SELECT * FROM trabajadores ORDER BY nombre, apellido"
-            
-            results = db.execute_query(query)
-            return [Trabajador.from_dict(dict(row)) for row in results]
+            where = "activo = 1" if activos_only else None
+            return repositorios.trabajadores.find_all(where, order_by="nombre, apellido")
         except Exception as e:
             logger.error(f"Error obteniendo trabajadores: {e}")
             raise DatabaseError("Error al obtener trabajadores")
@@ -27,9 +23,7 @@ class TrabajadorService:
     def obtener_por_id(trabajador_id: int):
         """Obtener trabajador por ID"""
         try:
-            query = "SELECT * FROM trabajadores WHERE id = ?"
-            result = db.execute_query(query, (trabajador_id,))
-            return Trabajador.from_dict(dict(result[0])) if result else None
+            return repositorios.trabajadores.get(trabajador_id)
         except Exception as e:
             logger.error(f"Error obteniendo trabajador {trabajador_id}: {e}")
             raise DatabaseError("Error al obtener trabajador")
@@ -54,18 +48,7 @@ class TrabajadorService:
             if existing:
                 raise ValidationError("Ya existe un trabajador con este RUT")
             
-            query = """
-                INSERT INTO trabajadores 
-                (rut, nombre, apellido, cargo, telefono, email, salario, fecha_contratacion, activo)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            params = (
-                trabajador.rut, trabajador.nombre, trabajador.apellido, trabajador.cargo,
-                trabajador.telefono, trabajador.email, trabajador.salario,
-                trabajador.fecha_contratacion, trabajador.activo
-            )
-            
-            trabajador_id = db.execute_query(query, params)
+            trabajador_id = repositorios.trabajadores.insert_entity(trabajador)
             logger.info(f"Trabajador creado: {trabajador.nombre} {trabajador.apellido}")
             return trabajador_id
             
@@ -79,20 +62,12 @@ class TrabajadorService:
     def actualizar_trabajador(trabajador_id: int, **kwargs):
         """Actualizar trabajador"""
         try:
-            campos = []
-            valores = []
+            valores = {campo: valor for campo, valor in kwargs.items() if valor is not None}
             
-            for campo, valor in kwargs.items():
-                if valor is not None:
-                    campos.append(f"{campo} = ?")
-                    valores.append(valor)
-            
-            if not campos:
+            if not valores:
                 raise ValidationError("No hay datos para actualizar")
             
-            valores.append(trabajador_id)
-            query = f"UPDATE trabajadores SET {', '.join(campos)} WHERE id = ?"
-            db.execute_query(query, valores)
+            repositorios.trabajadores.update(trabajador_id, valores)
             
             logger.info(f"Trabajador {trabajador_id} actualizado")
             return True
@@ -117,10 +92,9 @@ class TrabajadorService:
     def buscar_por_nombre(nombre: str):
         """Buscar trabajadores por nombre"""
         try:
-            query = "SELECT * FROM trabajadores WHERE nombre LIKE ? OR apellido LIKE ? ORDER BY nombre"
-            params = (f"%{nombre}%", f"%{nombre}%")
-            results = db.execute_query(query, params)
-            return [Trabajador.from_dict(dict(row)) for row in results]
+            return repositorios.trabajadores.find_all(
+                "nombre LIKE ? OR apellido LIKE ?", (f"%{nombre}%", f"%{nombre}%"), order_by="nombre"
+            )
         except Exception as e:
             logger.error(f"Error buscando trabajadores: {e}")
             raise DatabaseError("Error al buscar trabajadores")
\ No newline at end of file
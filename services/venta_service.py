@@ -1,10 +1,12 @@
 from config.database import db
-from models.venta import Venta, DetalleVenta
+from models.venta import Venta
 from core.exceptions import DatabaseError, ValidationError, InsufficientStockError
 from core.logger import logger
 from core.utils import utils
 from services.inventario_service import InventarioService
 from services.producto_service import ProductoService
+from services.catalogo_service import catalogo
+from services import repositorios
 from datetime import datetime
 
 class VentaService:
@@ -20,93 +22,36 @@ class VentaService:
                 LEFT JOIN usuarios u ON v.usuario_id = u.id 
                 ORDER BY v.fecha DESC
             """
-            results = db.execute_query(query)
-            ventas = []
-            
-            for row in results:
-                venta_data = dict(row)
-                venta = Venta(
-                    id=venta_data['id'],
-                    numero_boleta=venta_data['numero_boleta'],
-                    fecha=datetime.fromisoformat(venta_data['fecha']) if venta_data['fecha'] else None,
-                    cliente_nombre=venta_data['cliente_nombre'],
-                    cliente_rut=venta_data['cliente_rut'],
-                    subtotal=venta_data['subtotal'],
-                    iva=venta_data['iva'],
-                    total=venta_data['total'],
-                    usuario_id=venta_data['usuario_id'],
-                    created_at=datetime.fromisoformat(venta_data['created_at']) if venta_data['created_at'] else None
-                )
-                
-                # Obtener detalles
-                detalles_query = """
-                    SELECT dv.*, p.nombre as producto_nombre, p.codigo as producto_codigo
-                    FROM detalle_ventas dv 
-                    LEFT JOIN productos p ON dv.producto_id = p.id 
-                    WHERE dv.venta_id = ?
-                """
-                detalles_results = db.execute_query(detalles_query, (venta.id,))
-                
-                for detalle_row in detalles_results:
-                    detalle_data = dict(detalle_row)
-                    detalle = DetalleVenta(
-                        id=detalle_data['id'],
-                        venta_id=detalle_data['venta_id'],
-                        producto_id=detalle_data['producto_id'],
-                        cantidad=detalle_data['cantidad'],
-                        precio_unitario=detalle_data['precio_unitario'],
-                        total_linea=detalle_data['total_linea']
-                    )
-                    venta.agregar_detalle(detalle)
-                
-                ventas.append(venta)
+            ventas = repositorios.ventas.query(query)
             
+            # Detalles de todas las ventas en una sola consulta
+            detalles = repositorios.detalle_ventas.find_all(order_by="venta_id, id")
+            VentaService._asignar_detalles(ventas, detalles)
             return ventas
             
         except Exception as e:
             logger.error(f"Error obteniendo ventas: {e}")
             raise DatabaseError("Error al obtener ventas")
     
+    @staticmethod
+    def _asignar_detalles(ventas, detalles):
+        """Asignar a cada venta sus líneas de detalle"""
+        por_id = {venta.id: venta for venta in ventas}
+        for detalle in detalles:
+            venta = por_id.get(detalle.venta_id)
+            if venta:
+                venta.agregar_detalle(detalle)
+    
     @staticmethod
     def obtener_por_id(venta_id: int):
         """Obtener venta por ID"""
         try:
-            query = "SELECT * FROM ventas WHERE id = ?"
-            result = db.execute_query(query, (venta_id,))
-            
-            if not result:
+            venta = repositorios.ventas.get(venta_id)
+            if not venta:
                 return None
             
-            venta_data = dict(result[0])
-            venta = Venta(
-                id=venta_data['id'],
-                numero_boleta=venta_data['numero_boleta'],
-                fecha=datetime.fromisoformat(venta_data['fecha']) if venta_data['fecha'] else None,
-                cliente_nombre=venta_data['cliente_nombre'],
-                cliente_rut=venta_data['cliente_rut'],
-                subtotal=venta_data['subtotal'],
-                iva=venta_data['iva'],
-                total=venta_data['total'],
-                usuario_id=venta_data['usuario_id'],
-                created_at=datetime.fromisoformat(venta_data['created_at']) if venta_data['created_at'] else None
-            )
-            
             # Obtener detalles
-            detalles_query = "SELECT * FROM detalle_ventas WHERE venta_id = ?"
-            detalles_results = db.execute_query(detalles_query, (venta_id,))
-            
-            for detalle_row in detalles_results:
-                detalle_data = dict(detalle_row)
-                detalle = DetalleVenta(
-                    id=detalle_data['id'],
-                    venta_id=detalle_data['venta_id'],
-                    producto_id=detalle_data['producto_id'],
-                    cantidad=detalle_data['cantidad'],
-                    precio_unitario=detalle_data['precio_unitario'],
-                    total_linea=detalle_data['total_linea']
-                )
-                venta.agregar_detalle(detalle)
-            
+            venta.detalles = repositorios.detalle_ventas.find_all("venta_id = ?", (venta_id,), order_by="id")
             return venta
             
         except Exception as e:
@@ -161,10 +106,11 @@ class VentaService:
                 venta.usuario_id
             )
             
-            cursor.execute(query_venta, params_venta)
+            cursor.execute(db.adapt_query(query_venta), params_venta)
             venta_id = cursor.lastrowid
             
-            # Insertar detalles y actualizar stock
+            # Insertar detalles y actualizar stock dentro de la misma transacción
+            cambios_stock = []
             for detalle in venta.detalles:
                 detalle.venta_id = venta_id
                 detalle.calcular_total()
@@ -181,28 +127,51 @@ class VentaService:
                     detalle.precio_unitario,
                     detalle.total_linea
                 )
-                cursor.execute(query_detalle, params_detalle)
+                cursor.execute(db.adapt_query(query_detalle), params_detalle)
                 
                 # Actualizar stock y registrar movimiento
-                producto = ProductoService.obtener_por_id(detalle.producto_id)
-                nuevo_stock = producto.stock_actual - detalle.cantidad
+                cursor.execute(db.adapt_query(
+                    "SELECT nombre, stock_actual, stock_minimo, stock_maximo, activo FROM productos WHERE id = ?"
+                ), (detalle.producto_id,))
+                producto = cursor.fetchone()
+                if not producto:
+                    raise ValidationError(f"Producto ID {detalle.producto_id} no encontrado")
+                stock_anterior = producto['stock_actual']
+                nuevo_stock = stock_anterior - detalle.cantidad
+                if nuevo_stock < 0:
+                    raise InsufficientStockError(
+                        f"Stock insuficiente para {producto['nombre']}. "
+                        f"Stock actual: {stock_anterior}, solicitado: {detalle.cantidad}"
+                    )
                 
-                ProductoService.actualizar_stock(detalle.producto_id, nuevo_stock)
+                cursor.execute(db.adapt_query("UPDATE productos SET stock_actual = ? WHERE id = ?"),
+                               (nuevo_stock, detalle.producto_id))
                 
                 InventarioService.registrar_movimiento(
                     producto_id=detalle.producto_id,
                     tipo="salida",
                     cantidad=detalle.cantidad,
-                    cantidad_anterior=producto.stock_actual,
+                    cantidad_anterior=stock_anterior,
                     cantidad_nueva=nuevo_stock,
                     motivo=f"Venta #{venta.numero_boleta}",
                     referencia_id=venta_id,
                     referencia_tipo="venta",
-                    usuario_id=venta.usuario_id
+                    usuario_id=venta.usuario_id,
+                    cursor=cursor
                 )
+                cambios_stock.append((detalle.producto_id, stock_anterior, nuevo_stock, producto))
             
             conn.commit()
+            catalogo.marcar_modificados(c[0] for c in cambios_stock)
+            db.bump_data_version('ventas')
             logger.info(f"Venta creada: {venta.numero_boleta}")
+            
+            # Eventos de umbral solo tras confirmar la transacción
+            for producto_id, stock_anterior, nuevo_stock, producto in cambios_stock:
+                InventarioService.notificar_cambio_stock(
+                    producto_id, stock_anterior, nuevo_stock,
+                    producto['stock_minimo'], producto['stock_maximo'], bool(producto['activo'])
+                )
             return venta_id
             
         except Exception as e:
@@ -235,36 +204,52 @@ class VentaService:
     def obtener_ventas_por_fecha(fecha_inicio: datetime, fecha_fin: datetime):
         """Obtener ventas por rango de fechas"""
         try:
-            query = """
-                SELECT * FROM ventas 
-                WHERE fecha BETWEEN ? AND ? 
-                ORDER BY fecha DESC
-            """
-            params = (fecha_inicio, fecha_fin)
-            results = db.execute_query(query, params)
-            
-            ventas = []
-            for row in results:
-                venta_data = dict(row)
-                venta = Venta(
-                    id=venta_data['id'],
-                    numero_boleta=venta_data['numero_boleta'],
-                    fecha=datetime.fromisoformat(venta_data['fecha']) if venta_data['fecha'] else None,
-                    cliente_nombre=venta_data['cliente_nombre'],
-                    cliente_rut=venta_data['cliente_rut'],
-                    subtotal=venta_data['subtotal'],
-                    iva=venta_data['iva'],
-                    total=venta_data['total'],
-                    usuario_id=venta_data['usuario_id']
-                )
-                ventas.append(venta)
-            
-            return ventas
-            
+            return repositorios.ventas.find_columnar(
+                "fecha BETWEEN ? AND ?", (fecha_inicio, fecha_fin), order_by="fecha DESC",
+                skip=('created_at',)
+            )
         except Exception as e:
             logger.error(f"Error obteniendo ventas por fecha: {e}")
             raise DatabaseError("Error al obtener ventas por fecha")
     
+    @staticmethod
+    def obtener_recientes(limite: int = 10, antes_de: tuple = None,
+                          desde: datetime = None, hasta: datetime = None):
+        """Ventas más recientes, paginadas por clave (fecha, id).
+        
+        `antes_de` es la (fecha, id) de la última venta de la página anterior;
+        con el índice sobre fecha solo se leen `limite` filas. `desde`/`hasta`
+        acotan el período.
+        """
+        try:
+            condiciones, params = [], []
+            if desde is not None:
+                condiciones.append("fecha >= ?")
+                params.append(desde)
+            if hasta is not None:
+                condiciones.append("fecha <= ?")
+                params.append(hasta)
+            return repositorios.ventas.find_page(
+                ('fecha', 'id'), antes_de, limite, " AND ".join(condiciones) or None, params,
+                skip=('created_at',)
+            )
+        except Exception as e:
+            logger.error(f"Error obteniendo ventas recientes: {e}")
+            raise DatabaseError("Error al obtener ventas recientes")
+    
+    @staticmethod
+    def obtener_total_periodo(fecha_inicio: datetime, fecha_fin: datetime) -> int:
+        """Suma de `total` de las ventas del período"""
+        try:
+            _, rows = db.query_rows(
+                "SELECT COALESCE(SUM(total), 0) FROM ventas WHERE fecha BETWEEN ? AND ?",
+                (fecha_inicio, fecha_fin)
+            )
+            return int(rows[0][0])
+        except Exception as e:
+            logger.error(f"Error obteniendo total de ventas: {e}")
+            raise DatabaseError("Error al obtener total de ventas")
+    
     @staticmethod
     def obtener_resumen_ventas(fecha_inicio: datetime, fecha_fin: datetime):
         """Obtener resumen de ventas por período"""
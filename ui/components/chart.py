@@ -0,0 +1,108 @@
+from tkinter import ttk
+from typing import Callable, Optional
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib import dates as mdates
+from matplotlib.ticker import FuncFormatter
+
+# Puntos que se dibujan como máximo; series más largas se reducen por tramos
+MAX_POINTS = 1000
+
+def downsample_minmax(x: np.ndarray, y: np.ndarray, max_points: int = MAX_POINTS):
+    """Reducir una serie conservando el mínimo y el máximo de cada tramo.
+
+    Divide la serie en max_points // 2 tramos iguales y deja, en orden, el
+    punto mínimo y el máximo de cada uno (más el primero y el último), así
+    los picos siguen visibles.
+    """
+    n = len(y)
+    if n <= max_points:
+        return x, y
+    buckets = max(max_points // 2, 1)
+    size = -(-n // buckets)  # ceil
+    padded = np.concatenate([y, np.repeat(y[-1:], buckets * size - n)]).reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    # Se conservan también los extremos para no recortar el rango de fechas
+    indices = np.concatenate([[0, n - 1], offsets + padded.argmin(axis=1), offsets + padded.argmax(axis=1)])
+    indices = np.unique(np.minimum(indices, n - 1))
+    return x[indices], y[indices]
+
+class TrendChart(ttk.Frame):
+    """Gráfico de línea de una serie temporal (fechas datetime64 vs montos).
+
+    La figura se crea una sola vez. `set_series` actualiza la línea con
+    set_data y, si los ejes no cambian de escala, solo redibuja la línea
+    (blitting) sobre el fondo guardado; si cambian, redibuja la figura.
+    """
+
+    def __init__(self, parent, height: int = 220, color: str = '#27ae60',
+                 y_formatter: Optional[Callable[[float], str]] = None,
+                 max_points: int = MAX_POINTS, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.color = color
+        self.y_formatter = y_formatter or (lambda value: f"{value:,.0f}")
+        self.max_points = max_points
+        self._background = None
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self._create_figure(height)
+
+    def _create_figure(self, height: int):
+        """Crear la figura, los ejes y la línea (se reutilizan en cada actualización)"""
+        self.figure = Figure(figsize=(6, height / 100), dpi=100)
+        self.figure.set_layout_engine('constrained')
+        self.ax = self.figure.add_subplot(111)
+        self.ax.grid(True, alpha=0.3)
+        locator = mdates.AutoDateLocator()
+        self.ax.xaxis.set_major_locator(locator)
+        self.ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        self.ax.yaxis.set_major_formatter(FuncFormatter(lambda value, _: self.y_formatter(value)))
+
+        # animated: la línea no se incluye en el dibujo completo, se pinta aparte
+        (self.line,) = self.ax.plot([], [], color=self.color, linewidth=1.5, animated=True)
+        self.empty_text = self.ax.text(0.5, 0.5, "Sin datos para el período", ha='center', va='center',
+                                       transform=self.ax.transAxes, color='#9aa3ab')
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        self.canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew")
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        """Tras un dibujo completo: guardar el fondo y pintar la línea encima"""
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.ax.draw_artist(self.line)
+
+    def _limits(self, x: np.ndarray, y: np.ndarray):
+        """Límites de ejes para la serie (con margen en y)"""
+        if len(x) == 0:
+            return None
+        x0, x1 = float(x[0]), float(x[-1])
+        if x0 == x1:
+            x0, x1 = x0 - 1, x1 + 1
+        y0, y1 = min(float(y.min()), 0.0), float(y.max())
+        return (x0, x1), (y0, y1 * 1.1 or 1.0)
+
+    def _update_figure(self, x: np.ndarray, y: np.ndarray):
+        x_num = mdates.date2num(x) if len(x) else np.array([])
+        self.line.set_data(x_num, y)
+        limits = self._limits(x_num, y)
+        same_scale = (limits is not None and self._background is not None
+                      and limits == (self.ax.get_xlim(), self.ax.get_ylim()))
+        if same_scale:
+            # Solo cambia la línea: restaurar el fondo y pintarla
+            self.canvas.restore_region(self._background)
+            self.ax.draw_artist(self.line)
+            self.canvas.blit(self.figure.bbox)
+            return
+        self.empty_text.set_visible(limits is None)
+        if limits is not None:
+            self.ax.set_xlim(*limits[0])
+            self.ax.set_ylim(*limits[1])
+        self.canvas.draw_idle()
+
+    def set_series(self, x: np.ndarray, y: np.ndarray):
+        """Mostrar una serie ordenada por fecha (x datetime64, y numérico)"""
+        x, y = downsample_minmax(np.asarray(x), np.asarray(y), self.max_points)
+        self._update_figure(x, y)
@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk
 from core.auth import AuthService
+from core.events import event_bus, STOCK_ESTADO_CAMBIADO
 from core.logger import logger
 from app.app_context import app_context
 from app.router import router
@@ -12,9 +13,12 @@ class MenuBar(ttk.Frame):
         super().__init__(parent, style="Menu.TFrame")
         self.parent = parent
         self.buttons = {}
+        self._button_texts = {}
+        self._alertas_stock = {}
         
         self._create_style()
         self._setup_menu()
+        self._init_alertas_badge()
     
     def _create_style(self):
         """Crear estilos para el menú"""
@@ -150,6 +154,7 @@ class MenuBar(ttk.Frame):
                     btn.pack(fill="x", pady=2, padx=2)
                     btn.bind('<Return>', lambda e, b=btn: b.invoke())
                     self.buttons[item['route']] = btn
+                    self._button_texts[item['route']] = item['text']
         
         # Separador final
         separator = ttk.Separator(self, orient="horizontal")
@@ -230,6 +235,42 @@ class MenuBar(ttk.Frame):
         for widget in self.winfo_children():
             widget.destroy()
         self._setup_menu()
+        self._update_alertas_badge()
+    
+    def _init_alertas_badge(self):
+        """Inicializar el contador de alertas y suscribirse a eventos de stock"""
+        if 'alertas' not in self.buttons:
+            return
+        try:
+            from services.inventario_service import InventarioService
+            self._alertas_stock = InventarioService.obtener_estados_alerta()
+        except Exception as e:
+            logger.error(f"Error cargando alertas de stock para el menú: {e}")
+            self._alertas_stock = {}
+        
+        unsubscribe = event_bus.subscribe(STOCK_ESTADO_CAMBIADO, self._on_estado_stock)
+        self.bind('<Destroy>', lambda e: unsubscribe() if e.widget is self else None, add='+')
+        self._update_alertas_badge()
+    
+    def _on_estado_stock(self, evento: dict):
+        """Actualizar el contador de alertas en O(1) ante un cambio de estado de stock"""
+        if evento['estado_nuevo'] == 'normal':
+            self._alertas_stock.pop(evento['producto_id'], None)
+        else:
+            self._alertas_stock[evento['producto_id']] = evento['estado_nuevo']
+        self._update_alertas_badge()
+    
+    def _update_alertas_badge(self):
+        """Mostrar la cantidad de alertas en el botón de Alertas"""
+        button = self.buttons.get('alertas')
+        if not button:
+            return
+        text = self._button_texts.get('alertas', '')
+        total = len(self._alertas_stock)
+        try:
+            button.configure(text=f"{text} ({total})" if total else text)
+        except tk.TclError:
+            pass
     
     def highlight_current_route(self, route_name: str):
         """Resaltar la ruta actual en el menú"""
@@ -0,0 +1,130 @@
+import os
+import threading
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, List, Optional, Tuple
+from core.utils import utils
+
+class ProgressDialog:
+    """Diálogo modal que ejecuta una tarea en un hilo aparte con avance y cancelación.
+
+    `task(progress, cancelled)` corre fuera del hilo de Tk y no debe tocar
+    widgets: informa su avance con progress(hechos, total) (total None si no
+    se conoce) y revisa cancelled.is_set() entre lotes. Al terminar se llama
+    on_done(resultado) u on_error(excepción) en el hilo de Tk.
+    """
+
+    POLL_MS = 100
+
+    def __init__(self, parent, title: str, message: str, task: Callable,
+                 on_done: Optional[Callable] = None, on_error: Optional[Callable] = None):
+        self.parent = parent
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelled = threading.Event()
+        self._progress = (0, None)
+        self._result = None             # ('ok', valor) o ('error', excepción), lo deja el hilo
+
+        self._create_window(title, message)
+        threading.Thread(target=self._run, args=(task,), daemon=True).start()
+        self.window.after(self.POLL_MS, self._poll)
+
+    def _create_window(self, title: str, message: str):
+        self.window = tk.Toplevel(self.parent)
+        self.window.title(title)
+        self.window.transient(self.parent)
+        self.window.resizable(False, False)
+        # Se restaura al cerrar (p. ej. si el padre es otro diálogo modal)
+        self._previous_grab = self.window.grab_current()
+        self.window.grab_set()
+        utils.center_window(self.window, 420, 150)
+
+        frame = ttk.Frame(self.window, padding=15)
+        frame.pack(fill="both", expand=True)
+
+        ttk.Label(frame, text=message, style="Normal.TLabel").pack(anchor="w")
+        self.bar = ttk.Progressbar(frame, mode="indeterminate", length=380)
+        self.bar.pack(fill="x", pady=10)
+        self.bar.start(15)
+        self.status = ttk.Label(frame, text="", style="Normal.TLabel")
+        self.status.pack(anchor="w")
+
+        self.cancel_button = ttk.Button(frame, text="Cancelar", command=self.cancel, style="Secondary.TButton")
+        self.cancel_button.pack(side="right", pady=(10, 0))
+        self.window.protocol("WM_DELETE_WINDOW", self.cancel)
+        self.window.bind('<Escape>', lambda e: self.cancel())
+
+    def _run(self, task: Callable):
+        try:
+            self._result = ('ok', task(self._set_progress, self.cancelled))
+        except Exception as e:
+            self._result = ('error', e)
+
+    def _set_progress(self, done: int, total: Optional[int] = None):
+        self._progress = (done, total)
+
+    def cancel(self):
+        """Pedir a la tarea que se detenga (el diálogo se cierra cuando termine)"""
+        self.cancelled.set()
+        self.cancel_button.config(state="disabled")
+        self.status.config(text="Cancelando...")
+
+    def _show_progress(self):
+        done, total = self._progress
+        if self.cancelled.is_set():
+            return
+        if total:
+            if str(self.bar['mode']) != 'determinate':
+                self.bar.stop()
+                self.bar.config(mode='determinate', maximum=total)
+            self.bar['value'] = done
+            self.status.config(text=f"{done:,} de {total:,} filas".replace(",", "."))
+        elif done:
+            self.status.config(text=f"{done:,} filas".replace(",", "."))
+
+    def _poll(self):
+        result = self._result
+        if result is None:
+            self._show_progress()
+            self.window.after(self.POLL_MS, self._poll)
+            return
+
+        self.window.grab_release()
+        self.window.destroy()
+        if self._previous_grab is not None and self._previous_grab.winfo_exists():
+            self._previous_grab.grab_set()
+
+        kind, value = result
+        if kind == 'error':
+            if self.on_error:
+                self.on_error(value)
+        elif self.on_done:
+            self.on_done(value)
+
+def export_to_file(parent, export: Callable, filetypes: List[Tuple[str, str]],
+                   title: str = "Exportar", initialfile: str = ""):
+    """Pedir el archivo de destino y ejecutar export(ruta, progress, cancelled) con un ProgressDialog.
+
+    `export` retorna las filas escritas, o None si se canceló.
+    """
+    from tkinter import filedialog
+
+    ruta = filedialog.asksaveasfilename(
+        parent=parent, title=title, filetypes=filetypes,
+        defaultextension=".csv", initialfile=initialfile
+    )
+    if not ruta:
+        return
+
+    def done(count):
+        if count is not None:
+            utils.show_message(parent, "Éxito", f"{count} filas exportadas a {ruta}", "info")
+
+    def error(e: Exception):
+        utils.show_message(parent, "Error", f"Error al exportar: {e}", "error")
+
+    ProgressDialog(
+        parent, title, f"Exportando a {os.path.basename(ruta)}...",
+        lambda progress, cancelled: export(ruta, progress, cancelled),
+        on_done=done, on_error=error
+    )
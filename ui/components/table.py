@@ -1,20 +1,76 @@
+import threading
 import tkinter as tk
+import unicodedata
 from tkinter import ttk
 from typing import List, Dict, Any, Optional
-from core.utils import utils
+from core.logger import logger
+
+def _normalize(text: str) -> str:
+    """Texto en minúsculas y sin tildes para comparar en la búsqueda"""
+    text = text.lower()
+    if text.isascii():
+        return text
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
 
 class CustomTable(ttk.Frame):
-    """Tabla personalizada con funcionalidades avanzadas"""
-    
-    def __init__(self, parent, columns: List[Dict], height: int = 15, 
-                 show_toolbar: bool = True, **kwargs):
+    """Tabla personalizada con funcionalidades avanzadas.
+
+    Con muchas filas la tabla pasa a modo virtual: los datos quedan en Python
+    (`self.data`) y el Treeview solo contiene la ventana visible más una banda
+    de OVERSCAN filas arriba y abajo. Al desplazarse se reutilizan los mismos
+    items cambiando sus valores, y la selección se guarda por fila de datos,
+    de modo que ordenar, buscar, exportar y los menús contextuales operan
+    sobre todo el conjunto.
+    """
+
+    ROW_HEIGHT = 25
+    # Sobre esta cantidad de filas se usa el modo virtual (si virtual=None)
+    VIRTUAL_MIN_ROWS = 1000
+    # Filas materializadas fuera de la ventana visible, por lado
+    OVERSCAN = 40
+    # Espera desde la última tecla antes de filtrar
+    SEARCH_DELAY_MS = 250
+    # Sobre esta cantidad de filas el filtro corre en un hilo aparte
+    SEARCH_THREAD_MIN_ROWS = 20000
+    # Filas restantes bajo la vista con las que se pide la página siguiente
+    SCROLL_END_ROWS = 20
+
+    def __init__(self, parent, columns: List[Dict], height: int = 15,
+                 show_toolbar: bool = True, virtual: Optional[bool] = None, **kwargs):
         super().__init__(parent)
         self.parent = parent
         self.columns = columns
         self.height = height
         self.show_toolbar = show_toolbar
         self.data = []
-        
+        self.id_key = None              # clave de fila para actualizar por diferencias
+        self._items = {}                # clave -> (item, valores crudos, tags) mostrados
+        self._rows = {}                 # clave -> fila de self.data (con id_key)
+        self._format_cache = {}         # clave -> (valores crudos, valores formateados)
+
+        # Búsqueda
+        self._search_index = None       # id(fila) -> texto normalizado, por load_data
+        self._search_after = None       # temporizador de la búsqueda pendiente
+        self._search_token = 0          # invalida filtros en curso al recargar o ordenar
+        self._search_results = {}       # token -> (datos, índice, filas) que deja cada hilo de búsqueda
+        self._index_build = None        # (datos, listo, {'index': ...}) del índice que arma un hilo
+
+        # Paginación: con has_more, al acercarse al final se llama on_scroll_end()
+        self.has_more = False
+        self._more_pending = False      # página pedida y aún no agregada
+
+        # Estado del modo virtual
+        self.virtual = virtual          # None: automático según cantidad de filas
+        self._virtual = False           # modo en uso
+        self._view = []                 # filas mostradas (datos filtrados por la búsqueda)
+        self._pool = []                 # items del Treeview, en orden
+        self._index = {}                # item -> posición en la banda
+        self._first = 0                 # índice en _view de la primera fila materializada
+        self._top = 0                   # índice en _view de la primera fila visible
+        self._selected = {}             # clave de fila -> fila seleccionada
+        self._restored_selection = set()
+        self._recenter_pending = False
+
         self._create_style()
         self._setup_table()
         
@@ -22,7 +78,7 @@ class CustomTable(ttk.Frame):
         """Crear estilos para la tabla"""
         style = ttk.Style()
         style.configure("Table.Treeview", 
-                       rowheight=25,
+                       rowheight=self.ROW_HEIGHT,
                        font=("Segoe UI", 10))
         style.configure("Table.Treeview.Heading",
                        font=("Segoe UI", 10, "bold"),
@@ -64,18 +120,22 @@ class CustomTable(ttk.Frame):
             show="headings",
             height=self.height,
             style="Table.Treeview",
-            yscrollcommand=self.v_scrollbar.set,
+            yscrollcommand=self._on_tree_yscroll,
             xscrollcommand=self.h_scrollbar.set
         )
         self.tree.grid(row=0, column=0, sticky="nsew")
-        
-        # Configurar scrollbars
-        self.v_scrollbar.config(command=self.tree.yview)
+
+        # Configurar scrollbars (en modo virtual la vertical recorre todos los datos)
+        self.v_scrollbar.config(command=self._on_scrollbar)
         self.h_scrollbar.config(command=self.tree.xview)
-        
-        # Configurar columnas
+
+        # Configurar columnas y estilos de filas
         self._configure_columns()
-        
+        self._apply_tags()
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Configure>", self._on_resize)
+
         # Bind eventos
         self.tree.bind("<Double-1>", self._on_double_click)
         # Right-click selects row and triggers any on_right_click handler
@@ -148,65 +208,443 @@ class CustomTable(ttk.Frame):
             
             self.tree.column(col['id'], width=width, minwidth=minwidth, anchor=anchor)
             
-    def load_data(self, data: List[Dict]):
-        """Cargar datos en la tabla"""
+    def load_data(self, data: List[Dict], id_key: Optional[str] = None, has_more: bool = False):
+        """Cargar datos en la tabla.
+
+        Con `id_key` (p. ej. 'id') se comparan las filas nuevas con las
+        mostradas por esa clave y solo se insertan, borran, mueven o
+        actualizan los items que cambiaron; la selección se conserva.
+        `has_more` indica que hay más filas para pedir con on_scroll_end.
+        """
+        if self._virtual:
+            self._on_select()
         self.data = data
+        self._search_index = None
+        self._index_build = None
+        self.has_more = has_more
+        self._more_pending = False
+
+        rows_by_key = {row.get(id_key): row for row in data} if id_key else {}
+        if id_key and len(rows_by_key) != len(data):
+            logger.warning(f"Clave '{id_key}' repetida en la tabla; se recarga completa")
+            id_key = None
+        if id_key != self.id_key:
+            self._items = {}
+        self.id_key = id_key
+        self._rows = rows_by_key if id_key else {}
+
+        if id_key:
+            self._selected = {key: rows_by_key[key] for key in self._selected if key in rows_by_key}
+            self._format_cache = {key: cached for key, cached in self._format_cache.items() if key in rows_by_key}
+        else:
+            self._selected.clear()
+            self._format_cache = {}
         self._refresh_table()
-        
+
+    def append_data(self, rows: List[Dict], has_more: bool = False):
+        """Agregar filas al final (página siguiente de un listado paginado).
+
+        Solo se crean los items de las filas nuevas; con una búsqueda activa o
+        si la cantidad de filas activa el modo virtual se refresca completa.
+        """
+        if rows:
+            if self.id_key:
+                keys = [row.get(self.id_key) for row in rows]
+                if len(set(keys)) != len(keys) or any(key in self._rows for key in keys):
+                    self.load_data(self.data + rows, self.id_key, has_more)
+                    return
+                self._rows.update(zip(keys, rows))
+            if self._virtual:
+                self._on_select()
+            start = len(self.data)
+            # Lista nueva: un filtro en curso en otro hilo sigue usando la anterior
+            self.data = self.data + rows
+            self._index_build = None
+            if self._search_index is not None:
+                self._search_index = {**self._search_index, **self._build_search_index(rows)}
+
+            virtual = self.virtual
+            if virtual is None:
+                virtual = len(self.data) > self.VIRTUAL_MIN_ROWS
+            if self._search_term() or virtual != self._virtual:
+                self._refresh_table()
+            elif virtual:
+                self._view = self.data
+                self._materialize(self._top)
+            else:
+                self._view = self.data
+                for idx, row in enumerate(rows, start):
+                    tags = self._row_tags(row, idx)
+                    item = self.tree.insert("", "end", values=self._format_values(row), tags=tags)
+                    if self.id_key:
+                        self._items[row.get(self.id_key)] = (item, self._raw_values(row), tags)
+        self.set_has_more(has_more)
+
+    def update_row(self, row: Dict, index: Optional[int] = None):
+        """Insertar o actualizar una sola fila (por id_key) sin recargar la tabla.
+
+        Una fila existente se actualiza en su lugar; una nueva se inserta en
+        `index` (al final si no se indica). Con una búsqueda activa o en modo
+        virtual se refresca la vista.
+        """
+        key = row.get(self.id_key)
+        current = self._rows.get(key)
+        if current is not None:
+            # Mismo dict: conserva su posición, la selección y la clave en la búsqueda
+            current.clear()
+            current.update(row)
+            row = current
+        else:
+            index = len(self.data) if index is None else index
+            # Lista nueva, como en append_data: un hilo de búsqueda puede estar leyendo la anterior
+            self.data = self.data[:index] + [row] + self.data[index:]
+            self._view = self.data
+            self._rows[key] = row
+        self._index_build = None
+        if self._search_index is not None:
+            self._search_index.update(self._build_search_index([row]))
+
+        if self._virtual or self._search_term():
+            self._refresh_table()
+            return
+
+        raw = self._raw_values(row)
+        entry = self._items.get(key)
+        if entry is not None:
+            item, _, shown_tags = entry
+            tags = self._row_tags(row, 0)[:-1] + shown_tags[-1:]  # conserva la paridad
+            self.tree.item(item, values=self._format_values(row), tags=tags)
+        else:
+            tags = self._row_tags(row, index)
+            item = self.tree.insert("", index, values=self._format_values(row), tags=tags)
+        self._items[key] = (item, raw, tags)
+
+    def delete_row(self, key):
+        """Quitar una sola fila (por id_key) sin recargar la tabla"""
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        self.data = [r for r in self.data if r is not row]
+        self._view = self.data
+        self._selected.pop(key, None)
+        self._format_cache.pop(key, None)
+        self._index_build = None
+        if self._search_index is not None:
+            self._search_index.pop(id(row), None)
+
+        if self._virtual or self._search_term():
+            self._refresh_table()
+            return
+        entry = self._items.pop(key, None)
+        if entry is not None:
+            self.tree.delete(entry[0])
+
+    def set_has_more(self, has_more: bool):
+        """Indicar si quedan páginas por pedir (también libera una página pendiente)"""
+        self.has_more = has_more
+        self._more_pending = False
+
+    def _check_scroll_end(self, remaining: float):
+        """Pedir la página siguiente si quedan pocas filas bajo la vista.
+
+        Sin mapear (p. ej. en una pestaña oculta) el Treeview no tiene alto
+        real y parecería estar siempre al final, así que no se pide nada.
+        """
+        if (remaining <= self.SCROLL_END_ROWS and self.has_more and not self._more_pending
+                and hasattr(self, 'on_scroll_end') and not self._search_term()
+                and self.tree.winfo_ismapped()):
+            self._more_pending = True
+            self.after_idle(self.on_scroll_end)
+
     def _refresh_table(self):
-        """Refrescar la tabla con los datos actuales"""
-        # Limpiar tabla
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # Insertar datos
-        for idx, row in enumerate(self.data):
-            values = [row.get(col['id'], '') for col in self.columns]
+        """Refrescar la tabla con los datos actuales y la búsqueda activa"""
+        self._search_token += 1
+        self._show_rows(self._filter_rows(self.data))
+
+    def _show_rows(self, rows: List[Dict]):
+        """Mostrar `rows` (subconjunto de self.data) con el modo que corresponda"""
+        if self._virtual:
+            self._on_select()
+            self._index = {}  # los items dejan de corresponder a la vista anterior
+        self._view = rows
+        virtual = self.virtual
+        if virtual is None:
+            virtual = len(self.data) > self.VIRTUAL_MIN_ROWS
+
+        # Limpiar tabla (en modo virtual y con id_key los items se reutilizan)
+        if virtual != self._virtual or not (virtual or self.id_key):
+            children = self.tree.get_children()
+            if children:
+                self.tree.delete(*children)
+            self._pool = []
+            self._index = {}
+            self._items = {}
+        self._virtual = virtual
+
+        if virtual:
+            self._first = 0
+            self._materialize(0, full=True)
+            return
+
+        if self.id_key:
+            self._sync_items()
+            return
+
+        for idx, row in enumerate(self._view):
+            self.tree.insert("", "end", values=self._format_values(row), tags=self._row_tags(row, idx))
+
+    def _sync_items(self):
+        """Llevar los items del Treeview a `_view` tocando solo lo que cambió"""
+        id_key = self.id_key
+        keys = {row.get(id_key) for row in self._view}
+
+        # Borrar en una sola llamada los items que ya no están (o no se conocen)
+        current = self.tree.get_children()
+        kept = {entry[0] for key, entry in self._items.items() if key in keys}
+        stale = [item for item in current if item not in kept]
+        if stale:
+            self.tree.delete(*stale)
+        self._items = {key: entry for key, entry in self._items.items() if key in keys}
+        current = [item for item in current if item in kept]
+
+        # Las posiciones anteriores a idx ya quedaron en su lugar
+        for idx, row in enumerate(self._view):
+            key = row.get(id_key)
+            raw = self._raw_values(row)
+            tags = self._row_tags(row, idx)
+            entry = self._items.get(key)
+            if entry is None:
+                item = self.tree.insert("", idx, values=self._format_values(row), tags=tags)
+                current.insert(idx, item)
+                self._items[key] = (item, raw, tags)
+                continue
+
+            item, shown_raw, shown_tags = entry
+            if current[idx] != item:
+                self.tree.move(item, "", idx)
+                current.remove(item)
+                current.insert(idx, item)
+            if raw != shown_raw:
+                self.tree.item(item, values=self._format_values(row), tags=tags)
+            elif tags != shown_tags:
+                self.tree.item(item, tags=tags)
+            else:
+                continue
+            self._items[key] = (item, raw, tags)
+
+    def _raw_values(self, row: Dict) -> tuple:
+        """Valores sin formatear de las columnas de una fila"""
+        return tuple(row.get(col['id'], '') for col in self.columns)
+
+    def _format_values(self, row: Dict) -> list:
+        """Valores de una fila con los formateadores de columna aplicados"""
+        raw = self._raw_values(row)
+        key = row.get(self.id_key) if self.id_key else None
+        if key is not None:
+            cached = self._format_cache.get(key)
+            if cached is not None and cached[0] == raw:
+                return cached[1]
+
+        values = self._apply_formatters(raw)
+        if key is not None:
+            self._format_cache[key] = (raw, values)
+        return values
+
+    def _apply_formatters(self, raw: tuple) -> list:
+        """Aplicar los formateadores de columna a valores crudos"""
+        values = list(raw)
+        for i, col in enumerate(self.columns):
+            if 'formatter' in col and values[i]:
+                try:
+                    values[i] = col['formatter'](values[i])
+                except Exception:
+                    pass
+        return values
+
+    def _row_key(self, row: Dict):
+        """Clave de una fila: su id_key o, sin ella, la identidad del dict"""
+        return row.get(self.id_key) if self.id_key else id(row)
+
+    def _row_tags(self, row: Dict, idx: int) -> tuple:
+        """Tags de la fila (los provistos en `_tags` más el de paridad)"""
+        tags = []
+        provided = row.get('_tags', '')
+        if provided:
+            if isinstance(provided, (list, tuple)):
+                tags.extend(provided)
+            else:
+                tags.append(provided)
+        tags.append('even' if idx % 2 == 0 else 'odd')
+        return tuple(tags)
 
-            # Formatear valores si hay formateadores
-            for i, col in enumerate(self.columns):
-                if 'formatter' in col and values[i]:
-                    try:
-                        values[i] = col['formatter'](values[i])
-                    except Exception:
-                        pass
-
-            # Preserve any tags provided by the row and add parity tag
-            tags = []
-            provided = row.get('_tags', '')
-            if provided:
-                if isinstance(provided, (list, tuple)):
-                    tags.extend(provided)
-                else:
-                    tags.append(provided)
-
-            parity = 'even' if idx % 2 == 0 else 'odd'
-            tags.append(parity)
-
-            self.tree.insert("", "end", values=values, tags=tuple(tags))
-            
-        # Aplicar tags si existen
-        self._apply_tags()
-        
     def _apply_tags(self):
-        """Aplicar estilos a las filas basados en tags"""
-        # Configurar tags para filas
+        """Configurar estilos de filas basados en tags"""
         self.tree.tag_configure('even', background='#f8f9fa')
         self.tree.tag_configure('odd', background='white')
         self.tree.tag_configure('warning', background='#fff3cd')
         self.tree.tag_configure('danger', background='#f8d7da')
         self.tree.tag_configure('success', background='#d1edff')
-        
-        # Aplicar tags alternados
-        for i, item in enumerate(self.tree.get_children()):
-            tag = 'even' if i % 2 == 0 else 'odd'
-            current_tags = list(self.tree.item(item, 'tags'))
-            if tag not in current_tags:
-                current_tags.append(tag)
-                self.tree.item(item, tags=current_tags)
-                
+
+    # ---- Modo virtual ----
+
+    def _visible_rows(self) -> int:
+        """Filas que caben en el área visible del Treeview"""
+        # Se descuenta la fila de encabezados; sin mapear winfo_height() es 1
+        return max(self.height, self.tree.winfo_height() // self.ROW_HEIGHT - 1)
+
+    def _row_of(self, item) -> Optional[Dict]:
+        """Fila de datos que muestra un item materializado"""
+        k = self._index.get(item)
+        return self._view[self._first + k] if k is not None else None
+
+    def _materialize(self, top: int, full: bool = False):
+        """Mostrar las filas desde `top` reutilizando los items existentes"""
+        total = len(self._view)
+        visible = self._visible_rows()
+        band = min(total, visible + 2 * self.OVERSCAN)
+        top = max(0, min(top, total - visible))
+        first_row = max(0, min(top - self.OVERSCAN, total - band))
+        self._on_select()  # la selección del usuario puede no haber llegado aún como evento
+        focus_row = self._row_of(self.tree.focus())
+
+        pool = self._pool
+        delta = first_row - self._first
+        if full or len(pool) != band or abs(delta) >= band:
+            while len(pool) < band:
+                pool.append(self.tree.insert("", "end"))
+            if len(pool) > band:
+                self.tree.delete(*pool[band:])
+                del pool[band:]
+            changed = range(band)
+        elif delta > 0:
+            # Bajando: los primeros items pasan al final con las filas nuevas
+            recycled = pool[:delta]
+            for item in recycled:
+                self.tree.move(item, "", "end")
+            pool[:] = pool[delta:] + recycled
+            changed = range(band - delta, band)
+        elif delta < 0:
+            recycled = pool[delta:]
+            for k, item in enumerate(recycled):
+                self.tree.move(item, "", k)
+            pool[:] = recycled + pool[:delta]
+            changed = range(-delta)
+        else:
+            changed = range(0)
+
+        self._first = first_row
+        for k in changed:
+            idx = first_row + k
+            row = self._view[idx]
+            self.tree.item(pool[k], values=self._format_values(row), tags=self._row_tags(row, idx))
+        self._index = {item: k for k, item in enumerate(pool)}
+
+        self._restore_selection(focus_row)
+        self._top = top
+        if band:
+            self.tree.yview_moveto((top - first_row) / band)
+        else:
+            self.v_scrollbar.set(0, 1)
+
+    def _restore_selection(self, focus_row: Optional[Dict]):
+        """Volver a marcar las filas seleccionadas en los items reutilizados"""
+        if not (self._selected or focus_row is not None or self.tree.selection()):
+            return
+        items = {self._row_key(self._view[self._first + k]): item for k, item in enumerate(self._pool)}
+        selected = [items[key] for key in self._selected if key in items]
+        self._restored_selection = set(selected)
+        self.tree.selection_set(selected)
+        if focus_row is not None and self._row_key(focus_row) in items:
+            self.tree.focus(items[self._row_key(focus_row)])
+
+    def _on_select(self, event=None):
+        """Registrar la selección por fila de datos (también se llama para sincronizar)"""
+        if not self._virtual:
+            return
+        current = self.tree.selection()
+        if set(current) == self._restored_selection:
+            return  # evento de _restore_selection, no del usuario
+        self._selected = {}
+        for item in current:
+            row = self._row_of(item)
+            if row is not None:
+                self._selected[self._row_key(row)] = row
+        self._restored_selection = set(current)
+
+    def _on_tree_yscroll(self, first, last):
+        """Sincronizar la scrollbar vertical con la posición del Treeview"""
+        if not self._virtual:
+            self.v_scrollbar.set(first, last)
+            self._check_scroll_end((1.0 - float(last)) * len(self._view))
+            return
+
+        band = len(self._pool)
+        total = len(self._view)
+        if not band:
+            self.v_scrollbar.set(0, 1)
+            return
+
+        first, last = float(first), float(last)
+        visible = max(1, round((last - first) * band))
+        self._top = self._first + round(first * band)
+        self.v_scrollbar.set(self._top / total, min(1.0, (self._top + visible) / total))
+        self._check_scroll_end(total - (self._top + visible))
+
+        # Cerca del borde de la banda se vuelve a centrar alrededor de la ventana
+        margin = self.OVERSCAN // 2
+        above = self._top - self._first
+        below = self._first + band - (self._top + visible)
+        if (above < margin and self._first > 0) or (below < margin and self._first + band < total):
+            if not self._recenter_pending:
+                self._recenter_pending = True
+                self.after_idle(self._recenter)
+
+    def _recenter(self):
+        """Mover la banda materializada a la posición actual"""
+        self._recenter_pending = False
+        if self._virtual:
+            self._materialize(self._top)
+
+    def _on_scrollbar(self, *args):
+        """Desplazamiento desde la scrollbar vertical"""
+        if not self._virtual:
+            self.tree.yview(*args)
+            return
+
+        total = len(self._view)
+        visible = self._visible_rows()
+        if args[0] == 'moveto':
+            top = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = visible if args[2] == 'pages' else 1
+            top = self._top + int(args[1]) * step
+        else:
+            return
+
+        top = max(0, min(top, total - visible))
+        band = len(self._pool)
+        if band and self._first <= top and top + visible <= self._first + band:
+            self._top = top
+            self.tree.yview_moveto((top - self._first) / band)
+        else:
+            self._materialize(top)
+
+    def _on_resize(self, event=None):
+        """Ajustar la banda si cambió el alto visible"""
+        if self._virtual and len(self._pool) < min(len(self._view), self._visible_rows() + 2 * self.OVERSCAN):
+            self._materialize(self._top)
+
+    def _row_dict(self, row: Dict) -> Dict:
+        """Fila como diccionario de valores mostrados por columna"""
+        return dict(zip((col['id'] for col in self.columns), self._format_values(row)))
+
     def get_selected_item(self):
         """Obtener item seleccionado"""
+        if self._virtual:
+            self._on_select()
+            rows = list(self._selected.values())
+            return self._row_dict(rows[0]) if rows else None
+
         selection = self.tree.selection()
         if selection:
             item = selection[0]
@@ -222,6 +660,10 @@ class CustomTable(ttk.Frame):
         
     def get_selected_items(self):
         """Obtener todos los items seleccionados"""
+        if self._virtual:
+            self._on_select()
+            return [self._row_dict(row) for row in self._selected.values()]
+
         selections = self.tree.selection()
         selected_data = []
         
@@ -239,6 +681,7 @@ class CustomTable(ttk.Frame):
         
     def clear_selection(self):
         """Limpiar selección"""
+        self._selected.clear()
         for item in self.tree.selection():
             self.tree.selection_remove(item)
         try:
@@ -251,33 +694,33 @@ class CustomTable(ttk.Frame):
         self._refresh_table()
         
     def export_data(self):
-        """Exportar datos a CSV"""
-        try:
-            import csv
-            from tkinter import filedialog
-            
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
-            )
-            
-            if filename:
-                with open(filename, 'w', newline='', encoding='utf-8') as file:
-                    writer = csv.writer(file)
-                    
-                    # Escribir encabezados
-                    headers = [col['text'] for col in self.columns]
-                    writer.writerow(headers)
-                    
-                    # Escribir datos
-                    for row in self.data:
-                        values = [row.get(col['id'], '') for col in self.columns]
-                        writer.writerow(values)
-                        
-                utils.show_message(self.parent, "Éxito", f"Datos exportados a {filename}", "info")
-                
-        except Exception as e:
-            utils.show_message(self.parent, "Error", f"Error al exportar: {str(e)}", "error")
+        """Exportar las filas a CSV/XLSX con el formato de sus columnas, fuera del hilo de Tk.
+
+        Si se asignó `on_export` (p. ej. para exportar desde la base un listado
+        paginado completo) se usa en su lugar.
+        """
+        if hasattr(self, 'on_export'):
+            self.on_export()
+            return
+
+        from services.exportacion_service import ExportacionService
+        from ui.components.progress_dialog import export_to_file
+
+        rows = list(self.data)  # ordenar la tabla no afecta la exportación en curso
+        columns = [(col['text'], None) for col in self.columns]
+
+        def batches():
+            for start in range(0, len(rows), ExportacionService.LOTE):
+                yield [self._apply_formatters(self._raw_values(row))
+                       for row in rows[start:start + ExportacionService.LOTE]]
+
+        export_to_file(
+            self.parent,
+            lambda ruta, progress, cancelled: ExportacionService.exportar_filas(
+                ruta, columns, batches(), len(rows), progress, cancelled
+            ),
+            ExportacionService.formatos_soportados()
+        )
             
     def show_search(self):
         """Mostrar diálogo de búsqueda avanzada"""
@@ -287,37 +730,109 @@ class CustomTable(ttk.Frame):
             pass
         
     def _on_search(self, event=None):
-        """Manejar búsqueda en tiempo real"""
-        search_term = self.search_var.get().lower()
-        
-        if not search_term:
+        """Programar la búsqueda al dejar de escribir"""
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+        self._search_after = self.after(self.SEARCH_DELAY_MS, self._run_search)
+
+    def _search_term(self) -> str:
+        """Término de búsqueda normalizado"""
+        search_var = getattr(self, 'search_var', None)
+        return _normalize(search_var.get().strip()) if search_var else ''
+
+    def _build_search_index(self, rows: List[Dict]) -> Dict[int, str]:
+        """Texto normalizado de cada fila: valores crudos y formateados"""
+        index = {}
+        for row in rows:
+            parts = [str(value) for key, value in row.items()
+                     if value is not None and not str(key).startswith('_')]
+            parts.extend(str(value) for value in self._apply_formatters(self._raw_values(row)))
+            index[id(row)] = _normalize('\n'.join(parts))
+        return index
+
+    def _filter_rows(self, rows: List[Dict]) -> List[Dict]:
+        """Filas que contienen el término de búsqueda"""
+        term = self._search_term()
+        if not term:
+            return rows
+        if self._search_index is None:
+            self._search_index = self._build_search_index(self.data)
+        index = self._search_index
+        return [row for row in rows if term in index.get(id(row), '')]
+
+    def _run_search(self):
+        """Filtrar con el término actual; con muchas filas, en un hilo aparte"""
+        self._search_after = None
+        if not self._search_term() or len(self.data) < self.SEARCH_THREAD_MIN_ROWS:
             self._refresh_table()
             return
-            
-        filtered_data = []
-        for row in self.data:
-            # Buscar en todos los valores de la fila
-            for value in row.values():
-                if search_term in str(value).lower():
-                    filtered_data.append(row)
-                    break
-                    
-        # Mostrar datos filtrados
-        self._show_filtered_data(filtered_data)
-        
-    def _show_filtered_data(self, filtered_data):
-        """Mostrar datos filtrados"""
-        # Limpiar tabla
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # Insertar datos filtrados
-        for row in filtered_data:
-            values = [row.get(col['id'], '') for col in self.columns]
-            self.tree.insert("", "end", values=values)
-            
+
+        self._search_token += 1
+        token = self._search_token
+        term = self._search_term()
+        data = self.data
+        index = self._search_index
+        build, builder = None, False
+        if index is None:
+            build = self._index_build
+            if build is None or build[0] is not data:
+                # Lo arma el primer hilo; las búsquedas que lleguen mientras tanto lo esperan
+                build = self._index_build = (data, threading.Event(), {})
+                builder = True
+
+        def worker():
+            try:
+                rows_index = index
+                if build is not None:
+                    _, ready, shared = build
+                    if builder:
+                        try:
+                            shared['index'] = self._build_search_index(data)
+                        finally:
+                            ready.set()
+                    else:
+                        ready.wait()
+                    rows_index = shared.get('index')
+                    if rows_index is None:
+                        raise RuntimeError("no se pudo armar el índice de búsqueda")
+                if token != self._search_token:
+                    return  # una búsqueda, recarga u orden más nuevo lo reemplazó
+                rows = [row for row in data if term in rows_index.get(id(row), '')]
+                result = (data, rows_index, rows)
+            except Exception as e:
+                logger.error(f"Error buscando en la tabla: {e}")
+                result = None  # _poll_search deja de esperar
+            if token == self._search_token:
+                self._search_results[token] = result
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.after(30, self._poll_search, token)
+
+    def _poll_search(self, token: int):
+        """Aplicar el resultado del hilo de búsqueda en el hilo de Tk"""
+        if token != self._search_token:
+            self._search_results.pop(token, None)
+            return  # otra búsqueda, recarga u orden lo reemplazó
+        if token not in self._search_results:
+            self.after(30, self._poll_search, token)
+            return
+
+        result = self._search_results.pop(token)
+        self._search_results.clear()  # los de hilos ya reemplazados
+        if result is None:
+            self._index_build = None  # falló: la próxima búsqueda lo vuelve a armar
+            return
+        data, index, rows = result
+        if data is self.data:
+            self._search_index = index
+            self._index_build = None
+            self._show_rows(rows)
+
     def clear_search(self):
         """Limpiar búsqueda"""
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+            self._search_after = None
         self.search_var.set("")
         self._refresh_table()
         
@@ -390,5 +905,6 @@ class CustomTable(ttk.Frame):
             except (ValueError, TypeError):
                 return str(value).lower()
                 
-        self.data.sort(key=sort_key, reverse=reverse)
+        # Lista nueva: un hilo de búsqueda puede estar leyendo la anterior
+        self.data = sorted(self.data, key=sort_key, reverse=reverse)
         self._refresh_table()
\ No newline at end of file
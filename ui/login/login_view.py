@@ -1,7 +1,6 @@
 import tkinter as tk
 from tkinter import ttk
 import os
-from PIL import Image, ImageTk
 from app.base_view import BaseView
 from ui.components.button import CustomButton, IconButton
 from ui.login.icon_assets import ensure_icons
@@ -72,6 +71,7 @@ class LoginView(BaseView):
             Devuelve un `ImageTk.PhotoImage` o `None` en fallo.
             """
             try:
+                from PIL import Image, ImageTk  # solo para iconos; sin PIL se omiten
                 icons_dir = ensure_icons()
                 if not icons_dir:
                     return None